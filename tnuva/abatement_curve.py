@@ -0,0 +1,117 @@
+"""
+Marginal abatement cost curve (MACC) for the projects table.
+
+Each project's cost per ton of CO2e abated sets its place on the curve: projects are
+sorted from cheapest to dearest and laid end to end, each as wide as its reduction,
+so the cumulative width is the abatement available up to a given price. Projects
+cheaper per ton than the carbon tax pay for themselves against the tax.
+
+The sorted order is kept as an index, so editing one project re-inserts just that
+project (two binary searches and an O(n) array shift) instead of re-sorting the list.
+"""
+import numpy as np
+import pandas as pd
+
+from portfolio_optimizer import COST_COL, PROJECT_COL, REDUCTION_COL, ROI_COL, check_projects
+
+UNIT_COST_COL = "Cost per Ton (USD/t CO2e)"
+# Years the project cost is spread over; 1 compares the full cost with one year's reduction
+DEFAULT_LIFETIME_YEARS = 1.0
+
+
+def unit_costs(cost, reduction, roi, lifetime_years: float = DEFAULT_LIFETIME_YEARS, net_of_returns: bool = False) -> np.ndarray:
+    """
+    Cost per ton abated: the annualized cost (less the annual return, Cost x ROI, if
+    `net_of_returns`) over the annual reduction. Inf for projects that abate nothing.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    reduction = np.asarray(reduction, dtype=np.float64)
+    annual = cost / lifetime_years
+    if net_of_returns:
+        annual = annual - cost * np.asarray(roi, dtype=np.float64) / 100
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(reduction > 0, annual / reduction, np.inf)
+
+
+class AbatementCurve:
+    """
+    Projects ordered by cost per ton (ties by row position), with incremental updates.
+    Row positions refer to the projects table the curve was built from.
+    """
+
+    def __init__(self, projects: pd.DataFrame, lifetime_years: float = DEFAULT_LIFETIME_YEARS, net_of_returns: bool = False):
+        check_projects(projects)
+        if lifetime_years <= 0:
+            raise ValueError("lifetime_years must be positive")
+        self.lifetime_years = float(lifetime_years)
+        self.net_of_returns = bool(net_of_returns)
+        self.names = projects[PROJECT_COL].to_numpy(dtype=object, copy=True)
+        self.costs = projects[COST_COL].to_numpy(dtype=np.float64, copy=True)
+        self.reductions = projects[REDUCTION_COL].to_numpy(dtype=np.float64, copy=True)
+        self.rois = projects[ROI_COL].to_numpy(dtype=np.float64, copy=True)
+        self.unit_costs = unit_costs(self.costs, self.reductions, self.rois, self.lifetime_years, self.net_of_returns)
+        self._order = np.argsort(self.unit_costs, kind="stable")
+        self._keys = self.unit_costs[self._order]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def update(self, row: int, cost=None, reduction=None, roi=None, name=None) -> None:
+        """Change one project's inputs and move it to its new place in the order."""
+        if cost is not None:
+            self.costs[row] = cost
+        if reduction is not None:
+            self.reductions[row] = reduction
+        if roi is not None:
+            self.rois[row] = roi
+        if name is not None:
+            self.names[row] = name
+        key = unit_costs(self.costs[row], self.reductions[row], self.rois[row], self.lifetime_years, self.net_of_returns)[()]
+        self.unit_costs[row] = key
+
+        old = int(np.flatnonzero(self._order == row)[0])
+        order = np.delete(self._order, old)
+        keys = np.delete(self._keys, old)
+        # Among equal costs, rows stay in table order, matching a stable full sort
+        lo, hi = np.searchsorted(keys, key, side="left"), np.searchsorted(keys, key, side="right")
+        new = lo + int(np.searchsorted(order[lo:hi], row))
+        self._order = np.insert(order, new, row)
+        self._keys = np.insert(keys, new, key)
+
+    def sync(self, projects: pd.DataFrame) -> int:
+        """
+        Apply an edited copy of the projects table (same rows, same order) through
+        update(), touching only the rows that changed. Returns how many did.
+        """
+        if len(projects) != len(self):
+            raise ValueError("sync needs the same rows as the curve; build a new curve instead")
+        columns = [(COST_COL, self.costs), (REDUCTION_COL, self.reductions), (ROI_COL, self.rois)]
+        changed = projects[PROJECT_COL].to_numpy(dtype=object) != self.names
+        for column, current in columns:
+            values = projects[column].to_numpy(dtype=np.float64)
+            changed |= ~((values == current) | (np.isnan(values) & np.isnan(current)))
+        rows = np.flatnonzero(changed)
+        for row in rows:
+            record = projects.iloc[row]
+            self.update(row, record[COST_COL], record[REDUCTION_COL], record[ROI_COL], record[PROJECT_COL])
+        return len(rows)
+
+    def curve(self, carbon_tax: float) -> pd.DataFrame:
+        """
+        The curve as one row per abating project, cheapest first: its cost per ton, the
+        start and end of its bar on the cumulative abatement axis, and whether it is
+        cheaper than `carbon_tax`, with the saving against paying the tax on its tons.
+        """
+        order = self._order[np.isfinite(self._keys)]
+        widths = self.reductions[order]
+        unit_cost = self.unit_costs[order]
+        cumulative = np.cumsum(widths)
+        return pd.DataFrame({
+            PROJECT_COL: self.names[order],
+            UNIT_COST_COL: unit_cost,
+            REDUCTION_COL: widths,
+            "Cumulative Abatement (MT CO2e)": cumulative,
+            "Curve Start (MT CO2e)": cumulative - widths,
+            "Below Carbon Tax": unit_cost < carbon_tax,
+            "Saving vs Carbon Tax (USD)": (carbon_tax - unit_cost) * widths,
+        }, index=pd.Index(order, name="Row"))
@@ -0,0 +1,212 @@
+"""
+Full-text search over uploaded audit reports.
+
+Reports are identified by a SHA-256 of their bytes, so each PDF's text is extracted
+only once however often it is uploaded. Extraction runs on a process pool in the
+background; the page texts go into a persistent SQLite FTS5 table (an inverted
+index), so searches across every stored report return in milliseconds.
+"""
+import importlib.util
+import io
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from sqlite_store import SQLiteStore, content_hash
+
+DEFAULT_AUDIT_DB_PATH = os.environ.get(
+    "TNUVA_AUDIT_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_index.db")
+)
+DEFAULT_WORKERS = 2
+DEFAULT_SEARCH_LIMIT = 50
+# A report still pending after this long lost its worker (e.g. to a restart) and is marked failed
+STALE_PENDING_MINUTES = 30
+# Snippet highlight markers; control characters, so extracted text cannot contain them
+_MATCH_START, _MATCH_END = "\x02", "\x03"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    pages INTEGER,
+    status TEXT NOT NULL,
+    error TEXT,
+    uploaded_at TEXT NOT NULL,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_status ON reports (status);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS report_pages USING fts5(
+    text,
+    report_id UNINDEXED,
+    page UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def pdf_extraction_available() -> bool:
+    """Whether pypdf is installed, checked without importing it."""
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def extract_pdf_pages(data: bytes) -> list:
+    """
+    Text of each page of a PDF. Runs in a worker process; requires pypdf, which is
+    imported here so that importing this module (and the app) stays cheap.
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("PDF text extraction requires the 'pypdf' package.") from None
+    reader = PdfReader(io.BytesIO(data))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, the last one as a
+    prefix. Words are quoted, so FTS5 operators and punctuation are taken literally.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    quoted = [f'"{w}"' for w in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def escape_markdown(text: str) -> str:
+    """`text` as literal Markdown: line breaks folded and every ASCII punctuation mark escaped."""
+    return re.sub(r"([!-/:-@\[-`{-~])", r"\\\1", " ".join(str(text).split()))
+
+
+def snippet_markdown(snippet: str) -> str:
+    """A search snippet as safe Markdown, with the matched words in bold."""
+    return escape_markdown(snippet).replace(_MATCH_START, "**").replace(_MATCH_END, "**")
+
+
+class AuditIndex(SQLiteStore):
+    """Persistent report index with a background extraction pool."""
+
+    def __init__(self, path: str = DEFAULT_AUDIT_DB_PATH, max_workers: int = DEFAULT_WORKERS):
+        self.path = path
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._reap_stale()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def submit(self, name: str, data: bytes, retry_failed: bool = False) -> bool:
+        """
+        Queue a report for extraction and indexing. Returns False, without doing any
+        work, if a report with the same content is already indexed, queued or failed;
+        a failed one is queued again only with `retry_failed` (an explicit user action).
+        """
+        digest = content_hash(data)
+        with self._connect() as conn:
+            if retry_failed:
+                conn.execute("DELETE FROM reports WHERE sha256 = ? AND status = 'failed'", (digest,))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO reports (sha256, name, size, status, uploaded_at) VALUES (?, ?, ?, 'pending', ?)",
+                (digest, name, len(data), datetime.now().isoformat(timespec="seconds")),
+            )
+            if cursor.rowcount == 0:
+                return False
+            report_id = cursor.lastrowid
+        try:
+            future = self._executor().submit(extract_pdf_pages, data)
+        except Exception as e:  # e.g. a broken pool; the row must not stay pending
+            self._fail(report_id, e)
+            return False
+        future.add_done_callback(lambda f: self._store(report_id, f))
+        return True
+
+    def _fail(self, report_id: int, error) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE reports SET status = 'failed', error = ?, indexed_at = ? WHERE id = ?",
+                (error if isinstance(error, str) else f"{type(error).__name__}: {error}",
+                 datetime.now().isoformat(timespec="seconds"), report_id),
+            )
+
+    def _reap_stale(self) -> None:
+        """
+        Mark reports pending for over STALE_PENDING_MINUTES as failed: their worker is gone.
+        Younger ones may still be extracting in another session or process.
+        """
+        cutoff = (datetime.now() - timedelta(minutes=STALE_PENDING_MINUTES)).isoformat(timespec="seconds")
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE reports SET status = 'failed', error = 'Extraction did not finish; retry the upload.' "
+                "WHERE status = 'pending' AND uploaded_at < ?",
+                (cutoff,),
+            )
+
+    def _store(self, report_id: int, future) -> None:
+        """Write a finished extraction into the index (runs on the executor's callback thread)."""
+        indexed_at = datetime.now().isoformat(timespec="seconds")
+        try:
+            pages = future.result()
+        except Exception as e:
+            self._fail(report_id, e)
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO report_pages (text, report_id, page) VALUES (?, ?, ?)",
+                [(text, report_id, number) for number, text in enumerate(pages, start=1) if text.strip()],
+            )
+            conn.execute(
+                "UPDATE reports SET status = 'indexed', pages = ?, indexed_at = ? WHERE id = ?",
+                (len(pages), indexed_at, report_id),
+            )
+
+    def failed(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports WHERE status = 'failed'").fetchone()[0]
+
+    def pending(self) -> int:
+        self._reap_stale()
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM reports WHERE status = 'pending'").fetchone()[0]
+
+    def list_reports(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                'SELECT id AS "ID", name AS "Report", pages AS "Pages", status AS "Status", '
+                'uploaded_at AS "Uploaded At", indexed_at AS "Indexed At", error AS "Error" '
+                "FROM reports ORDER BY id DESC",
+                conn,
+            )
+
+    def search(self, text: str, limit: int = DEFAULT_SEARCH_LIMIT) -> pd.DataFrame:
+        """
+        Pages matching every word of `text`, best matches first, with a snippet whose
+        matches are wrapped in control-character markers; render it with snippet_markdown.
+        """
+        columns = ["Report", "Page", "Snippet"]
+        query = fts_query(text)
+        if not query:
+            return pd.DataFrame(columns=columns)
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                'SELECT r.name AS "Report", p.page AS "Page", '
+                f"snippet(report_pages, 0, '{_MATCH_START}', '{_MATCH_END}', ' … ', 16) AS \"Snippet\" "
+                "FROM report_pages AS p JOIN reports AS r ON r.id = p.report_id "
+                "WHERE report_pages MATCH ? ORDER BY p.rank LIMIT ?",
+                conn,
+                params=(query, int(limit)),
+            )
@@ -0,0 +1,165 @@
+"""
+Benchmark suite for data loading, aggregation and scenario computation at scale.
+
+Generates synthetic datasets in the tnuva_scope_data.csv schema (10^3 rows and up),
+then times and memory-profiles each pipeline stage. Results can be saved as a
+baseline and later runs fail when a stage regresses past a threshold.
+
+Usage:
+    python benchmark.py --sizes 1e3 1e4 1e5 1e6 --save-baseline
+    python benchmark.py --sizes 1e3 1e4 1e5 1e6 --threshold 0.5   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_store import convert_to_columnar, read_dataset
+from ingestion import NUMERIC_COLUMNS, ingest_csv
+from tnuva_core import build_analysis, calculate_scenario, evaluate_scenario_grid
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Below this, timings are dominated by noise and are never reported as regressions
+MIN_COMPARABLE_SECONDS = 0.01
+
+
+def synthetic_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    """A random dataset in the tnuva_scope_data.csv schema with ~sqrt(rows) business units."""
+    rng = np.random.default_rng(seed)
+    n_units = max(5, int(np.sqrt(rows)))
+    df = pd.DataFrame({"Business Unit": np.char.add("BU-", rng.integers(0, n_units, rows).astype(str))})
+    scales = [10000, 3000, 50000, 20000, 50000, 5000, 7000, 35000]
+    for col, scale in zip(NUMERIC_COLUMNS, scales):
+        df[col] = rng.gamma(2.0, scale / 2.0, rows).round(1)
+    return df
+
+
+def measure(fn, repeat: int = 1, memory: bool = True):
+    """
+    Run `fn` `repeat` times untraced and keep the best wall time, then (if `memory`)
+    once more under tracemalloc for its peak traced allocation, since tracing would
+    distort the timings. Returns (result, seconds, peak MB or None).
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return result, best, peak_mb
+
+
+def bench_size(rows: int, workdir: str, repeat: int = 1, figures: bool = True, memory: bool = True) -> dict:
+    """Time every stage for one dataset size. Returns {stage: {"seconds", "peak_mb"}}."""
+    df = synthetic_dataset(rows)
+    csv_path = os.path.join(workdir, f"bench_{rows}.csv")
+    df.to_csv(csv_path, index=False)
+    stages = {}
+
+    def record(name, fn):
+        result, seconds, peak_mb = measure(fn, repeat, memory)
+        stages[name] = {"seconds": round(seconds, 6), "peak_mb": None if peak_mb is None else round(peak_mb, 3)}
+        return result
+
+    record("csv_parse", lambda: pd.read_csv(csv_path))
+    record("streaming_ingest", lambda: ingest_csv(csv_path))
+    record("columnar_convert", lambda: convert_to_columnar(csv_path))
+    loaded = record("columnar_load", lambda: read_dataset(csv_path))
+    record("aggregation", lambda: build_analysis(loaded))
+    results = record("scenario", lambda: calculate_scenario(loaded, 50, 50, 10))
+    # The grid sweep keeps a value per business unit and grid point, so it runs on BU totals
+    bu_totals = loaded.groupby("Business Unit", as_index=False)[NUMERIC_COLUMNS].sum()
+    record("scenario_grid", lambda: evaluate_scenario_grid(
+        bu_totals, np.arange(0, 151, 10), np.arange(0, 101, 10), np.arange(0, 31, 5)
+    ))
+    record("csv_export", lambda: results.to_csv(index=False))
+    if figures:
+        import plotly.express as px
+
+        record("figure_build", lambda: px.bar(
+            loaded, x="Business Unit", y=NUMERIC_COLUMNS[:3], barmode="group"
+        ))
+    return stages
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Return a list of regression messages for stages whose time or peak memory
+    exceeds the baseline by more than `threshold` (0.5 = 50%).
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            base = baseline.get(size, {}).get(stage)
+            if not base:
+                continue
+            if current["seconds"] >= MIN_COMPARABLE_SECONDS and current["seconds"] > base["seconds"] * (1 + threshold):
+                regressions.append(f"{stage} @ {size} rows: {current['seconds']:.3f}s vs baseline {base['seconds']:.3f}s")
+            if base.get("peak_mb") and current.get("peak_mb") and current["peak_mb"] > base["peak_mb"] * (1 + threshold):
+                regressions.append(f"{stage} @ {size} rows: {current['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Tnuva data pipeline at several dataset sizes.")
+    parser.add_argument("--sizes", nargs="+", type=float, default=DEFAULT_SIZES, help="Row counts, e.g. 1e3 1e5 1e7.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the best time is kept.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed regression ratio (default 0.5 = 50%%).")
+    parser.add_argument("--no-figures", action="store_true", help="Skip the Plotly figure construction stage.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc memory-profiling run.")
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            rows = int(size)
+            print(f"== {rows:,} rows")
+            results[str(rows)] = bench_size(
+                rows, workdir, repeat=args.repeat, figures=not args.no_figures, memory=not args.no_memory
+            )
+            for stage, m in results[str(rows)].items():
+                peak = "n/a" if m["peak_mb"] is None else f"{m['peak_mb']:.1f}"
+                print(f"  {stage:<18} {m['seconds']:>10.4f} s  {peak:>10} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION: {message}", file=sys.stderr)
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Server-side reduction of chart data, so figure payloads stay bounded as data grows.
+
+Categorical charts keep their top N categories and fold the rest into one "Other"
+bar; timelines with more rows than can be read are summarised as counts per month;
+and dense point series are drawn with WebGL. Everything here is plain pandas/NumPy;
+the app builds (and caches) the Plotly figures from the reduced frames.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_TOP_N = 20
+DEFAULT_MAX_TIMELINE_ROWS = 50
+# Above this many points, scatter/line traces switch to WebGL (scattergl)
+WEBGL_MIN_POINTS = 1_000
+
+
+def top_n_with_other(df: pd.DataFrame, category: str, values, n: int = DEFAULT_TOP_N, other_label: str = "Other") -> pd.DataFrame:
+    """
+    The `n` categories with the largest total of the `values` columns, largest first,
+    plus one "<other_label> (k)" row summing the remaining k categories. Returns `df`
+    unchanged (in its own order) when it has at most n + 1 rows, since folding a
+    single category into "Other" hides it without saving anything.
+    """
+    values = list(values)
+    if len(df) <= n + 1:
+        return df
+    totals = df[values].to_numpy(dtype=np.float64).sum(axis=1)
+    order = np.argsort(-totals, kind="stable")
+    top, rest = df.iloc[order[:n]], df.iloc[order[n:]]
+    other = pd.DataFrame([rest[values].sum().to_numpy()], columns=values)
+    other.insert(0, category, f"{other_label} ({len(rest):,})")
+    return pd.concat([top[[category, *values]], other], ignore_index=True)
+
+
+def soonest(df: pd.DataFrame, date_column: str, n: int = DEFAULT_MAX_TIMELINE_ROWS) -> pd.DataFrame:
+    """The `n` rows with the earliest `date_column` (overdue items come first)."""
+    if len(df) <= n:
+        return df
+    return df.iloc[np.argsort(pd.to_datetime(df[date_column]).to_numpy(), kind="stable")[:n]]
+
+
+def monthly_counts(df: pd.DataFrame, date_column: str, by: str) -> pd.DataFrame:
+    """Rows binned by calendar month of `date_column` and by `by`, as Month/by/Count."""
+    months = pd.to_datetime(df[date_column]).dt.to_period("M").dt.to_timestamp()
+    counts = pd.DataFrame({"Month": months, by: df[by].to_numpy()}).value_counts(sort=False)
+    return counts.rename("Count").reset_index().sort_values(["Month", by], ignore_index=True)
+
+
+def render_mode(points: int) -> str:
+    """The px render_mode for a scatter/line chart of `points` points: "webgl" when dense."""
+    return "webgl" if points >= WEBGL_MIN_POINTS else "auto"
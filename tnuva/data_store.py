@@ -0,0 +1,114 @@
+"""
+Columnar (Parquet) backend for the emissions dataset.
+
+The source CSV is converted once to a Parquet sidecar file next to it. The
+sidecar records the signature (size and mtime) of the CSV it was built from,
+so it is rebuilt automatically when the CSV changes on disk, e.g. after a
+nightly refresh. Loads then read only the requested columns.
+
+pyarrow is a listed requirement; PARQUET_AVAILABLE is the one check for it (the
+exports module uses it too), and without it loads fall back to parsing the CSV.
+"""
+import os
+
+import pandas as pd
+
+from ingestion import EXPECTED_COLUMNS, NUMERIC_COLUMNS, OPTIONAL_COLUMNS, iter_csv_chunks
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - in requirements.txt, but stay usable without it
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pq is not None
+
+SIGNATURE_KEY = b"tnuva.source_signature"
+
+
+def file_signature(path: str) -> str:
+    """
+    Cheap change detector for a file: size and modification time in nanoseconds.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def columnar_path(csv_path: str) -> str:
+    """Path of the Parquet sidecar for a CSV file."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _arrow_schema(signature: str, dimensions=()):
+    fields = [pa.field("Business Unit", pa.string())] + [pa.field(c, pa.float64()) for c in NUMERIC_COLUMNS]
+    fields += [pa.field(c, pa.string()) for c in dimensions]
+    return pa.schema(fields, metadata={SIGNATURE_KEY: signature.encode()})
+
+
+def _sidecar_signature(parquet_path: str):
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    value = metadata.get(SIGNATURE_KEY)
+    return value.decode() if value else None
+
+
+def convert_to_columnar(csv_path: str, parquet_path: str = None) -> str:
+    """
+    Convert a CSV to Parquet chunk by chunk (via the streaming ingestion pipeline),
+    so memory stays bounded for large files. The file is written atomically.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow is required for the columnar data store.")
+    parquet_path = parquet_path or columnar_path(csv_path)
+    signature = file_signature(csv_path)
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    writer = None
+    try:
+        for chunk, _, _ in iter_csv_chunks(csv_path):
+            if writer is None:
+                # Optional dimension columns (Site, Month) are fixed by the first chunk
+                schema = _arrow_schema(signature, [c for c in OPTIONAL_COLUMNS if c in chunk.columns])
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if writer is None:
+            raise ValueError(f"No data in {csv_path}")
+        writer.close()
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return parquet_path
+
+
+def ensure_columnar(csv_path: str):
+    """
+    Return the path of an up-to-date Parquet sidecar for `csv_path`, converting it
+    if missing or stale. Returns None when the columnar store cannot be used
+    (no pyarrow, or the directory is not writable).
+    """
+    if not PARQUET_AVAILABLE:
+        return None
+    parquet_path = columnar_path(csv_path)
+    if _sidecar_signature(parquet_path) == file_signature(csv_path):
+        return parquet_path
+    try:
+        return convert_to_columnar(csv_path, parquet_path)
+    except OSError:
+        return None
+
+
+def read_dataset(csv_path: str, columns=None) -> pd.DataFrame:
+    """
+    Read the dataset behind `csv_path`, only the given `columns` if specified,
+    from the columnar store when available and from the CSV otherwise.
+    """
+    parquet_path = ensure_columnar(csv_path)
+    if parquet_path is not None:
+        return pd.read_parquet(parquet_path, columns=list(columns) if columns else None)
+    usecols = list(columns) if columns else (lambda c: c in EXPECTED_COLUMNS + OPTIONAL_COLUMNS)
+    return pd.read_csv(csv_path, usecols=usecols)
@@ -0,0 +1,207 @@
+"""
+Incremental upserts into the master emissions dataset.
+
+Uploaded rows are upserted into a SQLite table keyed on (Business Unit, Site, Month),
+so a site re-sending a month replaces its earlier figures instead of adding to them.
+The master CSV and its columnar sidecar are never rewritten: readers overlay the
+updates on the base data with apply_updates. Each published upload bumps a revision
+number once, which cheaply tells readers whether the merged dataset changed, and every
+row records the revision that wrote it, so a reader can fetch just the rows changed
+since the version it holds (see merged_dataset.py). Processed uploads are recorded by
+content hash, so a file is merged only once.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ingestion import NUMERIC_COLUMNS
+from sqlite_store import SQLiteStore
+from task_store import DEFAULT_DB_PATH
+
+KEY_COLUMNS = ["Business Unit", "Site", "Month"]
+ATTRIBUTE_COLUMNS = ["Region", "Fuel Type"]
+# SQL column names, in the order of KEY_COLUMNS + ATTRIBUTE_COLUMNS + NUMERIC_COLUMNS
+_SQL_COLUMNS = [
+    "business_unit", "site", "month", "region", "fuel_type",
+    "scope1", "scope2", "scope3", "electricity_mwh", "fuels_liters", "direct", "indirect", "supply_chain",
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS dataset_updates (
+    business_unit TEXT NOT NULL,
+    site TEXT NOT NULL DEFAULT '',
+    month TEXT NOT NULL DEFAULT '',
+    region TEXT,
+    fuel_type TEXT,
+    {", ".join(f"{c} REAL" for c in _SQL_COLUMNS[5:])},
+    source_sha256 TEXT,
+    updated_at TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (business_unit, site, month)
+);
+
+CREATE TABLE IF NOT EXISTS dataset_uploads (
+    sha256 TEXT PRIMARY KEY,
+    name TEXT,
+    rows INTEGER NOT NULL,
+    uploaded_at TEXT NOT NULL
+);
+"""
+
+
+def normalise_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The (Business Unit, Site, Month) key of each row as strings, with a missing Site or
+    Month as "" and parseable months as "YYYY-MM", so equal keys compare equal.
+    """
+    keys = pd.DataFrame(index=df.index)
+    keys["Business Unit"] = df["Business Unit"].astype("string").str.strip()
+    site = df["Site"].astype("string").str.strip() if "Site" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+    keys["Site"] = site.fillna("")
+    if "Month" in df.columns:
+        raw = df["Month"].astype("string").str.strip()
+        parsed = pd.to_datetime(raw, errors="coerce").dt.strftime("%Y-%m").astype("string")
+        keys["Month"] = parsed.fillna(raw).fillna("")
+    else:
+        keys["Month"] = ""
+    return keys
+
+
+class DatasetUpdates(SQLiteStore):
+    """SQLite-backed upsert log for the master dataset."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Tables created before rows carried their revision
+            if "revision" not in {row[1] for row in conn.execute("PRAGMA table_info(dataset_updates)")}:
+                conn.execute("ALTER TABLE dataset_updates ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dataset_updates_revision ON dataset_updates (revision)")
+
+    def revision(self) -> int:
+        """Bumped once per published upload; unchanged revision means unchanged updates."""
+        with self._connect() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def publish(self) -> int:
+        """Bump the revision, making upserts written with publish=False visible as a new version."""
+        with self._connect() as conn:
+            revision = conn.execute("PRAGMA user_version").fetchone()[0] + 1
+            conn.execute(f"PRAGMA user_version = {int(revision)}")
+        return revision
+
+    def has_upload(self, sha256: str) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM dataset_uploads WHERE sha256 = ?", (sha256,)).fetchone() is not None
+
+    def record_upload(self, sha256: str, name: str, rows: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO dataset_uploads (sha256, name, rows, uploaded_at) VALUES (?, ?, ?, ?)",
+                (sha256, name, int(rows), datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def upsert(self, records: pd.DataFrame, source_sha256: str = None, publish: bool = True) -> int:
+        """
+        Insert or replace `records` (dataset schema) by key, in one transaction. Rows
+        without a Business Unit are skipped and, within the batch, the last row for a
+        key wins; a missing Region or Fuel Type keeps the key's earlier value. Returns
+        the number of keys written. An upload written chunk by chunk passes
+        publish=False and calls publish() once at the end, so it is one revision.
+        """
+        keys = normalise_keys(records)
+        valid = keys["Business Unit"].notna() & (keys["Business Unit"] != "")
+        batch = pd.concat([keys[valid], records.loc[valid, [c for c in ATTRIBUTE_COLUMNS if c in records.columns]]], axis=1)
+        batch = batch.reindex(columns=KEY_COLUMNS + ATTRIBUTE_COLUMNS)
+        batch[NUMERIC_COLUMNS] = records.loc[valid, NUMERIC_COLUMNS].astype("float64")
+        batch = batch.drop_duplicates(KEY_COLUMNS, keep="last")
+        if batch.empty:
+            return 0
+
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        placeholders = ", ".join("?" * (len(_SQL_COLUMNS) + 3))
+        assignments = ", ".join(
+            [f"{c} = COALESCE(excluded.{c}, {c})" for c in _SQL_COLUMNS[3:5]]
+            + [f"{c} = excluded.{c}" for c in _SQL_COLUMNS[5:] + ["source_sha256", "updated_at", "revision"]]
+        )
+        with self._connect() as conn:
+            # Rows belong to the revision that publishes them
+            revision = conn.execute("PRAGMA user_version").fetchone()[0] + 1
+            rows = [
+                tuple(None if pd.isna(v) else v for v in row) + (source_sha256, updated_at, revision)
+                for row in batch.itertuples(index=False, name=None)
+            ]
+            conn.executemany(
+                f"INSERT INTO dataset_updates ({', '.join(_SQL_COLUMNS)}, source_sha256, updated_at, revision) "
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT (business_unit, site, month) DO UPDATE SET {assignments}",
+                rows,
+            )
+            if publish:
+                conn.execute(f"PRAGMA user_version = {int(revision)}")
+        return len(rows)
+
+    def frame(self) -> pd.DataFrame:
+        """All updates in the dataset schema (Site and Month are "" when not given)."""
+        return self.changes()[1]
+
+    def changes(self, since: int = None):
+        """
+        (revision, updates): the current revision and, read in the same transaction, the
+        updates written after revision `since` (all of them if None), like frame().
+        Rows of an upload that is not yet published are included.
+        """
+        where, params = ("WHERE revision > ?", (int(since),)) if since is not None else ("", ())
+        with self._connect() as conn:
+            revision = conn.execute("PRAGMA user_version").fetchone()[0]
+            df = pd.read_sql_query(f"SELECT {', '.join(_SQL_COLUMNS)} FROM dataset_updates {where} ORDER BY rowid", conn, params=params)
+        df.columns = KEY_COLUMNS + ATTRIBUTE_COLUMNS + NUMERIC_COLUMNS
+        return revision, df
+
+
+def apply_updates(base: pd.DataFrame, updates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Overlay `updates` (as returned by DatasetUpdates.frame) on `base`: base rows whose
+    key has an update take the updated values, keys not in the base are appended.
+    Site/Month/Region/Fuel Type columns are carried only if either side uses them.
+    """
+    return overlay_updates(base, updates)[0]
+
+
+def overlay_updates(base: pd.DataFrame, updates: pd.DataFrame, base_keys: pd.MultiIndex = None):
+    """
+    apply_updates, returning (merged, position, added): for each base row the position
+    of its update in `updates` (-1 if none), and a mask of the `updates` rows appended.
+    `base_keys`, normalise_keys(base) as a MultiIndex, saves deriving them again.
+    """
+    if base_keys is None:
+        base_keys = pd.MultiIndex.from_frame(normalise_keys(base))
+    if updates.empty:
+        return base, np.full(len(base), -1), np.zeros(0, dtype=bool)
+    update_keys = pd.MultiIndex.from_frame(updates[KEY_COLUMNS].astype("string"))
+    position = update_keys.get_indexer(base_keys)
+    replaced = position >= 0
+
+    merged = base.copy()
+    merged[NUMERIC_COLUMNS] = merged[NUMERIC_COLUMNS].astype("float64")
+    for column in ("Site", "Month", *ATTRIBUTE_COLUMNS):
+        used = column in base.columns or (updates[column].fillna("") != "").any()
+        if used and column not in merged.columns:
+            merged[column] = pd.Series(pd.NA, index=merged.index, dtype="string")
+    if replaced.any():
+        source = updates.iloc[position[replaced]]
+        merged.loc[replaced, NUMERIC_COLUMNS] = source[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+        for column in ATTRIBUTE_COLUMNS:
+            if column in merged.columns:
+                values = source[column].to_numpy(dtype=object)
+                current = merged.loc[replaced, column].to_numpy(dtype=object)
+                merged.loc[replaced, column] = np.where(pd.isna(values), current, values)
+
+    added = ~update_keys.isin(base_keys)
+    if not added.any():
+        return merged, position, added
+    appended = updates[added].replace({"Site": {"": pd.NA}, "Month": {"": pd.NA}})
+    merged = pd.concat([merged, appended[[c for c in merged.columns if c in appended.columns]]], ignore_index=True)
+    return merged, position, added
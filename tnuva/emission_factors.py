@@ -0,0 +1,164 @@
+"""
+Emission-factor engine: Scope 1 and 2 derived from activity data.
+
+Grid factors (t CO2e/MWh by region and year) and fuel factors (t CO2e/liter by fuel
+type and year) come from a local factor table. The table is indexed once into
+sorted (key, year) codes, so joining factors onto any number of activity rows is a
+single searchsorted pass; a row uses the latest factor year at or before its own.
+Calculated figures are compared with the reported Scope 1/2 values.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ingestion import NUMERIC_COLUMNS
+
+DEFAULT_FACTOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "emission_factors.csv")
+FACTOR_TABLE_COLUMNS = ["Factor Type", "Key", "Year", "Factor (t CO2e per unit)"]
+FACTOR_TYPES = ("grid", "fuel")
+
+ELECTRICITY_COL = "Electricity Consumption (MWh)"
+FUEL_COL = "Fuels Consumption (Liters)"
+REPORTED_SCOPE1_COL, REPORTED_SCOPE2_COL = NUMERIC_COLUMNS[:2]
+
+DEFAULT_REGION = "IL"
+DEFAULT_FUEL_TYPE = "Diesel"
+DEFAULT_TOLERANCE_PCT = 10.0
+# Years are packed below the key code, so (key, year) pairs sort as one int64
+_YEAR_SPAN = 10_000
+
+
+def _normalise(keys) -> pd.Series:
+    return pd.Series(keys, dtype="string").str.strip().str.casefold()
+
+
+@dataclass(frozen=True)
+class _FactorIndex:
+    keys: pd.Index  # normalised key -> key code
+    labels: list  # display labels, by key code
+    codes: np.ndarray  # sorted key_code * _YEAR_SPAN + year
+    factors: np.ndarray  # factor per entry of `codes`
+
+
+class FactorTable:
+    """
+    Grid and fuel emission factors with a lookup index built once per table.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        missing = [c for c in FACTOR_TABLE_COLUMNS if c not in table.columns]
+        if missing:
+            raise ValueError(f"Factor table is missing column(s): {', '.join(missing)}")
+        self.table = table
+        self._index = {}
+        factor_type = table["Factor Type"].astype("string").str.strip().str.casefold()
+        for kind in FACTOR_TYPES:
+            rows = table[factor_type == kind]
+            normalised = _normalise(rows["Key"])
+            keys = pd.Index(normalised.unique())
+            codes = keys.get_indexer(normalised).astype(np.int64) * _YEAR_SPAN + rows["Year"].to_numpy(dtype=np.int64)
+            order = np.argsort(codes, kind="stable")
+            labels = rows["Key"].astype(str).str.strip().groupby(normalised.to_numpy()).first()
+            self._index[kind] = _FactorIndex(
+                keys=keys,
+                labels=[labels[k] for k in keys],
+                codes=codes[order],
+                factors=rows["Factor (t CO2e per unit)"].to_numpy(dtype=np.float64)[order],
+            )
+
+    def keys(self, kind: str) -> list:
+        """The regions ("grid") or fuel types ("fuel") in the table."""
+        return list(self._index[kind].labels)
+
+    def lookup(self, kind: str, keys, years) -> np.ndarray:
+        """
+        Factors for parallel arrays of keys and years: the latest year at or before
+        each requested year. NaN where the key is unknown or has no year that early.
+        """
+        index = self._index[kind]
+        # Normalise each distinct key once rather than every row
+        row_codes, distinct = pd.factorize(np.asarray(keys, dtype=object))
+        key_codes = index.keys.get_indexer(_normalise(distinct)).astype(np.int64)[row_codes]
+        wanted = key_codes * _YEAR_SPAN + np.asarray(years, dtype=np.int64)
+        position = np.searchsorted(index.codes, wanted, side="right") - 1
+        found = (key_codes >= 0) & (position >= 0)
+        found[found] = index.codes[position[found]] // _YEAR_SPAN == key_codes[found]
+        factors = np.full(len(wanted), np.nan)
+        factors[found] = index.factors[position[found]]
+        return factors
+
+
+def load_factor_table(path: str = DEFAULT_FACTOR_PATH) -> FactorTable:
+    return FactorTable(pd.read_csv(path))
+
+
+def activity_emissions(
+    df: pd.DataFrame,
+    factors: FactorTable,
+    region: str = DEFAULT_REGION,
+    fuel_type: str = DEFAULT_FUEL_TYPE,
+    year=None,
+    tolerance_pct: float = DEFAULT_TOLERANCE_PCT,
+) -> pd.DataFrame:
+    """
+    Calculate Scope 1 (fuels x fuel factor) and Scope 2 (electricity x grid factor)
+    for every row in one vectorized pass and compare them with the reported values.
+
+    Rows take their Region, Fuel Type and year (from Month) from the data when those
+    columns are present and not blank, else `region`, `fuel_type` and `year` (default:
+    the current year). Status is "missing factor", "mismatch" (either scope differs
+    from the reported value by more than `tolerance_pct`) or "ok".
+    """
+    n = len(df)
+    year = pd.Timestamp.now().year if year is None else int(year)
+
+    def dimension(column, default):
+        if column in df.columns:
+            # Blank cells are missing too, so they fall back to the default rather than miss the lookup
+            values = df[column].astype("string").str.strip().replace("", pd.NA)
+            return values.fillna(default).to_numpy(dtype=object)
+        return np.full(n, default, dtype=object)
+
+    regions = dimension("Region", region)
+    fuels = dimension("Fuel Type", fuel_type)
+    if "Month" in df.columns:
+        years = pd.to_datetime(df["Month"], errors="coerce").dt.year.fillna(year).to_numpy(dtype=np.int64)
+    else:
+        years = np.full(n, year, dtype=np.int64)
+
+    grid_factor = factors.lookup("grid", regions, years)
+    fuel_factor = factors.lookup("fuel", fuels, years)
+    calculated_s1 = df[FUEL_COL].to_numpy(dtype=np.float64) * fuel_factor
+    calculated_s2 = df[ELECTRICITY_COL].to_numpy(dtype=np.float64) * grid_factor
+    reported_s1 = df[REPORTED_SCOPE1_COL].to_numpy(dtype=np.float64)
+    reported_s2 = df[REPORTED_SCOPE2_COL].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff_s1 = (calculated_s1 - reported_s1) / reported_s1 * 100
+        diff_s2 = (calculated_s2 - reported_s2) / reported_s2 * 100
+    missing = np.isnan(grid_factor) | np.isnan(fuel_factor)
+    # A zero reported value only matches a zero calculated one
+    off_s1 = np.where(reported_s1 == 0, calculated_s1 != 0, np.abs(diff_s1) > tolerance_pct)
+    off_s2 = np.where(reported_s2 == 0, calculated_s2 != 0, np.abs(diff_s2) > tolerance_pct)
+    status = np.where(missing, "missing factor", np.where(off_s1 | off_s2, "mismatch", "ok"))
+
+    result = pd.DataFrame({"Business Unit": df["Business Unit"].to_numpy()}, index=df.index)
+    for column in ("Site", "Month"):
+        if column in df.columns:
+            result[column] = df[column].to_numpy()
+    return result.assign(**{
+        "Region": regions,
+        "Fuel Type": fuels,
+        "Year": years,
+        "Grid Factor (t CO2e/MWh)": grid_factor,
+        "Fuel Factor (t CO2e/L)": fuel_factor,
+        "Calculated Scope 1 (MT CO2e)": calculated_s1,
+        "Reported Scope 1 (MT CO2e)": reported_s1,
+        "Scope 1 Difference (%)": diff_s1,
+        "Calculated Scope 2 (MT CO2e)": calculated_s2,
+        "Reported Scope 2 (MT CO2e)": reported_s2,
+        "Scope 2 Difference (%)": diff_s2,
+        "Status": status,
+    })
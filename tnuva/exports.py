@@ -0,0 +1,118 @@
+"""
+On-demand export of result tables as gzip-compressed CSV, Parquet or Excel.
+
+Exports are written chunk by chunk into a spooled temporary file (kept in memory
+while small, moved to disk once large), so serializing a large facility-level table
+never holds its full uncompressed text as one string; only the compressed bytes are
+returned. The app passes these functions to st.download_button as callables, so
+nothing is serialized until a user actually clicks download.
+
+Parquet needs pyarrow and Excel needs openpyxl or xlsxwriter; available_formats()
+lists the formats the current environment can write.
+"""
+import gzip
+import importlib.util
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+from dataclasses import dataclass
+
+from data_store import PARQUET_AVAILABLE, pa, pq
+
+EXPORT_CHUNK_ROWS = 100_000
+# Exports larger than this spill from memory to a temporary file on disk
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+EXCEL_MAX_ROWS = 1_048_575  # one row is the header
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+
+
+FORMATS = {
+    "csv.gz": ExportFormat("CSV (gzip)", "csv.gz", "application/gzip"),
+    "parquet": ExportFormat("Parquet", "parquet", "application/vnd.apache.parquet"),
+    "xlsx": ExportFormat("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+ARCHIVE_MIME = "application/zip"
+
+
+def _excel_engine():
+    for engine in ("xlsxwriter", "openpyxl"):
+        if importlib.util.find_spec(engine) is not None:
+            return engine
+    return None
+
+
+def available_formats() -> list:
+    """Keys of FORMATS whose optional dependency is installed."""
+    formats = ["csv.gz"]
+    if PARQUET_AVAILABLE:
+        formats.append("parquet")
+    if _excel_engine() is not None:
+        formats.append("xlsx")
+    return formats
+
+
+def export_file_name(name: str, fmt: str) -> str:
+    """A download file name for `name`, e.g. "Scenario 1" -> "scenario_1.csv.gz"."""
+    stem = re.sub(r"[^0-9A-Za-z]+", "_", name).strip("_").lower() or "export"
+    return f"{stem}.{FORMATS[fmt].extension}"
+
+
+def write_export(df, fmt: str, out, chunksize: int = EXPORT_CHUNK_ROWS) -> None:
+    """Serialize `df` in format `fmt` into the binary file object `out`, `chunksize` rows at a time."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {list(FORMATS)}")
+    if fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz, \
+                io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+            for start in range(0, max(len(df), 1), chunksize):
+                df.iloc[start:start + chunksize].to_csv(text, index=False, header=start == 0)
+    elif fmt == "parquet":
+        if not PARQUET_AVAILABLE:
+            raise RuntimeError("Parquet export requires the 'pyarrow' package.")
+        schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+        with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+            for start in range(0, len(df), chunksize):
+                writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunksize], schema=schema, preserve_index=False))
+    else:
+        engine = _excel_engine()
+        if engine is None:
+            raise RuntimeError("Excel export requires the 'openpyxl' or 'xlsxwriter' package.")
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows; use CSV or Parquet for {len(df):,}.")
+        df.to_excel(out, index=False, engine=engine)
+
+
+def _spooled_export(df, fmt: str):
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    write_export(df, fmt, out)
+    out.seek(0)
+    return out
+
+
+def export_file(df, fmt: str) -> bytes:
+    """`df` exported as `fmt`."""
+    with _spooled_export(df, fmt) as out:
+        return out.read()
+
+
+def export_archive(frames: dict, fmt: str) -> bytes:
+    """
+    A zip archive with one `fmt` file per {name: DataFrame} entry. Members are stored
+    as-is, since every format is already compressed.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as out:
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_STORED) as archive:
+            for name, df in frames.items():
+                with _spooled_export(df, fmt) as member, \
+                        archive.open(export_file_name(name, fmt), "w", force_zip64=True) as target:
+                    shutil.copyfileobj(member, target)
+        out.seek(0)
+        return out.read()
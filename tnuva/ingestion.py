@@ -0,0 +1,140 @@
+"""
+Chunked, memory-bounded ingestion of emissions CSV uploads.
+
+Files are read in fixed-size chunks, each chunk is checked against the
+tnuva_scope_data.csv schema and coerced to the expected dtypes, and only running
+totals plus a bounded preview are kept, so peak memory does not grow with file size.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLUMNS = [
+    "Scope 1 Emissions (MT CO2e)",
+    "Scope 2 Emissions (MT CO2e)",
+    "Scope 3 Emissions (MT CO2e)",
+    "Electricity Consumption (MWh)",
+    "Fuels Consumption (Liters)",
+    "Direct Emissions (MT CO2e)",
+    "Indirect Emissions (MT CO2e)",
+    "Supply Chain Emissions (MT CO2e)",
+]
+EXPECTED_COLUMNS = ["Business Unit"] + NUMERIC_COLUMNS
+# Dimension columns of facility-level, monthly exports; kept as strings when present.
+# Region and Fuel Type select the grid and fuel emission factors (emission_factors.py).
+OPTIONAL_COLUMNS = ["Site", "Month", "Region", "Fuel Type"]
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_PREVIEW_ROWS = 200
+
+
+class SchemaError(ValueError):
+    """Raised when an uploaded CSV does not match the expected emissions schema."""
+
+
+@dataclass
+class IngestSummary:
+    """Running result of a streamed ingestion: counts, totals and a bounded preview."""
+    rows: int = 0
+    chunks: int = 0
+    preview: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=EXPECTED_COLUMNS))
+    totals: pd.Series = field(default_factory=lambda: pd.Series(0.0, index=NUMERIC_COLUMNS))
+    invalid_values: pd.Series = field(default_factory=lambda: pd.Series(0, index=NUMERIC_COLUMNS))
+    missing_business_unit: int = 0
+    extra_columns: list = field(default_factory=list)
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(self.invalid_values.any() or self.missing_business_unit)
+
+
+def check_columns(columns) -> list:
+    """
+    Validate a header against EXPECTED_COLUMNS. Raises SchemaError if any expected
+    column is missing and returns the list of unexpected extra columns.
+    """
+    columns = [str(c).strip() for c in columns]
+    missing = [c for c in EXPECTED_COLUMNS if c not in columns]
+    if missing:
+        raise SchemaError(f"Missing expected column(s): {', '.join(missing)}")
+    return [c for c in columns if c not in EXPECTED_COLUMNS + OPTIONAL_COLUMNS]
+
+
+def coerce_chunk(chunk: pd.DataFrame):
+    """
+    Coerce a chunk to the expected dtypes (string Business Unit and optional dimension
+    columns, float64 numerics). Returns the coerced frame and a per-column count of
+    values that failed to parse.
+    """
+    chunk = chunk.rename(columns=lambda c: str(c).strip())
+    out = pd.DataFrame({"Business Unit": chunk["Business Unit"].astype("string").str.strip()})
+    for col in OPTIONAL_COLUMNS:
+        if col in chunk.columns:
+            out[col] = chunk[col].astype("string").str.strip()
+    invalid = {}
+    for col in NUMERIC_COLUMNS:
+        raw = chunk[col]
+        coerced = pd.to_numeric(raw, errors="coerce").astype("float64")
+        invalid[col] = int((coerced.isna() & raw.notna()).sum())
+        out[col] = coerced
+    return out, pd.Series(invalid, index=NUMERIC_COLUMNS)
+
+
+def iter_csv_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Yield (coerced_chunk, invalid_counts, extra_columns) for each chunk of a CSV
+    path or file-like object. The header is validated before any data is coerced.
+    """
+    reader = pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=True)
+    with reader:
+        for chunk in reader:
+            extra = check_columns(chunk.columns)
+            coerced, invalid = coerce_chunk(chunk)
+            yield coerced, invalid, extra
+
+
+def ingest_csv(
+    source,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    on_progress=None,
+    on_chunk=None,
+) -> IngestSummary:
+    """
+    Stream a CSV through schema validation and dtype coercion, keeping only running
+    totals and the first `preview_rows` rows. `on_chunk(index, chunk)` receives every
+    coerced chunk, e.g. to feed an incremental aggregate. `on_progress(fraction, rows)`
+    is called after every chunk; the fraction is estimated from the file position
+    when the source size is known, otherwise it is None.
+    """
+    total_bytes = getattr(source, "size", None)
+    summary = IngestSummary()
+    preview_parts = []
+    preview_len = 0
+    totals = np.zeros(len(NUMERIC_COLUMNS))
+
+    for chunk, invalid, extra in iter_csv_chunks(source, chunksize=chunksize):
+        if on_chunk is not None:
+            on_chunk(summary.chunks, chunk)
+        summary.chunks += 1
+        summary.rows += len(chunk)
+        summary.extra_columns = extra
+        summary.invalid_values += invalid
+        summary.missing_business_unit += int(chunk["Business Unit"].isna().sum())
+        totals += np.nan_to_num(chunk[NUMERIC_COLUMNS].to_numpy()).sum(axis=0)
+        if preview_len < preview_rows:
+            part = chunk.head(preview_rows - preview_len)
+            preview_parts.append(part)
+            preview_len += len(part)
+
+        if on_progress is not None:
+            fraction = None
+            if total_bytes and hasattr(source, "tell"):
+                fraction = min(source.tell() / total_bytes, 1.0)
+            on_progress(fraction, summary.rows)
+
+    summary.totals = pd.Series(totals, index=NUMERIC_COLUMNS)
+    if preview_parts:
+        summary.preview = pd.concat(preview_parts, ignore_index=True)
+    return summary
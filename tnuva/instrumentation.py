@@ -0,0 +1,160 @@
+"""
+Opt-in rerun instrumentation: named section timings, cache hit/miss counters,
+rerun wall time and memory, written to a local JSON-lines metrics file.
+
+UI-free: the Streamlit app keeps one SessionMetrics per session and renders it in
+a debug sidebar panel.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+DEFAULT_METRICS_PATH = os.environ.get(
+    "TNUVA_METRICS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics.jsonl")
+)
+_write_lock = threading.Lock()
+
+
+def env_enabled() -> bool:
+    """Whether instrumentation is switched on by default via TNUVA_INSTRUMENTATION."""
+    return os.environ.get("TNUVA_INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB, or None if it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / 1e6 if os.uname().sysname == "Darwin" else peak / 1e3
+
+
+class SessionMetrics:
+    """
+    Metrics for one user session. Section timings and cache counters accumulate
+    over the session; each rerun also keeps its own section timings.
+    """
+
+    def __init__(self, session_id: str, path: str = DEFAULT_METRICS_PATH):
+        self.session_id = session_id
+        self.path = path
+        self.section_stats = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0})
+        self.cache_stats = defaultdict(lambda: {"calls": 0, "misses": 0})
+        self.reruns = 0
+        self.last_rerun_ms = None
+        self.session_peak_rss_mb = None
+        self._rerun_start = None
+        self._rerun_sections = {}
+
+    @contextmanager
+    def section(self, name: str):
+        """Time a named block of code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_section(name, (time.perf_counter() - start) * 1000)
+
+    def record_section(self, name: str, elapsed_ms: float) -> None:
+        stats = self.section_stats[name]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        self._rerun_sections[name] = self._rerun_sections.get(name, 0.0) + elapsed_ms
+
+    def cache_call(self, name: str) -> None:
+        self.cache_stats[name]["calls"] += 1
+
+    def cache_miss(self, name: str) -> None:
+        self.cache_stats[name]["misses"] += 1
+
+    @contextmanager
+    def rerun(self, label: str = ""):
+        """
+        Treat the block as a rerun (e.g. a fragment rerun) unless one is already in
+        progress, in which case it is just part of that rerun.
+        """
+        if self._rerun_start is not None:
+            yield
+            return
+        self.begin_rerun()
+        try:
+            yield
+        finally:
+            self.end_rerun(label)
+
+    def begin_rerun(self) -> None:
+        self._rerun_start = time.perf_counter()
+        self._rerun_sections = {}
+
+    def end_rerun(self, label: str = "") -> None:
+        """Close the current rerun and append its record to the metrics file."""
+        if self._rerun_start is None:
+            return
+        self.reruns += 1
+        self.last_rerun_ms = (time.perf_counter() - self._rerun_start) * 1000
+        self._rerun_start = None
+        rss = current_rss_mb()
+        if rss is not None:
+            self.session_peak_rss_mb = max(rss, self.session_peak_rss_mb or 0.0)
+        self.write({
+            "ts": time.time(),
+            "session": self.session_id,
+            "label": label,
+            "rerun_ms": round(self.last_rerun_ms, 3),
+            "rss_mb": None if rss is None else round(rss, 1),
+            "process_peak_rss_mb": peak_rss_mb(),
+            "sections_ms": {k: round(v, 3) for k, v in self._rerun_sections.items()},
+            "cache": {k: dict(v) for k, v in self.cache_stats.items()},
+        })
+
+    def write(self, record: dict) -> None:
+        """Append one JSON line to the metrics file; failures are ignored."""
+        try:
+            with _write_lock, open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+
+    def section_rows(self) -> list:
+        return [
+            {
+                "Section": name,
+                "Count": s["count"],
+                "Last (ms)": round(s["last_ms"], 1),
+                "Mean (ms)": round(s["total_ms"] / s["count"], 1),
+                "Max (ms)": round(s["max_ms"], 1),
+            }
+            for name, s in sorted(self.section_stats.items(), key=lambda kv: -kv[1]["total_ms"])
+        ]
+
+    def cache_rows(self) -> list:
+        rows = []
+        for name, c in sorted(self.cache_stats.items()):
+            hits = max(c["calls"] - c["misses"], 0)
+            rows.append({
+                "Cache": name,
+                "Hits": hits,
+                "Misses": c["misses"],
+                "Hit Rate (%)": round(100 * hits / c["calls"], 1) if c["calls"] else None,
+            })
+        return rows
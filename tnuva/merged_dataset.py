@@ -0,0 +1,106 @@
+"""
+The master dataset with uploaded updates overlaid, kept current incrementally.
+
+MergedDataset holds the merged frame for one base file. When the updates revision
+moves on, only the rows upserted since the version it holds are applied, by key, and
+the values already derived from the previous version are patched rather than rebuilt:
+per-BU scope totals and the analysis totals receive the difference between the new
+and old values of the changed rows (as EmissionsCube.upsert does for its cells), and
+the history profile is rebuilt for the affected business units only. Each version is
+published as a new SharedDataset, so sessions still reading the previous one are not
+disturbed.
+"""
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset_updates import KEY_COLUMNS, DatasetUpdates, normalise_keys, overlay_updates
+from ingestion import NUMERIC_COLUMNS
+from tnuva_core import SharedDataset, build_analysis
+from validation import HistoryProfile
+
+# Names of the derived values MergedDataset patches (see SharedDataset.derived)
+ANALYSIS = "analysis"
+BU_TOTALS = "business_unit_totals"
+HISTORY_PROFILE = "history_profile"
+
+SCOPE_COLUMNS = NUMERIC_COLUMNS[:3]
+
+
+def _version_fingerprint(previous: str, revision: int) -> str:
+    # The next version is the previous one plus the rows of `revision`, so no rehash of the data
+    return hashlib.sha1(f"{previous}|{revision}".encode()).hexdigest()
+
+
+def patch_business_unit_totals(totals: pd.DataFrame, business_units, deltas: np.ndarray) -> pd.DataFrame:
+    """
+    business_unit_totals output with per-row scope `deltas` (rows x 3) added to the
+    units in `business_units`; units not yet present are appended in order of appearance.
+    """
+    delta = pd.DataFrame(deltas, columns=SCOPE_COLUMNS).groupby(np.asarray(business_units, dtype=object), sort=False).sum()
+    patched = totals.set_index("Business Unit")
+    patched = patched.reindex(patched.index.append(delta.index.difference(patched.index, sort=False)), fill_value=0.0)
+    patched.loc[delta.index, SCOPE_COLUMNS] += delta.to_numpy()
+    return patched.rename_axis("Business Unit").reset_index()
+
+
+class MergedDataset:
+    """
+    One base frame plus the updates in a DatasetUpdates store, as a SharedDataset that
+    refresh() brings up to date in place of a rebuild.
+    """
+
+    def __init__(self, base: pd.DataFrame, updates: DatasetUpdates):
+        self.updates = updates
+        self._lock = threading.Lock()
+        self.revision, changes = updates.changes()
+        frame = overlay_updates(base, changes)[0]
+        self._keys = pd.MultiIndex.from_frame(normalise_keys(frame))
+        self.dataset = SharedDataset.build(frame)
+
+    def refresh(self) -> SharedDataset:
+        """The dataset at the current updates revision, applying only what changed since the last call."""
+        if self.updates.revision() == self.revision:
+            return self.dataset
+        with self._lock:
+            revision, changes = self.updates.changes(since=self.revision)
+            if revision != self.revision:
+                self._apply(revision, changes)
+            return self.dataset
+
+    def _apply(self, revision: int, changes: pd.DataFrame) -> None:
+        previous = self.dataset
+        frame = previous.view()
+        merged, position, added = overlay_updates(frame, changes, base_keys=self._keys)
+        # Stored keys are already normalised
+        self._keys = self._keys.append(pd.MultiIndex.from_frame(changes.loc[added, KEY_COLUMNS].astype("string")))
+
+        # Old and new values of every row the changes touch: replaced rows, then appended ones
+        replaced = np.flatnonzero(position >= 0)
+        new_values = changes[NUMERIC_COLUMNS].to_numpy(dtype=np.float64)
+        new = np.vstack([new_values[position[replaced]], new_values[added]])
+        old = np.vstack([frame[NUMERIC_COLUMNS].iloc[replaced].to_numpy(dtype=np.float64), np.zeros((added.sum(), len(NUMERIC_COLUMNS)))])
+        business_units = np.concatenate([
+            frame["Business Unit"].iloc[replaced].to_numpy(dtype=object),
+            changes["Business Unit"].to_numpy(dtype=object)[added],
+        ])
+
+        derived = previous.derived_values()
+        patched = {}
+        if BU_TOTALS in derived:
+            # groupby sums skip missing values, so a missing value counts as 0 on either side
+            deltas = np.nan_to_num(new[:, :3]) - np.nan_to_num(old[:, :3])
+            patched[BU_TOTALS] = patch_business_unit_totals(derived[BU_TOTALS], business_units, deltas)
+        if ANALYSIS in derived:
+            totals = derived[ANALYSIS]["totals"].to_numpy() + (new - old).sum(axis=0)
+            # A missing value makes the totals NaN, which a difference cannot undo; sum afresh
+            patched[ANALYSIS] = build_analysis(merged, None if np.isnan(totals).any() else totals)
+        if HISTORY_PROFILE in derived:
+            units = self._keys.levels[0].get_indexer(pd.unique(changes["Business Unit"]))
+            affected = np.isin(self._keys.codes[0], units)
+            patched[HISTORY_PROFILE] = derived[HISTORY_PROFILE].with_units(HistoryProfile.build(merged[affected]))
+
+        self.dataset = SharedDataset.build(merged, _version_fingerprint(previous.fingerprint, revision), patched)
+        self.revision = revision
@@ -0,0 +1,286 @@
+"""
+Budget-constrained abatement portfolio optimizer for the projects table.
+
+Chooses the subset of candidate projects that maximizes carbon reduction (or annual
+return, Cost x ROI) within a budget and optional per-business-unit spending caps.
+Moderate candidate lists are solved with an exact 0/1 knapsack dynamic program over
+the budget; large lists use the greedy value-per-dollar heuristic, and the LP
+relaxation of the same ordering gives an upper bound on how far from optimal it is.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+PROJECT_COL = "Project"
+REDUCTION_COL = "Carbon Reduction (MT CO2e)"
+COST_COL = "Cost (USD)"
+ROI_COL = "ROI (%)"
+BU_COL = "Business Unit"
+PROJECT_COLUMNS = [PROJECT_COL, REDUCTION_COL, COST_COL, ROI_COL]
+
+OBJECTIVES = ("reduction", "roi")
+METHODS = ("auto", "exact", "greedy")
+# Budget resolution of the DP. When costs share no common unit fine enough, costs are
+# rounded up to budget / DP_MAX_CAPACITY, so every selection stays within budget.
+DP_MAX_CAPACITY = 10_000
+# "auto" switches from the DP to greedy above this many (project x budget unit) cells
+DP_MAX_CELLS = 20_000_000
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    """The chosen projects and their totals. `upper_bound` is the LP relaxation bound."""
+    selected: pd.DataFrame
+    objective: str
+    method: str
+    budget: float
+    total_cost: float
+    total_reduction: float
+    total_return: float
+    upper_bound: float
+
+    @property
+    def value(self) -> float:
+        return self.total_reduction if self.objective == "reduction" else self.total_return
+
+    @property
+    def gap_pct(self) -> float:
+        """How far below the LP upper bound the selection is, in percent."""
+        if self.upper_bound <= 0:
+            return 0.0
+        return max(0.0, (self.upper_bound - self.value) / self.upper_bound * 100)
+
+
+def check_projects(projects: pd.DataFrame) -> None:
+    """Raise ValueError if the projects table lacks a required column."""
+    missing = [c for c in PROJECT_COLUMNS if c not in projects.columns]
+    if missing:
+        raise ValueError(f"Projects table is missing column(s): {', '.join(missing)}")
+
+
+def objective_values(projects: pd.DataFrame, objective: str = "reduction") -> np.ndarray:
+    """Per-project value: carbon reduction, or annual return (Cost x ROI / 100) for "roi"."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; expected one of {OBJECTIVES}")
+    if objective == "reduction":
+        return projects[REDUCTION_COL].to_numpy(dtype=np.float64)
+    return projects[COST_COL].to_numpy(dtype=np.float64) * projects[ROI_COL].to_numpy(dtype=np.float64) / 100
+
+
+def _budget_unit(costs: np.ndarray, budget: float) -> float:
+    """
+    Budget granularity for the DP: the common divisor of the (whole-dollar) costs and
+    budget when that gives at most DP_MAX_CAPACITY units, else budget / DP_MAX_CAPACITY.
+    """
+    if budget <= 0:
+        return 1.0
+    if np.all(costs == np.round(costs)) and budget == round(budget):
+        unit = math.gcd(int(budget), *(int(c) for c in costs if c > 0)) if len(costs) else int(budget)
+        if unit and budget / unit <= DP_MAX_CAPACITY:
+            return float(unit)
+    return budget / DP_MAX_CAPACITY
+
+
+def _knapsack(weights: np.ndarray, values: np.ndarray, capacity: int, track: bool = True):
+    """
+    0/1 knapsack over integer weights. Returns (best, take): best[c] is the best value
+    with total weight <= c, take[i, c] whether item i is used at capacity c (None
+    unless `track`).
+    """
+    best = np.zeros(capacity + 1)
+    take = np.zeros((len(weights), capacity + 1), dtype=bool) if track else None
+    for i, (w, v) in enumerate(zip(weights, values)):
+        if w > capacity:
+            continue
+        candidate = best[:capacity + 1 - w] + v
+        improves = candidate > best[w:]
+        if track:
+            take[i, w:] = improves
+        best[w:] = np.where(improves, candidate, best[w:])
+    return best, take
+
+
+def _knapsack_items(weights: np.ndarray, take: np.ndarray, capacity: int) -> list:
+    """Walk the take table back from `capacity` to the chosen item positions."""
+    chosen = []
+    c = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if take[i, c]:
+            chosen.append(i)
+            c -= weights[i]
+    return chosen[::-1]
+
+
+def _exact(costs, values, groups, budget, bu_budgets) -> list:
+    """
+    Exact selection. Without per-BU caps this is one knapsack. With caps, each capped BU
+    gets its own knapsack curve (limited to its cap) and the curves are combined with a
+    multiple-choice knapsack over the shared budget.
+    """
+    unit = _budget_unit(costs, budget)
+    capacity = int(math.floor(budget / unit + 1e-9))
+    weights = np.ceil(costs / unit - 1e-9).astype(np.int64)
+
+    caps = {bu: cap for bu, cap in (bu_budgets or {}).items() if cap is not None}
+    if not caps:
+        _, take = _knapsack(weights, values, capacity)
+        return _knapsack_items(weights, take, capacity)
+
+    # Uncapped BUs share one group limited only by the global budget
+    group_of = np.array([bu if bu in caps else None for bu in groups], dtype=object)
+    group_keys = list(dict.fromkeys(group_of))
+    total = np.zeros(capacity + 1)
+    plans = []
+    for key in group_keys:
+        members = np.flatnonzero(group_of == key)
+        limit = capacity if key is None else min(capacity, int(math.floor(caps[key] / unit + 1e-9)))
+        curve, take = _knapsack(weights[members], values[members], limit)
+        # Multiple-choice step: spend k units on this group, the rest on earlier groups
+        combined = total.copy()
+        spend = np.zeros(capacity + 1, dtype=np.int64)
+        for k in range(1, limit + 1):
+            candidate = total[:capacity + 1 - k] + curve[k]
+            improves = candidate > combined[k:]
+            combined[k:] = np.where(improves, candidate, combined[k:])
+            spend[k:] = np.where(improves, k, spend[k:])
+        total = combined
+        plans.append((members, take, spend))
+
+    chosen = []
+    c = capacity
+    for members, take, spend in reversed(plans):
+        k = int(spend[c])
+        chosen.extend(members[i] for i in _knapsack_items(weights[members], take, k))
+        c -= k
+    return sorted(chosen)
+
+
+def _greedy(costs, values, groups, budget, bu_budgets) -> list:
+    """Take projects in order of value per dollar while the budget and BU caps allow."""
+    order = np.argsort(-values / np.maximum(costs, 1e-12), kind="stable")
+    remaining = budget
+    bu_remaining = {bu: cap for bu, cap in (bu_budgets or {}).items() if cap is not None}
+    chosen = []
+    for i in order:
+        bu = groups[i]
+        if costs[i] > remaining or (bu in bu_remaining and costs[i] > bu_remaining[bu]):
+            continue
+        chosen.append(i)
+        remaining -= costs[i]
+        if bu in bu_remaining:
+            bu_remaining[bu] -= costs[i]
+    # The single best affordable project guards against greedy's worst case
+    caps = bu_budgets or {}
+    alone = [i for i in range(len(costs)) if caps.get(groups[i]) is None or costs[i] <= caps[groups[i]]]
+    if alone:
+        top = max(alone, key=lambda i: values[i])
+        if values[top] > values[chosen].sum():
+            chosen = [top]
+    return sorted(chosen)
+
+
+def lp_upper_bound(costs: np.ndarray, values: np.ndarray, budget: float) -> float:
+    """
+    Value of the fractional (LP relaxation) knapsack, ignoring BU caps: an upper bound on
+    any feasible selection.
+    """
+    order = np.argsort(-values / np.maximum(costs, 1e-12), kind="stable")
+    cum_cost = np.cumsum(costs[order])
+    cum_value = np.cumsum(values[order])
+    full = np.searchsorted(cum_cost, budget, side="right")
+    bound = cum_value[full - 1] if full else 0.0
+    if full < len(order):
+        spent = cum_cost[full - 1] if full else 0.0
+        i = order[full]
+        bound += values[i] * (budget - spent) / costs[i] if costs[i] > 0 else values[i]
+    return float(bound)
+
+
+def optimize_portfolio(
+    projects: pd.DataFrame,
+    budget: float,
+    objective: str = "reduction",
+    bu_budgets=None,
+    method: str = "auto",
+) -> PortfolioResult:
+    """
+    Pick the projects that maximize `objective` ("reduction" or "roi") with total cost
+    within `budget` and, if `bu_budgets` ({business unit: cap}) is given, each business
+    unit's spend within its cap. `method` is "exact" (knapsack DP), "greedy", or "auto",
+    which uses the DP unless the list is too large for it.
+    """
+    check_projects(projects)
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    if bu_budgets and BU_COL not in projects.columns:
+        raise ValueError(f"Per-business-unit budgets need a {BU_COL!r} column")
+
+    costs = projects[COST_COL].to_numpy(dtype=np.float64)
+    values = objective_values(projects, objective)
+    # Projects that add nothing or can never be afforded are out from the start
+    eligible = np.flatnonzero((values > 0) & (costs >= 0) & (costs <= budget))
+    costs_e, values_e = costs[eligible], values[eligible]
+    groups = projects[BU_COL].to_numpy()[eligible] if BU_COL in projects.columns else np.full(len(eligible), None)
+
+    if method == "auto":
+        capacity = budget / _budget_unit(costs_e, budget) if len(eligible) else 0
+        method = "exact" if len(eligible) * (capacity + 1) <= DP_MAX_CELLS else "greedy"
+    chosen = _greedy(costs_e, values_e, groups, budget, bu_budgets) if len(eligible) else []
+    if method == "exact" and len(eligible):
+        exact = _exact(costs_e, values_e, groups, budget, bu_budgets)
+        # With rounded-up costs the DP can trail greedy; it is only optimal on an exact unit
+        if values_e[exact].sum() >= values_e[chosen].sum():
+            chosen = exact
+        else:
+            method = "greedy"
+    chosen = eligible[chosen]
+
+    selected = projects.iloc[chosen]
+    returns = selected[COST_COL] * selected[ROI_COL] / 100
+    return PortfolioResult(
+        selected=selected,
+        objective=objective,
+        method=method,
+        budget=float(budget),
+        total_cost=float(selected[COST_COL].sum()),
+        total_reduction=float(selected[REDUCTION_COL].sum()),
+        total_return=float(returns.sum()),
+        upper_bound=lp_upper_bound(costs_e, values_e, budget) if len(eligible) else 0.0,
+    )
+
+
+def pareto_frontier(projects: pd.DataFrame, max_budget=None, method: str = "auto") -> pd.DataFrame:
+    """
+    Cost vs carbon reduction frontier: for each budget level, the most reduction any
+    portfolio within it achieves. The exact frontier comes from one knapsack DP up to
+    `max_budget` (default: the cost of every project); for large lists ("greedy") the
+    points are the prefixes of the reduction-per-dollar ordering.
+    """
+    check_projects(projects)
+    costs = projects[COST_COL].to_numpy(dtype=np.float64)
+    values = projects[REDUCTION_COL].to_numpy(dtype=np.float64)
+    keep = (values > 0) & (costs >= 0)
+    costs, values = costs[keep], values[keep]
+    max_budget = float(costs.sum() if max_budget is None else max_budget)
+    columns = [COST_COL, REDUCTION_COL]
+    if not len(costs) or max_budget <= 0:
+        return pd.DataFrame(columns=columns)
+
+    unit = _budget_unit(costs, max_budget)
+    capacity = int(math.floor(max_budget / unit + 1e-9))
+    if method == "auto":
+        method = "exact" if len(costs) * (capacity + 1) <= DP_MAX_CELLS else "greedy"
+
+    if method == "exact":
+        weights = np.ceil(costs / unit - 1e-9).astype(np.int64)
+        best, _ = _knapsack(weights, values, capacity, track=False)
+        # The frontier points are the budget levels at which the best reduction improves
+        steps = np.flatnonzero(np.diff(best, prepend=0.0) > 0)
+        return pd.DataFrame({COST_COL: steps * unit, REDUCTION_COL: best[steps]})
+
+    order = np.argsort(-values / np.maximum(costs, 1e-12), kind="stable")
+    cum_cost = np.cumsum(costs[order])
+    within = cum_cost <= max_budget
+    return pd.DataFrame({COST_COL: cum_cost[within], REDUCTION_COL: np.cumsum(values[order])[within]})
@@ -0,0 +1,411 @@
+"""
+Vectorized scenario engine for the model simulation tab.
+
+Scenarios are evaluated as NumPy array math over the Scope 1/2/3 columns of the
+emissions data, so a whole grid of carbon tax x renewable mix x efficiency values
+is computed for every business unit at once, without a DataFrame per scenario.
+The same formulas back the Monte Carlo uncertainty mode, which samples inputs in
+batches and fans out across a process pool for large sample counts, and the
+multi-year pathway mode, which projects every business unit through 2025-2050 for
+many scenarios as one (scenario, year, business unit) tensor.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+SCOPE1_COL = "Scope 1 Emissions (MT CO2e)"
+SCOPE2_COL = "Scope 2 Emissions (MT CO2e)"
+SCOPE3_COL = "Scope 3 Emissions (MT CO2e)"
+
+
+def scope_arrays(df: pd.DataFrame):
+    """
+    Return the Scope 1, 2 and 3 columns as float64 NumPy arrays (one value per row).
+    """
+    return tuple(df[col].to_numpy(dtype=np.float64) for col in (SCOPE1_COL, SCOPE2_COL, SCOPE3_COL))
+
+
+@dataclass(frozen=True)
+class ScenarioGrid:
+    """
+    Result of a grid evaluation. Arrays have shape (tax, renewable, efficiency, business unit).
+    """
+    taxes: np.ndarray
+    renewables: np.ndarray
+    efficiencies: np.ndarray
+    business_units: np.ndarray
+    total_emissions: np.ndarray
+    carbon_tax_cost: np.ndarray
+
+    @property
+    def shape(self):
+        return self.carbon_tax_cost.shape[:3]
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def totals(self, metric: str = "carbon_tax_cost") -> np.ndarray:
+        """Sum a metric over business units, giving a (tax, renewable, efficiency) array."""
+        return getattr(self, metric).sum(axis=-1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Flatten the grid totals into one row per (tax, renewable, efficiency) point."""
+        tax, ren, eff = np.meshgrid(self.taxes, self.renewables, self.efficiencies, indexing="ij")
+        return pd.DataFrame({
+            "Carbon Tax ($/ton CO2e)": tax.ravel(),
+            "Renewable Energy Mix (%)": ren.ravel(),
+            "Efficiency Improvement (%)": eff.ravel(),
+            "Total Adjusted Emissions": self.totals("total_emissions").ravel(),
+            "Carbon Tax Cost": self.totals("carbon_tax_cost").ravel(),
+        })
+
+
+def evaluate_scenario_grid(df: pd.DataFrame, taxes, renewables, efficiencies) -> ScenarioGrid:
+    """
+    Evaluate every business unit at every (tax, renewable, efficiency) grid point in one
+    broadcasted computation. Uses the same formulas as calculate_scenario. The arrays
+    hold one value per grid point and input row, so pass business_unit_totals(df)
+    rather than site/month rows.
+    """
+    taxes = np.atleast_1d(np.asarray(taxes, dtype=np.float64))
+    renewables = np.atleast_1d(np.asarray(renewables, dtype=np.float64))
+    efficiencies = np.atleast_1d(np.asarray(efficiencies, dtype=np.float64))
+    s1, s2, s3 = scope_arrays(df)
+
+    # Axes: (tax, renewable, efficiency, business unit)
+    adjusted_s1 = s1 * (1 - efficiencies[None, None, :, None] / 100)
+    adjusted_s2 = s2 * (1 - renewables[None, :, None, None] / 100)
+    total = adjusted_s1 + adjusted_s2 + s3
+    cost = total * taxes[:, None, None, None]
+
+    return ScenarioGrid(
+        taxes=taxes,
+        renewables=renewables,
+        efficiencies=efficiencies,
+        business_units=df["Business Unit"].to_numpy(),
+        total_emissions=np.broadcast_to(total, cost.shape),
+        carbon_tax_cost=cost,
+    )
+
+
+def calculate_scenario(df: pd.DataFrame, tax, renewable, efficiency) -> pd.DataFrame:
+    """Helper function to calculate emissions and costs for a scenario."""
+    s1, s2, s3 = scope_arrays(df)
+    adjusted_s1 = s1 * (1 - efficiency / 100)
+    adjusted_s2 = s2 * (1 - renewable / 100)
+    adjusted_s3 = s3  # No change in this example
+    total = adjusted_s1 + adjusted_s2 + adjusted_s3
+    return df.assign(**{
+        "Adjusted Scope 1": adjusted_s1,
+        "Adjusted Scope 2": adjusted_s2,
+        "Adjusted Scope 3": adjusted_s3,
+        "Total Adjusted Emissions": total,
+        "Carbon Tax Cost": total * tax,
+    })
+
+
+# ------------------------------------------------------------------------------
+# Monte Carlo uncertainty mode
+# ------------------------------------------------------------------------------
+DISTRIBUTIONS = ("normal", "uniform", "triangular")
+MC_BATCH_SIZE = 100_000
+MC_PARALLEL_THRESHOLD = 200_000
+# Percentiles need every sample: n_samples x (business units + 1) values per metric are held at once
+MC_MAX_SAMPLES = 250_000
+
+
+@dataclass(frozen=True)
+class UncertaintySpec:
+    """
+    Uncertainty ranges for the scenario inputs.
+
+    Scope and tax spreads are percentages of the central value; efficiency and
+    renewable spreads are in percentage points. For "normal" the spread is the
+    standard deviation, for "uniform" and "triangular" it is the half-width.
+    """
+    distribution: str = "normal"
+    scope1_pct: float = 10.0
+    scope2_pct: float = 10.0
+    scope3_pct: float = 20.0
+    tax_pct: float = 0.0
+    renewable_pts: float = 5.0
+    efficiency_pts: float = 2.0
+
+
+def _draw(rng, distribution, center, spread, size):
+    """Draw samples of shape `size` around `center` (scalar or per-unit array)."""
+    center = np.asarray(center, dtype=np.float64)
+    spread = np.asarray(spread, dtype=np.float64)
+    if not np.any(spread):
+        return np.broadcast_to(center, size).copy()
+    if distribution == "normal":
+        return rng.normal(center, spread, size)
+    if distribution == "uniform":
+        return rng.uniform(center - spread, center + spread, size)
+    if distribution == "triangular":
+        # numpy requires left < right, so pad zero-width entries
+        return rng.triangular(center - spread, center, center + spread + (spread == 0) * 1e-12, size)
+    raise ValueError(f"Unknown distribution: {distribution!r}. Expected one of {DISTRIBUTIONS}.")
+
+
+def _simulate_batch(s1, s2, s3, tax, renewable, efficiency, spec, n, seed_seq):
+    """
+    Simulate one batch of `n` samples for every business unit.
+    Returns (total_emissions, carbon_tax_cost), each of shape (n, business units).
+    """
+    rng = np.random.default_rng(seed_seq)
+    size = (n, s1.shape[0])
+    d = spec.distribution
+    scope1 = np.clip(_draw(rng, d, s1, s1 * spec.scope1_pct / 100, size), 0, None)
+    scope2 = np.clip(_draw(rng, d, s2, s2 * spec.scope2_pct / 100, size), 0, None)
+    scope3 = np.clip(_draw(rng, d, s3, s3 * spec.scope3_pct / 100, size), 0, None)
+    # Policy levers are shared by all business units within a sample
+    taxes = np.clip(_draw(rng, d, tax, tax * spec.tax_pct / 100, (n, 1)), 0, None)
+    renewables = np.clip(_draw(rng, d, renewable, spec.renewable_pts, (n, 1)), 0, 100)
+    efficiencies = np.clip(_draw(rng, d, efficiency, spec.efficiency_pts, (n, 1)), 0, 100)
+
+    total = scope1 * (1 - efficiencies / 100) + scope2 * (1 - renewables / 100) + scope3
+    return total, total * taxes
+
+
+def run_monte_carlo(
+    df: pd.DataFrame,
+    tax,
+    renewable,
+    efficiency,
+    spec: UncertaintySpec = UncertaintySpec(),
+    n_samples: int = 100_000,
+    seed: int = 0,
+    percentiles=(5, 50, 95),
+    max_workers=None,
+) -> pd.DataFrame:
+    """
+    Run a seeded Monte Carlo simulation of a scenario and return percentile bands of
+    Total Adjusted Emissions and Carbon Tax Cost per business unit, plus a TOTAL row.
+
+    Samples are drawn in fixed-size batches, each with its own child seed spawned from
+    `seed`, so results are identical whether the batches run serially or on a process
+    pool (used once `n_samples` reaches MC_PARALLEL_THRESHOLD).
+
+    The scope values are drawn per business unit, around business_unit_totals(df), so
+    each batch holds (batch, business unit) arrays however many rows `df` has. Batches
+    are written straight into the sample arrays the percentiles are taken over, whose
+    size MC_MAX_SAMPLES bounds.
+    """
+    if spec.distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {spec.distribution!r}. Expected one of {DISTRIBUTIONS}.")
+    if not 0 < n_samples <= MC_MAX_SAMPLES:
+        raise ValueError(f"n_samples must be between 1 and {MC_MAX_SAMPLES:,}, got {n_samples:,}.")
+    df = business_unit_totals(df)
+    s1, s2, s3 = scope_arrays(df)
+    batch_sizes = [MC_BATCH_SIZE] * (n_samples // MC_BATCH_SIZE)
+    if n_samples % MC_BATCH_SIZE:
+        batch_sizes.append(n_samples % MC_BATCH_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+    args = [(s1, s2, s3, tax, renewable, efficiency, spec, n, ss) for n, ss in zip(batch_sizes, seeds)]
+
+    # The last column is the portfolio total, so it gets its own (correlated) bands
+    total = np.empty((n_samples, len(s1) + 1))
+    cost = np.empty((n_samples, len(s1) + 1))
+
+    def fill(batches):
+        start = 0
+        for batch_total, batch_cost in batches:
+            rows = slice(start, start + len(batch_total))
+            total[rows, :-1] = batch_total
+            total[rows, -1] = batch_total.sum(axis=1)
+            cost[rows, :-1] = batch_cost
+            cost[rows, -1] = batch_cost.sum(axis=1)
+            start = rows.stop
+
+    if n_samples >= MC_PARALLEL_THRESHOLD and len(args) > 1:
+        workers = min(len(args), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fill(pool.map(_simulate_batch, *zip(*args)))
+    else:
+        fill(_simulate_batch(*a) for a in args)
+
+    q = np.asarray(percentiles, dtype=np.float64)
+    # The samples are not needed afterwards, so let percentile partition them in place
+    total_bands = np.percentile(total, q, axis=0, overwrite_input=True)
+    cost_bands = np.percentile(cost, q, axis=0, overwrite_input=True)
+    result = {"Business Unit": np.append(df["Business Unit"].to_numpy(dtype=object), "TOTAL")}
+    for i, p in enumerate(percentiles):
+        result[f"Total Adjusted Emissions P{p:g}"] = total_bands[i]
+    for i, p in enumerate(percentiles):
+        result[f"Carbon Tax Cost P{p:g}"] = cost_bands[i]
+    return pd.DataFrame(result)
+
+
+# ------------------------------------------------------------------------------
+# Multi-year decarbonization pathways
+# ------------------------------------------------------------------------------
+PATHWAY_START_YEAR = 2025
+PATHWAY_END_YEAR = 2050
+PATHWAY_LEVERS = {"tax": "Carbon Tax", "renewable": "Renewable Mix", "efficiency": "Efficiency"}
+# Emissions as % of the start-year baseline: the SBTi-style 42% cut by 2030, 90% by 2050
+DEFAULT_TARGET_MILESTONES = ((2025, 100.0), (2030, 58.0), (2050, 10.0))
+
+
+@dataclass(frozen=True)
+class PathwayScenario:
+    """
+    A multi-year scenario. Each lever is a tuple of (year, value) milestones, linearly
+    interpolated between milestones and held flat before the first and after the last.
+    Hashable, so a tuple of scenarios can key a cache.
+    """
+    name: str
+    tax: tuple = ((PATHWAY_START_YEAR, 50.0),)
+    renewable: tuple = ((PATHWAY_START_YEAR, 50.0),)
+    efficiency: tuple = ((PATHWAY_START_YEAR, 10.0),)
+
+
+def pathway_years(start: int = PATHWAY_START_YEAR, end: int = PATHWAY_END_YEAR) -> np.ndarray:
+    return np.arange(int(start), int(end) + 1)
+
+
+def schedule_values(milestones, years) -> np.ndarray:
+    """A (year, value) milestone schedule evaluated at every year in `years`."""
+    if not milestones:
+        raise ValueError("A schedule needs at least one (year, value) milestone")
+    points = np.asarray(sorted(milestones), dtype=np.float64)
+    return np.interp(np.asarray(years, dtype=np.float64), points[:, 0], points[:, 1])
+
+
+def scenarios_from_frame(frame: pd.DataFrame) -> tuple:
+    """
+    Read pathway scenarios from a table with a Scenario column and milestone columns
+    named "<lever> <year>", e.g. "Carbon Tax 2030" or "Renewable Mix 2050". Empty cells
+    are skipped; a scenario needs at least one milestone per lever.
+    """
+    if "Scenario" not in frame.columns:
+        raise ValueError("Pathway table is missing the 'Scenario' column")
+    columns = {}
+    for column in frame.columns:
+        label, _, year = str(column).rpartition(" ")
+        lever = next((k for k, v in PATHWAY_LEVERS.items() if v == label), None)
+        if lever is not None and year.isdigit():
+            columns.setdefault(lever, []).append((int(year), column))
+
+    scenarios = []
+    for _, row in frame.iterrows():
+        if pd.isna(row["Scenario"]) or not str(row["Scenario"]).strip():
+            continue
+        name = str(row["Scenario"]).strip()
+        schedules = {}
+        for lever, label in PATHWAY_LEVERS.items():
+            schedules[lever] = tuple(
+                (year, float(row[column])) for year, column in sorted(columns.get(lever, [])) if pd.notna(row[column])
+            )
+            if not schedules[lever]:
+                raise ValueError(f"Scenario {name!r} has no {label} milestones")
+        scenarios.append(PathwayScenario(name, **schedules))
+    return tuple(scenarios)
+
+
+def target_trajectory(baseline: float, years, milestones=DEFAULT_TARGET_MILESTONES) -> np.ndarray:
+    """Target emissions per year: `baseline` scaled by the (year, % of baseline) milestones."""
+    return baseline * schedule_values(milestones, years) / 100
+
+
+def business_unit_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scope 1, 2 and 3 summed per business unit. The scenario formulas are linear in the
+    scope values, so projecting BU totals equals summing projected rows, and the
+    pathway tensor stays small however many site/month rows the dataset holds.
+    """
+    scopes = [SCOPE1_COL, SCOPE2_COL, SCOPE3_COL]
+    return df.groupby("Business Unit", sort=False)[scopes].sum().reset_index()
+
+
+@dataclass(frozen=True)
+class PathwayResult:
+    """
+    Result of project_pathways. Emission and cost arrays have shape
+    (scenario, year, business unit); lever schedules have shape (scenario, year).
+    """
+    scenarios: tuple
+    years: np.ndarray
+    business_units: np.ndarray
+    tax: np.ndarray
+    renewable: np.ndarray
+    efficiency: np.ndarray
+    total_emissions: np.ndarray
+    carbon_tax_cost: np.ndarray
+
+    @property
+    def names(self) -> list:
+        return [s.name for s in self.scenarios]
+
+    def totals(self, metric: str = "total_emissions") -> np.ndarray:
+        """Sum a metric over business units, giving a (scenario, year) array."""
+        return getattr(self, metric).sum(axis=-1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per (scenario, year) with the levers and the portfolio totals."""
+        n_scenarios, n_years = self.tax.shape
+        return pd.DataFrame({
+            "Scenario": np.repeat(self.names, n_years),
+            "Year": np.tile(self.years, n_scenarios),
+            "Carbon Tax ($/ton CO2e)": self.tax.ravel(),
+            "Renewable Energy Mix (%)": self.renewable.ravel(),
+            "Efficiency Improvement (%)": self.efficiency.ravel(),
+            "Total Adjusted Emissions": self.totals("total_emissions").ravel(),
+            "Carbon Tax Cost": self.totals("carbon_tax_cost").ravel(),
+        })
+
+    def target_summary(self, target: np.ndarray) -> pd.DataFrame:
+        """
+        Compare each scenario's total emissions with a target trajectory (one value per
+        year): cumulative cost, emissions above target, and years off track.
+        """
+        emissions = self.totals("total_emissions")
+        gap = emissions - np.asarray(target, dtype=np.float64)[None, :]
+        off_track = gap > 1e-9
+        first_off = np.where(off_track.any(axis=1), self.years[np.argmax(off_track, axis=1)], -1)
+        return pd.DataFrame({
+            "Scenario": self.names,
+            f"Emissions {self.years[-1]}": emissions[:, -1],
+            f"Target {self.years[-1]}": np.asarray(target)[-1],
+            "Cumulative Carbon Tax Cost": self.totals("carbon_tax_cost").sum(axis=1),
+            "Cumulative Emissions Above Target": np.clip(gap, 0, None).sum(axis=1),
+            "Years Off Track": off_track.sum(axis=1),
+            "First Year Off Track": pd.array(np.where(first_off < 0, None, first_off), dtype="Int64"),
+        })
+
+
+def project_pathways(df: pd.DataFrame, scenarios, years=None) -> PathwayResult:
+    """
+    Project emissions and carbon tax cost for every business unit, year and scenario as
+    one broadcast computation over a (scenario, year, business unit) tensor, using the
+    calculate_scenario formulas with each year's lever values. `df` may be the dataset
+    or its business_unit_totals (cheaper to reuse). `years` defaults to
+    PATHWAY_START_YEAR..PATHWAY_END_YEAR.
+    """
+    scenarios = tuple(scenarios)
+    if not scenarios:
+        raise ValueError("project_pathways needs at least one scenario")
+    years = pathway_years() if years is None else np.asarray(years)
+    totals = business_unit_totals(df)
+    s1, s2, s3 = scope_arrays(totals)
+
+    # Interpolating the milestones is per scenario; everything after is one array pass
+    tax, renewable, efficiency = (
+        np.stack([schedule_values(getattr(s, lever), years) for s in scenarios]) for lever in PATHWAY_LEVERS
+    )
+    # Axes: (scenario, year, business unit)
+    total = s1 * (1 - efficiency[:, :, None] / 100) + s2 * (1 - renewable[:, :, None] / 100) + s3
+    return PathwayResult(
+        scenarios=scenarios,
+        years=years,
+        business_units=totals["Business Unit"].to_numpy(),
+        tax=tax,
+        renewable=renewable,
+        efficiency=efficiency,
+        total_emissions=total,
+        carbon_tax_cost=total * tax[:, :, None],
+    )
@@ -0,0 +1,175 @@
+"""
+Batch scenario report CLI.
+
+Evaluates every scenario in a spec file against every emissions CSV on a process
+pool, writing one result file per dataset plus a consolidated summary. Datasets are
+streamed chunk by chunk and results are appended to disk as they are produced, so
+memory stays bounded however many or however large the inputs are.
+
+Usage:
+    python scenario_report.py --scenarios scenarios.json --output reports/ data/*.csv
+
+The spec is a JSON list (or {"scenarios": [...]}) of objects, or a CSV, with the
+fields name, carbon_tax, renewable and efficiency.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ingestion import DEFAULT_CHUNKSIZE, iter_csv_chunks
+from tnuva_core import calculate_scenario
+
+SCENARIO_FIELDS = ("name", "carbon_tax", "renewable", "efficiency")
+SUMMARY_FIELDS = [
+    "Dataset", "Scenario", "Carbon Tax ($/ton CO2e)", "Renewable Energy Mix (%)",
+    "Efficiency Improvement (%)", "Rows", "Total Adjusted Emissions", "Carbon Tax Cost",
+    "Result File", "Error",
+]
+
+
+def load_scenarios(path: str) -> list:
+    """
+    Read and validate a scenario spec (JSON or CSV). Returns a list of dicts with
+    the SCENARIO_FIELDS keys and numeric levers.
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            raw = list(csv.DictReader(f))
+        else:
+            raw = json.load(f)
+            if isinstance(raw, dict):
+                raw = raw.get("scenarios", [])
+    if not raw:
+        raise ValueError(f"No scenarios found in {path}")
+
+    scenarios = []
+    for i, item in enumerate(raw):
+        missing = [k for k in SCENARIO_FIELDS if k not in item]
+        if missing:
+            raise ValueError(f"Scenario #{i + 1} is missing field(s): {', '.join(missing)}")
+        scenarios.append({
+            "name": str(item["name"]),
+            "carbon_tax": float(item["carbon_tax"]),
+            "renewable": float(item["renewable"]),
+            "efficiency": float(item["efficiency"]),
+        })
+    return scenarios
+
+
+def result_path(output_dir: str, dataset_path: str, index: int) -> str:
+    """Per-dataset result file; the index keeps same-named inputs from colliding."""
+    stem = os.path.splitext(os.path.basename(dataset_path))[0]
+    return os.path.join(output_dir, f"{index:04d}_{stem}_scenarios.csv")
+
+
+def evaluate_dataset(dataset_path: str, scenarios: list, out_path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> list:
+    """
+    Worker: stream one dataset, evaluate every scenario on each chunk and append the
+    rows to `out_path`. Returns one summary dict per scenario.
+    """
+    totals = {s["name"]: [0, 0.0, 0.0] for s in scenarios}
+    header = True
+    try:
+        with open(out_path, "w", newline="") as out:
+            for chunk, _, _ in iter_csv_chunks(dataset_path, chunksize=chunksize):
+                for scenario in scenarios:
+                    result = calculate_scenario(chunk, scenario["carbon_tax"], scenario["renewable"], scenario["efficiency"])
+                    result.insert(0, "Scenario", scenario["name"])
+                    result.to_csv(out, index=False, header=header)
+                    header = False
+                    acc = totals[scenario["name"]]
+                    acc[0] += len(result)
+                    acc[1] += float(result["Total Adjusted Emissions"].sum())
+                    acc[2] += float(result["Carbon Tax Cost"].sum())
+    except Exception:
+        # Don't leave a partial result file behind for a failed dataset
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+
+    return [
+        {
+            "Dataset": dataset_path,
+            "Scenario": s["name"],
+            "Carbon Tax ($/ton CO2e)": s["carbon_tax"],
+            "Renewable Energy Mix (%)": s["renewable"],
+            "Efficiency Improvement (%)": s["efficiency"],
+            "Rows": totals[s["name"]][0],
+            "Total Adjusted Emissions": totals[s["name"]][1],
+            "Carbon Tax Cost": totals[s["name"]][2],
+            "Result File": out_path,
+            "Error": "",
+        }
+        for s in scenarios
+    ]
+
+
+def run_report(datasets, scenarios, output_dir: str, max_workers=None, chunksize: int = DEFAULT_CHUNKSIZE) -> int:
+    """
+    Evaluate all datasets on a process pool, streaming summary rows to
+    `output_dir/summary.csv` as each dataset finishes. At most twice as many
+    datasets as workers are in flight at once. Returns the number of failed datasets.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max_workers or os.cpu_count() or 1
+    pending_inputs = iter(enumerate(datasets))
+    failures = 0
+
+    with open(os.path.join(output_dir, "summary.csv"), "w", newline="") as summary_file, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = csv.DictWriter(summary_file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        in_flight = {}
+
+        def submit_next():
+            item = next(pending_inputs, None)
+            if item is None:
+                return False
+            index, path = item
+            future = pool.submit(evaluate_dataset, path, scenarios, result_path(output_dir, path, index), chunksize)
+            in_flight[future] = path
+            return True
+
+        while len(in_flight) < 2 * workers and submit_next():
+            pass
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    failures += 1
+                    rows = [{"Dataset": path, "Scenario": s["name"], "Error": f"{type(e).__name__}: {e}"} for s in scenarios]
+                    print(f"Failed: {path}: {e}", file=sys.stderr)
+                writer.writerows(rows)
+                summary_file.flush()
+                submit_next()
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate scenarios for many emissions datasets.")
+    parser.add_argument("datasets", nargs="+", help="Emissions CSV files in the tnuva_scope_data.csv schema.")
+    parser.add_argument("-s", "--scenarios", required=True, help="Scenario spec file (JSON or CSV).")
+    parser.add_argument("-o", "--output", default="scenario_reports", help="Output directory (default: scenario_reports).")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk.")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = load_scenarios(args.scenarios)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    failures = run_report(args.datasets, scenarios, args.output, max_workers=args.workers, chunksize=args.chunksize)
+    print(f"Evaluated {len(args.datasets)} dataset(s) x {len(scenarios)} scenario(s); "
+          f"{failures} failed. Summary: {os.path.join(args.output, 'summary.csv')}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
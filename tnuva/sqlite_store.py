@@ -0,0 +1,32 @@
+"""
+SQLite plumbing shared by the app's persistent stores (TaskStore, DatasetUpdates,
+AuditIndex).
+
+Every operation opens its own short-lived connection in WAL mode, so one store object
+can be shared between Streamlit sessions (which run on separate threads) without
+sharing a connection, and readers are not blocked while another session writes.
+"""
+import hashlib
+import sqlite3
+from contextlib import closing, contextmanager
+
+# Seconds a connection waits for another writer's lock before giving up
+BUSY_TIMEOUT = 30
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of `data`, used to recognise an upload seen before."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class SQLiteStore:
+    """Base for stores kept in the SQLite database at `self.path`."""
+
+    path: str
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commits on success, rolls back on error
+                yield conn
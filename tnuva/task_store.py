@@ -0,0 +1,291 @@
+"""
+Persistent SQLite store for regulations, compliance tasks and manual data entries.
+
+Writes are batched with executemany inside a single transaction, and filters and
+deadline queries run in SQL against indexed columns instead of on Python lists.
+
+Deadline queries (upcoming windows, overdue items, the Gantt slice) are served from
+an in-memory DeadlineIndex: keys sorted by (deadline, id) with the dates parsed once,
+looked up by bisection. It is built from the database on first use and kept in step
+by the store's own writes.
+"""
+import bisect
+import os
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+from sqlite_store import SQLiteStore
+
+DEFAULT_DB_PATH = os.environ.get(
+    "TNUVA_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tnuva_data.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS regulations (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT,
+    status TEXT NOT NULL,
+    deadline TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_regulations_deadline ON regulations (deadline);
+CREATE INDEX IF NOT EXISTS idx_regulations_status ON regulations (status);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    regulation TEXT,
+    status TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    business_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_regulation ON tasks (regulation);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_business_unit ON tasks (business_unit);
+
+CREATE TABLE IF NOT EXISTS manual_entries (
+    id INTEGER PRIMARY KEY,
+    business_unit TEXT NOT NULL,
+    scope1 REAL NOT NULL,
+    scope2 REAL NOT NULL,
+    scope3 REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_manual_entries_business_unit ON manual_entries (business_unit);
+"""
+
+DEFAULT_REGULATIONS = [
+    ("CBAM (Carbon Border Adjustment Mechanism)",
+     "Imposes a carbon tax on imported goods based on their embedded emissions.", "In Compliance", "2025-12-31"),
+    ("ISO 14001 Certification",
+     "Certification for environmental management systems.", "Renewal Due", "2024-06-30"),
+    ("GHG Protocol Verification",
+     "Ensures comprehensive GHG accounting and reporting.", "Completed", "2023-12-15"),
+    ("EU Carbon Reporting",
+     "Mandates detailed carbon reporting for goods exported to the EU.", "Pending Submission", "2024-10-01"),
+    ("Local Water Use Regulation",
+     "Limits industrial water use based on local laws.", "In Progress", "2025-03-31"),
+]
+
+DEFAULT_TASKS = [
+    {"Task": "Prepare CBAM submission", "Regulation": "CBAM", "Status": "Not Started", "Due Date": "2024-10-01"},
+    {"Task": "Schedule ISO 14001 audit", "Regulation": "ISO 14001", "Status": "In Progress", "Due Date": "2024-06-30"},
+    {"Task": "Verify GHG report", "Regulation": "GHG Protocol", "Status": "Completed", "Due Date": "2023-12-15"},
+]
+
+CLOSED_STATUSES = ("Completed", "In Compliance")
+
+TASK_COLUMNS = 'id AS "ID", task AS "Task", regulation AS "Regulation", status AS "Status", ' \
+               'due_date AS "Due Date", business_unit AS "Business Unit"'
+REGULATION_COLUMNS = 'name AS "Regulation Name", description AS "Description", status AS "Status", ' \
+                     'deadline AS "Compliance Deadline"'
+
+
+def _iso(value) -> str:
+    """Normalise a date, datetime or date string to ISO 'YYYY-MM-DD' for indexed comparisons."""
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+class DeadlineIndex:
+    """
+    Records keyed by a stable ID, with a sorted (deadline, id) index. Window and
+    overdue lookups bisect the index, so they cost O(log n + matches).
+    """
+
+    def __init__(self, columns, deadline_column: str):
+        self.columns = list(columns)
+        self.deadline_column = deadline_column
+        self._deadline_pos = self.columns.index(deadline_column)
+        self._keys = []
+        self._rows = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, record_id: int, row: tuple) -> None:
+        """Insert or replace a row (a tuple in `columns` order); its deadline is parsed here, once."""
+        if record_id in self._rows:
+            self.remove(record_id)
+        row = list(row)
+        row[self._deadline_pos] = _to_date(row[self._deadline_pos])
+        self._rows[record_id] = tuple(row)
+        bisect.insort(self._keys, (row[self._deadline_pos], record_id))
+
+    def remove(self, record_id: int) -> None:
+        row = self._rows.pop(record_id, None)
+        if row is not None:
+            key = (row[self._deadline_pos], record_id)
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def ids_between(self, start=None, end=None) -> list:
+        """IDs with a deadline in [start, end] (either bound may be open), soonest first."""
+        lo = 0 if start is None else bisect.bisect_left(self._keys, (_to_date(start), -1))
+        hi = len(self._keys) if end is None else bisect.bisect_right(self._keys, (_to_date(end), float("inf")))
+        return [record_id for _, record_id in self._keys[lo:hi]]
+
+    def ids_before(self, day) -> list:
+        """IDs with a deadline strictly before `day`, soonest first."""
+        hi = bisect.bisect_left(self._keys, (_to_date(day), -1))
+        return [record_id for _, record_id in self._keys[:hi]]
+
+    def frame(self, ids) -> pd.DataFrame:
+        """The rows for `ids` as a DataFrame with an ID column and the deadline as datetimes."""
+        df = pd.DataFrame.from_records([self._rows[i] for i in ids], columns=self.columns)
+        df[self.deadline_column] = pd.to_datetime(df[self.deadline_column])
+        df.insert(0, "ID", pd.Series(ids, dtype="int64"))
+        return df
+
+
+class TaskStore(SQLiteStore):
+    """
+    SQLite-backed store. Tables and indexes are created on first use and the
+    default regulations and tasks are seeded into an empty database.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._task_index = None
+        self._regulation_index = None
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if conn.execute("SELECT COUNT(*) FROM regulations").fetchone()[0] == 0:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO regulations (name, description, status, deadline) VALUES (?, ?, ?, ?)",
+                    DEFAULT_REGULATIONS,
+                )
+            if conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0:
+                self._insert_tasks(conn, DEFAULT_TASKS)
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def _load_index(self, sql: str, deadline_column: str) -> DeadlineIndex:
+        with self._connect() as conn:
+            cursor = conn.execute(sql)
+            columns = [d[0] for d in cursor.description]
+            index = DeadlineIndex(columns[1:], deadline_column)  # the first column is the ID
+            for record_id, *row in cursor:
+                index.add(record_id, row)
+        return index
+
+    def _tasks(self) -> DeadlineIndex:
+        if self._task_index is None:
+            self._task_index = self._load_index(f"SELECT {TASK_COLUMNS} FROM tasks", "Due Date")
+        return self._task_index
+
+    def _regulations(self) -> DeadlineIndex:
+        if self._regulation_index is None:
+            self._regulation_index = self._load_index(
+                f'SELECT id AS "ID", {REGULATION_COLUMNS} FROM regulations', "Compliance Deadline"
+            )
+        return self._regulation_index
+
+    def refresh(self) -> None:
+        """Drop the deadline indexes so they are rebuilt from the database (e.g. after external writes)."""
+        with self._lock:
+            self._task_index = None
+            self._regulation_index = None
+
+    # --------------------------------------------------------------------------
+    # Regulations
+    # --------------------------------------------------------------------------
+    def list_regulations(self) -> pd.DataFrame:
+        return self._query(f"SELECT {REGULATION_COLUMNS} FROM regulations ORDER BY id")
+
+    def upcoming_regulations(self, until) -> pd.DataFrame:
+        """Regulations with a compliance deadline on or before `until`, soonest first."""
+        return self.regulations_between(end=until).drop(columns="ID")
+
+    def regulations_between(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Regulations with a compliance deadline in [start, end], soonest first, with the
+        deadline as a datetime column (e.g. the Gantt chart's window).
+        """
+        with self._lock:
+            index = self._regulations()
+            return index.frame(index.ids_between(start, end))
+
+    # --------------------------------------------------------------------------
+    # Tasks
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _insert_tasks(conn, tasks):
+        conn.executemany(
+            "INSERT INTO tasks (task, regulation, status, due_date, business_unit) VALUES (?, ?, ?, ?, ?)",
+            [
+                (t["Task"], t.get("Regulation"), t["Status"], _iso(t["Due Date"]), t.get("Business Unit"))
+                for t in tasks
+            ],
+        )
+
+    def add_tasks(self, tasks) -> None:
+        """Insert a batch of task dicts (keys as in DEFAULT_TASKS) in one transaction."""
+        with self._lock, self._connect() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+            self._insert_tasks(conn, tasks)
+            if self._task_index is not None:
+                for record_id, *row in conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id > ?", (last_id,)):
+                    self._task_index.add(record_id, row)
+
+    def delete_task(self, task_id: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM tasks WHERE id = ?", (int(task_id),))
+            if self._task_index is not None:
+                self._task_index.remove(int(task_id))
+
+    def overdue_tasks(self, today=None) -> pd.DataFrame:
+        """Tasks due before `today` (default: the current date) that are not completed."""
+        with self._lock:
+            index = self._tasks()
+            overdue = index.frame(index.ids_before(date.today() if today is None else today))
+        return overdue[~overdue["Status"].isin(CLOSED_STATUSES)].reset_index(drop=True)
+
+    def list_tasks(self, status=None, regulation=None, business_unit=None, due_before=None) -> pd.DataFrame:
+        """Tasks ordered by due date, optionally filtered on any indexed column."""
+        clauses, params = [], []
+        for column, value in (("status", status), ("regulation", regulation), ("business_unit", business_unit)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if due_before is not None:
+            clauses.append("due_date <= ?")
+            params.append(_iso(due_before))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._query(f"SELECT {TASK_COLUMNS} FROM tasks {where} ORDER BY due_date, id", params)
+
+    # --------------------------------------------------------------------------
+    # Manual data entries
+    # --------------------------------------------------------------------------
+    def add_entries(self, entries) -> None:
+        """Insert a batch of (business_unit, scope1, scope2, scope3) tuples in one transaction."""
+        created_at = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO manual_entries (business_unit, scope1, scope2, scope3, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(bu, s1, s2, s3, created_at) for bu, s1, s2, s3 in entries],
+            )
+
+    def list_entries(self, business_unit=None) -> pd.DataFrame:
+        sql = (
+            'SELECT business_unit AS "Business Unit", scope1 AS "Scope 1 Emissions (MT CO2e)", '
+            'scope2 AS "Scope 2 Emissions (MT CO2e)", scope3 AS "Scope 3 Emissions (MT CO2e)", '
+            'created_at AS "Entered At" FROM manual_entries'
+        )
+        if business_unit is not None:
+            return self._query(f"{sql} WHERE business_unit = ? ORDER BY id", (business_unit,))
+        return self._query(f"{sql} ORDER BY id")
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The app modules import each other as top-level modules (e.g. `from ingestion import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_updates import DatasetUpdates  # noqa: E402
+from ingestion import NUMERIC_COLUMNS  # noqa: E402
+from portfolio_optimizer import BU_COL, COST_COL, PROJECT_COL, REDUCTION_COL, ROI_COL  # noqa: E402
+
+
+@pytest.fixture
+def make_projects():
+    """Factory for project tables P0, P1, ...; ROI defaults to 10% and the BU column is optional."""
+    def make(costs, reductions, rois=None, units=None):
+        projects = pd.DataFrame({
+            PROJECT_COL: [f"P{i}" for i in range(len(costs))],
+            REDUCTION_COL: np.asarray(reductions, dtype=float),
+            COST_COL: np.asarray(costs, dtype=float),
+            ROI_COL: np.asarray(rois if rois is not None else [10.0] * len(costs), dtype=float),
+        })
+        if units is not None:
+            projects[BU_COL] = units
+        return projects
+    return make
+
+
+@pytest.fixture
+def make_rows():
+    """Factory for emissions rows of (Business Unit, Site, Month, Scope 1); every other measure is 1."""
+    def make(*rows):
+        df = pd.DataFrame(rows, columns=["Business Unit", "Site", "Month", NUMERIC_COLUMNS[0]])
+        for column in NUMERIC_COLUMNS[1:]:
+            df[column] = 1.0
+        return df
+    return make
+
+
+@pytest.fixture
+def random_rows():
+    """Factory for `n` random emissions rows, unique by (Business Unit, Site, Month)."""
+    def make(rng, n, units, sites):
+        df = pd.DataFrame({
+            "Business Unit": rng.choice(units, n),
+            "Site": rng.choice(sites, n),
+            "Month": rng.choice(["2026-01", "2026-02", "2026-03"], n),
+        })
+        for column in NUMERIC_COLUMNS:
+            df[column] = rng.integers(1, 1_000, n).astype(float)
+        return df.drop_duplicates(["Business Unit", "Site", "Month"], ignore_index=True)
+    return make
+
+
+@pytest.fixture
+def updates(tmp_path):
+    return DatasetUpdates(str(tmp_path / "updates.db"))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from abatement_curve import UNIT_COST_COL, AbatementCurve, unit_costs
+from portfolio_optimizer import COST_COL, PROJECT_COL, REDUCTION_COL
+
+
+def assert_same_curve(curve, projects, carbon_tax=50.0):
+    """An incrementally updated curve must equal one built from scratch."""
+    fresh = AbatementCurve(projects, curve.lifetime_years, curve.net_of_returns)
+    pd.testing.assert_frame_equal(curve.curve(carbon_tax), fresh.curve(carbon_tax))
+
+
+def test_curve_is_sorted_by_unit_cost(make_projects):
+    projects = make_projects(costs=[5_000, 1_000, 3_000], reductions=[100, 100, 100])
+
+    curve = AbatementCurve(projects).curve(carbon_tax=40.0)
+
+    assert curve[PROJECT_COL].tolist() == ["P1", "P2", "P0"]
+    assert curve[UNIT_COST_COL].tolist() == [10.0, 30.0, 50.0]
+    assert curve["Cumulative Abatement (MT CO2e)"].tolist() == [100.0, 200.0, 300.0]
+    assert curve["Below Carbon Tax"].tolist() == [True, True, False]
+
+
+def test_projects_without_reduction_are_left_off_the_curve(make_projects):
+    projects = make_projects(costs=[1_000, 2_000], reductions=[0, 100])
+
+    curve = AbatementCurve(projects).curve(carbon_tax=10.0)
+
+    assert curve[PROJECT_COL].tolist() == ["P1"]
+
+
+def test_net_of_returns_subtracts_annual_return():
+    assert unit_costs([1_000], [10], [20], net_of_returns=True)[0] == pytest.approx(80.0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_updates_match_a_rebuilt_curve(make_projects, seed):
+    rng = np.random.default_rng(seed)
+    n = 30
+    # Few distinct values, so ties in cost per ton are common
+    projects = make_projects(
+        costs=rng.integers(1, 6, n) * 1_000, reductions=rng.integers(0, 4, n) * 50, rois=rng.integers(0, 20, n)
+    )
+    curve = AbatementCurve(projects, lifetime_years=5, net_of_returns=True)
+
+    for _ in range(50):
+        row = int(rng.integers(n))
+        cost, reduction = float(rng.integers(1, 6) * 1_000), float(rng.integers(0, 4) * 50)
+        curve.update(row, cost=cost, reduction=reduction)
+        projects.loc[row, [COST_COL, REDUCTION_COL]] = [cost, reduction]
+        assert_same_curve(curve, projects)
+
+
+def test_sync_updates_only_changed_rows(make_projects):
+    projects = make_projects(costs=[1_000, 2_000, 3_000, 4_000], reductions=[100, 100, 100, 100])
+    curve = AbatementCurve(projects)
+
+    edited = projects.copy()
+    edited.loc[0, COST_COL] = 9_000
+    edited.loc[2, PROJECT_COL] = "Renamed"
+
+    assert curve.sync(edited) == 2
+    assert_same_curve(curve, edited)
+    assert curve.sync(edited) == 0
+
+
+def test_sync_treats_missing_values_as_unchanged(make_projects):
+    projects = make_projects(costs=[1_000, 2_000], reductions=[100, 100], rois=[np.nan, 5.0])
+    curve = AbatementCurve(projects)
+
+    assert curve.sync(projects.copy()) == 0
+
+
+def test_sync_rejects_a_different_number_of_rows(make_projects):
+    projects = make_projects(costs=[1_000, 2_000], reductions=[100, 100])
+    curve = AbatementCurve(projects)
+
+    with pytest.raises(ValueError):
+        curve.sync(projects.iloc[:1])
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import audit_index
+from audit_index import AuditIndex, escape_markdown, fts_query, snippet_markdown
+
+
+@pytest.fixture
+def index(tmp_path):
+    return AuditIndex(str(tmp_path / "audit.db"))
+
+
+def add_report(index, sha256, status, uploaded_at, text=None):
+    with index._connect() as conn:
+        report_id = conn.execute(
+            "INSERT INTO reports (sha256, name, size, status, uploaded_at) VALUES (?, 'report.pdf', 1, ?, ?)",
+            (sha256, status, uploaded_at.isoformat(timespec="seconds")),
+        ).lastrowid
+        if text is not None:
+            conn.execute("INSERT INTO report_pages (text, report_id, page) VALUES (?, ?, 1)", (text, report_id))
+
+
+def test_only_stale_pending_reports_are_marked_failed(index):
+    now = datetime.now()
+    add_report(index, "stale", "pending", now - timedelta(minutes=audit_index.STALE_PENDING_MINUTES + 1))
+    add_report(index, "fresh", "pending", now)
+
+    assert index.pending() == 1
+    assert index.failed() == 1
+    # Another instance on the same database leaves the fresh one alone
+    assert AuditIndex(index.path).pending() == 1
+
+
+def test_failed_submit_does_not_stay_pending(index, monkeypatch):
+    def broken_pool():
+        raise RuntimeError("pool is broken")
+
+    monkeypatch.setattr(index, "_executor", broken_pool)
+
+    assert not index.submit("report.pdf", b"%PDF-1.4")
+    assert index.pending() == 0
+    assert "pool is broken" in index.list_reports()["Error"].iloc[0]
+
+
+def test_search_snippets_render_as_literal_markdown(index):
+    add_report(index, "a", "indexed", datetime.now(), text="See [the annex](http://example.com) for *all* findings")
+
+    snippet = index.search("annex")["Snippet"].iloc[0]
+
+    assert snippet_markdown(snippet) == r"See \[the **annex**\]\(http\:\/\/example\.com\) for \*all\* findings"
+
+
+def test_escape_markdown_folds_line_breaks():
+    assert escape_markdown("# Title\n\n- item") == r"\# Title \- item"
+
+
+def test_fts_query_quotes_words_and_prefixes_the_last():
+    assert fts_query('scope "3" OR') == '"scope" "3" "OR"*'
+    assert fts_query("  ") == ""
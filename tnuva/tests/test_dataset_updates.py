@@ -0,0 +1,109 @@
+import pandas as pd
+
+from dataset_updates import apply_updates
+from emissions_cube import EmissionsCube
+from ingestion import NUMERIC_COLUMNS
+from sqlite_store import content_hash
+
+SCOPE1 = NUMERIC_COLUMNS[0]
+
+
+def test_upsert_replaces_by_key(make_rows, updates):
+    assert updates.upsert(make_rows(("Dairy", "A", "2026-01", 10.0), ("Dairy", "B", "2026-01", 20.0))) == 2
+    # The same key with the month written differently is still the same key
+    assert updates.upsert(make_rows(("Dairy", "A", "2026-01-01", 15.0))) == 1
+
+    frame = updates.frame().set_index(["Site", "Month"])
+    assert frame[SCOPE1].to_dict() == {("A", "2026-01"): 15.0, ("B", "2026-01"): 20.0}
+
+
+def test_upsert_keeps_last_row_per_key_and_skips_missing_business_unit(make_rows, updates):
+    written = updates.upsert(make_rows(("Dairy", "A", "2026-01", 1.0), ("Dairy", "A", "2026-01", 2.0), ("", "A", "2026-01", 3.0)))
+
+    assert written == 1
+    assert updates.frame()[SCOPE1].tolist() == [2.0]
+
+
+def test_revision_changes_only_on_writes(make_rows, updates):
+    start = updates.revision()
+    updates.upsert(make_rows(("Dairy", "A", "2026-01", 1.0)))
+    assert updates.revision() == start + 1
+    updates.upsert(make_rows(("", "A", "2026-01", 1.0)))
+    assert updates.revision() == start + 1
+
+
+def test_unpublished_upserts_share_one_revision(make_rows, updates):
+    updates.upsert(make_rows(("Dairy", "A", "2026-01", 1.0)))
+    start = updates.revision()
+    updates.upsert(make_rows(("Dairy", "B", "2026-01", 2.0)), publish=False)
+    updates.upsert(make_rows(("Dairy", "C", "2026-01", 3.0)), publish=False)
+    assert updates.revision() == start
+
+    assert updates.publish() == start + 1
+    revision, changes = updates.changes(since=start)
+    assert revision == start + 1
+    assert changes["Site"].tolist() == ["B", "C"]
+
+
+def test_missing_attributes_keep_earlier_values(make_rows, updates):
+    updates.upsert(make_rows(("Dairy", "A", "2026-01", 1.0)).assign(Region="EU"))
+    updates.upsert(make_rows(("Dairy", "A", "2026-01", 2.0)))
+
+    assert updates.frame()[["Region", SCOPE1]].values.tolist() == [["EU", 2.0]]
+
+
+def test_uploads_are_recorded_by_content_hash(updates):
+    digest = content_hash(b"a,b\n1,2\n")
+    assert not updates.has_upload(digest)
+    updates.record_upload(digest, "upload.csv", 1)
+    assert updates.has_upload(digest)
+
+
+def test_apply_updates_replaces_and_appends(make_rows, updates):
+    base = make_rows(("Dairy", "A", "2026-01", 10.0), ("Meat", "A", "2026-01", 30.0))
+    updates.upsert(make_rows(("Dairy", "A", "2026-01", 12.0), ("Dairy", "C", "2026-02", 5.0)))
+
+    merged = apply_updates(base, updates.frame())
+
+    assert len(merged) == 3
+    assert merged[SCOPE1].tolist() == [12.0, 30.0, 5.0]
+    assert merged["Site"].tolist() == ["A", "A", "C"]
+    # The base frame is left as it was
+    assert base[SCOPE1].tolist() == [10.0, 30.0]
+
+
+def test_apply_updates_without_updates_returns_base(make_rows, updates):
+    base = make_rows(("Dairy", "A", "2026-01", 10.0))
+    assert apply_updates(base, updates.frame()) is base
+
+
+def test_apply_updates_matches_base_rows_without_site_or_month(updates):
+    base = pd.DataFrame({"Business Unit": ["Dairy", "Meat"], **{c: [1.0, 2.0] for c in NUMERIC_COLUMNS}})
+    updates.upsert(base.assign(**{SCOPE1: [7.0, 8.0]}))
+
+    merged = apply_updates(base, updates.frame())
+
+    assert merged[SCOPE1].tolist() == [7.0, 8.0]
+
+
+def test_cube_upsert_replaces_monthly_cells(make_rows):
+    cube = EmissionsCube()
+    cube.ingest(make_rows(("Dairy", "A", "2026-01", 10.0), ("Dairy", "A", "2026-02", 20.0), ("Meat", "A", "2026-01", 5.0)))
+
+    cube.upsert(make_rows(("Dairy", "A", "2026-01", 4.0), ("Dairy", "A", "2026-01", 6.0)), source_id="u1")
+
+    month = cube.query("month", by=("Business Unit", "Period")).set_index(["Business Unit", "Period"])
+    assert month.loc[("Dairy", pd.Period("2026-01", "M")), SCOPE1] == 6.0
+    assert month.loc[("Dairy", pd.Period("2026-02", "M")), SCOPE1] == 20.0
+    quarter = cube.query("quarter").set_index("Business Unit")
+    assert quarter.loc["Dairy", SCOPE1] == 26.0
+    assert quarter.loc["Meat", SCOPE1] == 5.0
+    assert cube.query("year", by=())[SCOPE1].iloc[0] == 31.0
+
+
+def test_cube_upsert_skips_a_source_seen_before(make_rows):
+    cube = EmissionsCube()
+    assert cube.upsert(make_rows(("Dairy", "A", "2026-01", 4.0)), source_id="u1")
+    assert not cube.upsert(make_rows(("Dairy", "A", "2026-01", 9.0)), source_id="u1")
+
+    assert cube.query("year", by=())[SCOPE1].iloc[0] == 4.0
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from emission_factors import FACTOR_TABLE_COLUMNS, FactorTable, activity_emissions
+
+FACTORS = pd.DataFrame(
+    [
+        ("grid", "IL", 2020, 0.50),
+        ("grid", "IL", 2023, 0.40),
+        ("grid", "EU", 2022, 0.25),
+        ("fuel", "Diesel", 2020, 0.003),
+        ("fuel", "LPG", 2020, 0.0015),
+    ],
+    columns=FACTOR_TABLE_COLUMNS,
+)
+
+
+@pytest.fixture
+def factors():
+    return FactorTable(FACTORS)
+
+
+def activity(**columns):
+    n = len(next(iter(columns.values())))
+    return pd.DataFrame({
+        "Business Unit": ["Dairy"] * n,
+        "Fuels Consumption (Liters)": [1_000.0] * n,
+        "Electricity Consumption (MWh)": [10.0] * n,
+        "Scope 1 Emissions (MT CO2e)": [3.0] * n,
+        "Scope 2 Emissions (MT CO2e)": [4.0] * n,
+        **columns,
+    })
+
+
+def test_blank_region_and_fuel_type_fall_back_to_the_defaults(factors):
+    df = activity(Region=["EU", "", "  ", None], **{"Fuel Type": ["", "LPG", None, " "]})
+
+    result = activity_emissions(df, factors, region="IL", fuel_type="Diesel", year=2024)
+
+    assert result["Region"].tolist() == ["EU", "IL", "IL", "IL"]
+    assert result["Fuel Type"].tolist() == ["Diesel", "LPG", "Diesel", "Diesel"]
+    np.testing.assert_allclose(result["Grid Factor (t CO2e/MWh)"], [0.25, 0.40, 0.40, 0.40])
+    assert (result["Status"] != "missing factor").all()
+
+
+def test_lookup_takes_the_latest_year_at_or_before(factors):
+    keys = ["IL", "IL", "IL", "IL", "EU", "EU"]
+    years = [2019, 2020, 2022, 2030, 2021, 2024]
+
+    np.testing.assert_allclose(factors.lookup("grid", keys, years), [np.nan, 0.50, 0.50, 0.40, np.nan, 0.25])
+
+
+def test_lookup_ignores_case_and_spaces_and_misses_unknown_keys(factors):
+    result = factors.lookup("fuel", [" diesel", "LPG ", "Coal", "IL"], [2024] * 4)
+
+    np.testing.assert_allclose(result, [0.003, 0.0015, np.nan, np.nan])
+
+
+def test_lookup_does_not_run_into_the_next_key(factors):
+    # EU's codes sort right after IL's, so a year before EU's first lands on IL's latest factor
+    assert np.isnan(factors.lookup("grid", ["EU"], [2021])[0])
+    assert np.isnan(factors.lookup("grid", ["IL"], [2000])[0])
+
+
+def test_keys_keep_their_display_labels(factors):
+    assert factors.keys("grid") == ["IL", "EU"]
+    assert factors.keys("fuel") == ["Diesel", "LPG"]
+
+
+def test_a_table_without_the_factor_column_is_rejected():
+    with pytest.raises(ValueError, match="Factor"):
+        FactorTable(FACTORS.drop(columns=FACTOR_TABLE_COLUMNS[-1]))
+
+
+def test_activity_status_flags_mismatches_and_missing_factors(factors):
+    df = activity(Region=["IL", "IL", "Mars"], Month=["2023-05", "2023-05", "2023-05"])
+    df.loc[1, "Scope 2 Emissions (MT CO2e)"] = 8.0
+
+    result = activity_emissions(df, factors, tolerance_pct=10.0)
+
+    assert result["Year"].tolist() == [2023, 2023, 2023]
+    np.testing.assert_allclose(result["Calculated Scope 1 (MT CO2e)"], [3.0, 3.0, 3.0])
+    assert result["Status"].tolist() == ["ok", "mismatch", "missing factor"]
@@ -0,0 +1,66 @@
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+import exports
+from exports import available_formats, export_archive, export_file, export_file_name, write_export
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Business Unit": ["Dairy", "Meat", "Snacks", "Beverages", "Plant-Based"],
+        "Carbon Tax Cost": [1.5, 2.0, 3.25, 0.0, 10.0],
+        "Year": [2025, 2026, 2027, 2028, 2029],
+    })
+
+
+def test_file_names_are_slugged_with_the_format_extension():
+    assert export_file_name("Scenario 1 (BU totals)", "csv.gz") == "scenario_1_bu_totals.csv.gz"
+    assert export_file_name("???", "parquet") == "export.parquet"
+
+
+def test_csv_gz_written_in_chunks_reads_back_whole(frame):
+    out = io.BytesIO()
+    write_export(frame, "csv.gz", out, chunksize=2)
+
+    pd.testing.assert_frame_equal(pd.read_csv(io.BytesIO(gzip.decompress(out.getvalue()))), frame)
+
+
+def test_empty_csv_export_keeps_the_header(frame):
+    data = gzip.decompress(export_file(frame.iloc[:0], "csv.gz")).decode()
+
+    assert data.strip() == "Business Unit,Carbon Tax Cost,Year"
+
+
+@pytest.mark.skipif("parquet" not in available_formats(), reason="pyarrow is not installed")
+def test_parquet_written_in_chunks_reads_back_whole(frame):
+    out = io.BytesIO()
+    write_export(frame, "parquet", out, chunksize=2)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(out.getvalue())), frame, check_dtype=False)
+
+
+@pytest.mark.skipif("xlsx" not in available_formats(), reason="no Excel engine is installed")
+def test_excel_refuses_more_rows_than_a_sheet_holds(frame, monkeypatch):
+    monkeypatch.setattr(exports, "EXCEL_MAX_ROWS", 4)
+
+    with pytest.raises(ValueError, match="at most"):
+        export_file(frame, "xlsx")
+
+
+def test_unknown_format_raises(frame):
+    with pytest.raises(ValueError):
+        export_file(frame, "json")
+
+
+def test_archive_holds_one_member_per_frame(frame):
+    data = export_archive({"Scenario 1": frame, "Scenario 2": frame.head(2)}, "csv.gz")
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == ["scenario_1.csv.gz", "scenario_2.csv.gz"]
+        second = pd.read_csv(io.BytesIO(gzip.decompress(archive.read("scenario_2.csv.gz"))))
+    pd.testing.assert_frame_equal(second, frame.head(2))
@@ -0,0 +1,76 @@
+import io
+
+import pandas as pd
+import pytest
+
+from ingestion import EXPECTED_COLUMNS, NUMERIC_COLUMNS, SchemaError, ingest_csv, iter_csv_chunks
+
+SCOPE1 = NUMERIC_COLUMNS[0]
+
+
+def csv_text(rows, columns=EXPECTED_COLUMNS):
+    return io.StringIO(pd.DataFrame(rows, columns=columns).to_csv(index=False))
+
+
+def unit_rows(n):
+    return [[f"BU {i}"] + [float(i)] * len(NUMERIC_COLUMNS) for i in range(n)]
+
+
+def test_chunks_are_coerced_to_the_schema_dtypes():
+    rows = unit_rows(5)
+    rows[1][1] = "twelve"
+    source = csv_text([[" Dairy "] + row[1:] for row in rows])
+
+    chunks = list(iter_csv_chunks(source, chunksize=2))
+
+    assert [len(chunk) for chunk, _, _ in chunks] == [2, 2, 1]
+    first, invalid, extra = chunks[0]
+    assert first["Business Unit"].dtype == "string"
+    assert first["Business Unit"].tolist() == ["Dairy", "Dairy"]
+    assert (first[NUMERIC_COLUMNS].dtypes == "float64").all()
+    assert pd.isna(first[SCOPE1].iloc[1])
+    assert invalid[SCOPE1] == 1
+    assert extra == []
+
+
+def test_optional_and_extra_columns_are_told_apart():
+    columns = EXPECTED_COLUMNS + ["Site", "Comment"]
+    source = csv_text([row + ["A", "checked"] for row in unit_rows(2)], columns)
+
+    chunk, _, extra = next(iter_csv_chunks(source))
+
+    assert chunk["Site"].tolist() == ["A", "A"]
+    assert "Comment" not in chunk.columns
+    assert extra == ["Comment"]
+
+
+def test_missing_columns_raise_a_schema_error_naming_them():
+    columns = [c for c in EXPECTED_COLUMNS if c != SCOPE1]
+    source = csv_text([row[:1] + row[2:] for row in unit_rows(2)], columns)
+
+    with pytest.raises(SchemaError, match="Scope 1 Emissions"):
+        next(iter_csv_chunks(source))
+
+
+def test_schema_error_is_a_value_error():
+    assert issubclass(SchemaError, ValueError)
+
+
+def test_ingest_keeps_totals_and_a_bounded_preview():
+    rows = unit_rows(7)
+    rows[3][0] = None
+    progress = []
+    seen = []
+
+    summary = ingest_csv(
+        csv_text(rows), chunksize=3, preview_rows=4,
+        on_progress=lambda fraction, n: progress.append(n), on_chunk=lambda i, chunk: seen.append((i, len(chunk))),
+    )
+
+    assert (summary.rows, summary.chunks) == (7, 3)
+    assert summary.totals[SCOPE1] == sum(range(7))
+    assert len(summary.preview) == 4
+    assert summary.missing_business_unit == 1
+    assert summary.has_issues
+    assert progress == [3, 6, 7]
+    assert seen == [(0, 3), (1, 3), (2, 1)]
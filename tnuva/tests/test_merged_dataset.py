@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from merged_dataset import ANALYSIS, BU_TOTALS, HISTORY_PROFILE, MergedDataset
+from scenario_engine import business_unit_totals
+from tnuva_core import build_analysis
+from validation import HistoryProfile
+
+
+def compute_derived(dataset):
+    dataset.derived(ANALYSIS, build_analysis)
+    dataset.derived(BU_TOTALS, business_unit_totals)
+    dataset.derived(HISTORY_PROFILE, HistoryProfile.build)
+
+
+def test_refresh_without_new_revision_keeps_the_dataset(random_rows, updates):
+    merged = MergedDataset(random_rows(np.random.default_rng(0), 20, ["Dairy"], ["A", "B"]), updates)
+    assert merged.refresh() is merged.dataset
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_patched_values_match_a_rebuild(random_rows, updates, seed):
+    rng = np.random.default_rng(seed)
+    base = random_rows(rng, 60, ["Dairy", "Meat", "Snacks"], list("ABCDEF"))
+    merged = MergedDataset(base, updates)
+    compute_derived(merged.refresh())
+
+    for upload in range(4):
+        # Replaces some existing keys and adds new sites and a new business unit
+        updates.upsert(random_rows(rng, 15, ["Dairy", "Meat", f"Juice {upload}"], list("ABCDEFXY")), publish=False)
+        updates.publish()
+        dataset = merged.refresh()
+        assert set(dataset.derived_values()) == {ANALYSIS, BU_TOTALS, HISTORY_PROFILE}
+
+        rebuilt = MergedDataset(base, updates).dataset.view()
+        pd.testing.assert_frame_equal(dataset.view(), rebuilt[dataset.columns], check_dtype=False)
+        pd.testing.assert_frame_equal(dataset.derived(BU_TOTALS, None), business_unit_totals(rebuilt))
+        np.testing.assert_allclose(dataset.derived(ANALYSIS, None)["totals"], build_analysis(rebuilt)["totals"])
+
+        profile, expected = dataset.derived(HISTORY_PROFILE, None), HistoryProfile.build(rebuilt)
+        order = profile.business_units.get_indexer(expected.business_units)
+        np.testing.assert_allclose(profile.medians[order], expected.medians)
+        np.testing.assert_allclose(profile.scales[order], expected.scales)
+
+
+def test_each_version_gets_a_new_fingerprint(random_rows, updates):
+    rng = np.random.default_rng(1)
+    merged = MergedDataset(random_rows(rng, 20, ["Dairy"], ["A", "B"]), updates)
+    first = merged.refresh()
+
+    updates.upsert(random_rows(rng, 5, ["Dairy"], ["C"]))
+    second = merged.refresh()
+
+    assert second.fingerprint != first.fingerprint
+    assert len(second) > len(first)
+    # Values not computed for the previous version are left to be built on demand
+    assert second.derived_values() == {}
@@ -0,0 +1,122 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import portfolio_optimizer
+from portfolio_optimizer import (
+    BU_COL,
+    COST_COL,
+    PROJECT_COL,
+    REDUCTION_COL,
+    optimize_portfolio,
+    pareto_frontier,
+)
+
+
+def brute_force(projects, budget, objective="reduction", bu_budgets=None):
+    """Best objective value over every subset that fits the budget and the BU caps."""
+    values = portfolio_optimizer.objective_values(projects, objective)
+    costs = projects[COST_COL].to_numpy(dtype=np.float64)
+    units = projects[BU_COL].to_numpy() if BU_COL in projects.columns else [None] * len(projects)
+    best = 0.0
+    for size in range(1, len(projects) + 1):
+        for subset in itertools.combinations(range(len(projects)), size):
+            subset = list(subset)
+            if costs[subset].sum() > budget:
+                continue
+            spend = {}
+            for i in subset:
+                spend[units[i]] = spend.get(units[i], 0.0) + costs[i]
+            if any(spend.get(bu, 0.0) > cap for bu, cap in (bu_budgets or {}).items() if cap is not None):
+                continue
+            best = max(best, values[subset].sum())
+    return best
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("objective", ["reduction", "roi"])
+def test_exact_matches_brute_force(make_projects, seed, objective):
+    rng = np.random.default_rng(seed)
+    n = 9
+    projects = make_projects(
+        costs=rng.integers(1, 40, n) * 1_000,
+        reductions=rng.integers(1, 5_000, n).astype(float),
+        rois=rng.integers(0, 30, n).astype(float),
+    )
+    budget = float(rng.integers(20, 150) * 1_000)
+
+    result = optimize_portfolio(projects, budget, objective=objective, method="exact")
+
+    assert result.method == "exact"
+    assert result.total_cost <= budget
+    assert result.value == pytest.approx(brute_force(projects, budget, objective))
+    assert result.value <= result.upper_bound + 1e-6
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_exact_respects_business_unit_caps(make_projects, seed):
+    rng = np.random.default_rng(100 + seed)
+    n = 9
+    projects = make_projects(
+        costs=rng.integers(1, 40, n) * 1_000,
+        reductions=rng.integers(1, 5_000, n).astype(float),
+        units=rng.choice(["Dairy", "Meat", "Snacks"], n),
+    )
+    budget = float(rng.integers(40, 150) * 1_000)
+    bu_budgets = {"Dairy": float(rng.integers(0, 40) * 1_000), "Meat": float(rng.integers(0, 40) * 1_000), "Snacks": None}
+
+    result = optimize_portfolio(projects, budget, bu_budgets=bu_budgets, method="exact")
+
+    spend = result.selected.groupby(BU_COL)[COST_COL].sum()
+    for bu, cap in bu_budgets.items():
+        if cap is not None:
+            assert spend.get(bu, 0.0) <= cap
+    assert result.total_cost <= budget
+    assert result.value == pytest.approx(brute_force(projects, budget, bu_budgets=bu_budgets))
+
+
+def test_greedy_stays_within_business_unit_caps(make_projects):
+    projects = make_projects(
+        costs=[10_000, 10_000, 10_000], reductions=[900.0, 800.0, 100.0], units=["Dairy", "Dairy", "Meat"]
+    )
+
+    result = optimize_portfolio(projects, 30_000, bu_budgets={"Dairy": 10_000}, method="greedy")
+
+    assert result.selected[PROJECT_COL].tolist() == ["P0", "P2"]
+
+
+def test_rounded_costs_fall_back_to_greedy(make_projects, monkeypatch):
+    # A coarse DP resolution rounds both costs up (5.2 -> 5 units, 5.3 -> 6 units of 1.05),
+    # so the DP can afford only one of two projects that together fit the budget exactly
+    monkeypatch.setattr(portfolio_optimizer, "DP_MAX_CAPACITY", 10)
+    projects = make_projects(costs=[5.2, 5.3], reductions=[1.0, 1.0])
+
+    result = optimize_portfolio(projects, 10.5, method="exact")
+
+    assert result.method == "greedy"
+    assert result.selected[PROJECT_COL].tolist() == ["P0", "P1"]
+    assert result.total_reduction == 2.0
+
+
+def test_unaffordable_and_valueless_projects_are_skipped(make_projects):
+    projects = make_projects(costs=[50_000, 5_000, 5_000], reductions=[9_000.0, 0.0, 100.0])
+
+    result = optimize_portfolio(projects, 10_000)
+
+    assert result.selected[PROJECT_COL].tolist() == ["P2"]
+
+
+def test_pareto_frontier_matches_brute_force(make_projects):
+    projects = make_projects(costs=[3_000, 4_000, 5_000, 6_000], reductions=[300.0, 500.0, 550.0, 800.0])
+
+    frontier = pareto_frontier(projects, method="exact")
+
+    assert frontier[REDUCTION_COL].is_monotonic_increasing
+    for cost, reduction in frontier.itertuples(index=False, name=None):
+        assert reduction == pytest.approx(brute_force(projects, cost))
+
+
+def test_unknown_method_raises(make_projects):
+    with pytest.raises(ValueError):
+        optimize_portfolio(make_projects(costs=[1_000], reductions=[1.0]), 1_000, method="simplex")
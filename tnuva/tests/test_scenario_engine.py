@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scenario_engine
+from scenario_engine import (
+    MC_MAX_SAMPLES,
+    PathwayScenario,
+    UncertaintySpec,
+    calculate_scenario,
+    evaluate_scenario_grid,
+    pathway_years,
+    project_pathways,
+    run_monte_carlo,
+    scenarios_from_frame,
+    schedule_values,
+)
+from tnuva_core import SCOPE_COLUMNS, sample_data
+
+
+def test_grid_matches_the_scalar_scenario_at_every_point():
+    df = sample_data()
+    taxes, renewables, efficiencies = [0, 50, 120], [0, 35, 100], [0, 12.5]
+
+    grid = evaluate_scenario_grid(df, taxes, renewables, efficiencies)
+
+    assert grid.shape == (3, 3, 2)
+    assert grid.business_units.tolist() == df["Business Unit"].tolist()
+    for i, tax in enumerate(taxes):
+        for j, renewable in enumerate(renewables):
+            for k, efficiency in enumerate(efficiencies):
+                scalar = calculate_scenario(df, tax, renewable, efficiency)
+                np.testing.assert_allclose(grid.total_emissions[i, j, k], scalar["Total Adjusted Emissions"])
+                np.testing.assert_allclose(grid.carbon_tax_cost[i, j, k], scalar["Carbon Tax Cost"])
+
+
+def test_grid_frame_has_one_row_per_point_with_unit_sums():
+    df = sample_data()
+
+    frame = evaluate_scenario_grid(df, [10, 20], [30], [0, 5]).to_frame()
+
+    assert len(frame) == 4
+    point = frame.iloc[3]
+    assert (point["Carbon Tax ($/ton CO2e)"], point["Renewable Energy Mix (%)"], point["Efficiency Improvement (%)"]) == (20, 30, 5)
+    assert point["Carbon Tax Cost"] == pytest.approx(calculate_scenario(df, 20, 30, 5)["Carbon Tax Cost"].sum())
+
+
+def test_grid_accepts_scalar_levers():
+    grid = evaluate_scenario_grid(sample_data(), 50, 30, 10)
+
+    assert grid.shape == (1, 1, 1)
+    assert grid.size == 1
+
+
+def test_monte_carlo_is_reproducible_with_a_fixed_seed():
+    df = sample_data()
+
+    first = run_monte_carlo(df, 50, 30, 10, n_samples=5_000, seed=7)
+    again = run_monte_carlo(df, 50, 30, 10, n_samples=5_000, seed=7)
+    other = run_monte_carlo(df, 50, 30, 10, n_samples=5_000, seed=8)
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first.equals(other)
+
+
+def test_monte_carlo_bands_have_one_row_per_unit_plus_total():
+    df = sample_data()
+
+    bands = run_monte_carlo(df, 50, 30, 10, n_samples=2_000, percentiles=(10, 50, 90))
+
+    assert bands["Business Unit"].tolist() == df["Business Unit"].tolist() + ["TOTAL"]
+    assert bands.columns.tolist()[1:] == [
+        "Total Adjusted Emissions P10", "Total Adjusted Emissions P50", "Total Adjusted Emissions P90",
+        "Carbon Tax Cost P10", "Carbon Tax Cost P50", "Carbon Tax Cost P90",
+    ]
+    for metric in ("Total Adjusted Emissions", "Carbon Tax Cost"):
+        values = bands[[f"{metric} P10", f"{metric} P50", f"{metric} P90"]].to_numpy()
+        assert (np.diff(values, axis=1) >= 0).all()
+
+
+def test_monte_carlo_without_uncertainty_matches_the_scenario():
+    df = sample_data()
+    spec = UncertaintySpec(scope1_pct=0, scope2_pct=0, scope3_pct=0, renewable_pts=0, efficiency_pts=0)
+
+    bands = run_monte_carlo(df, 50, 30, 10, spec=spec, n_samples=100).set_index("Business Unit")
+
+    expected = df.set_index("Business Unit")
+    expected = (
+        expected["Scope 1 Emissions (MT CO2e)"] * 0.9 + expected["Scope 2 Emissions (MT CO2e)"] * 0.7
+        + expected["Scope 3 Emissions (MT CO2e)"]
+    )
+    for p in (5, 50, 95):
+        np.testing.assert_allclose(bands[f"Total Adjusted Emissions P{p}"].drop("TOTAL"), expected)
+        assert bands.loc["TOTAL", f"Carbon Tax Cost P{p}"] == pytest.approx(expected.sum() * 50)
+
+
+def test_monte_carlo_on_a_process_pool_matches_serial(monkeypatch):
+    df = sample_data()
+    monkeypatch.setattr(scenario_engine, "MC_BATCH_SIZE", 1_000)
+    serial = run_monte_carlo(df, 50, 30, 10, n_samples=4_500, seed=3)
+
+    monkeypatch.setattr(scenario_engine, "MC_PARALLEL_THRESHOLD", 2_000)
+    parallel = run_monte_carlo(df, 50, 30, 10, n_samples=4_500, seed=3, max_workers=2)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+@pytest.mark.parametrize("n_samples", [0, MC_MAX_SAMPLES + 1])
+def test_monte_carlo_rejects_sample_counts_out_of_range(n_samples):
+    with pytest.raises(ValueError):
+        run_monte_carlo(sample_data(), 50, 30, 10, n_samples=n_samples)
+
+
+def test_schedule_interpolates_between_milestones_and_holds_the_ends():
+    values = schedule_values(((2030, 100.0), (2026, 20.0)), [2025, 2026, 2028, 2030, 2040])
+
+    np.testing.assert_allclose(values, [20.0, 20.0, 60.0, 100.0, 100.0])
+
+
+def test_pathways_match_the_scalar_scenario_each_year():
+    df = sample_data()
+    scenarios = (
+        PathwayScenario("Flat"),
+        PathwayScenario("Ramp", tax=((2025, 20.0), (2035, 120.0)), renewable=((2025, 0.0), (2030, 80.0))),
+    )
+    years = pathway_years(2025, 2035)
+
+    result = project_pathways(df, scenarios, years)
+
+    assert result.total_emissions.shape == (2, len(years), len(df))
+    for s, scenario in enumerate(scenarios):
+        for y, year in enumerate(years):
+            levers = [schedule_values(getattr(scenario, lever), [year])[0] for lever in ("tax", "renewable", "efficiency")]
+            scalar = calculate_scenario(df, *levers)
+            np.testing.assert_allclose(result.total_emissions[s, y], scalar["Total Adjusted Emissions"])
+            np.testing.assert_allclose(result.carbon_tax_cost[s, y], scalar["Carbon Tax Cost"])
+
+
+def test_pathways_of_rows_equal_pathways_of_unit_totals():
+    df = sample_data()
+    # Split every business unit over two sites
+    rows = pd.concat([df.assign(Site="A"), df.assign(Site="B")], ignore_index=True)
+    rows[SCOPE_COLUMNS] = rows[SCOPE_COLUMNS] / 2
+    scenarios = (PathwayScenario("Ramp", efficiency=((2025, 0.0), (2050, 40.0))),)
+
+    by_rows = project_pathways(rows, scenarios)
+    by_units = project_pathways(df, scenarios)
+
+    assert by_rows.business_units.tolist() == df["Business Unit"].tolist()
+    np.testing.assert_allclose(by_rows.total_emissions, by_units.total_emissions)
+    pd.testing.assert_frame_equal(by_rows.to_frame(), by_units.to_frame())
+
+
+def test_target_summary_counts_years_above_target():
+    df = sample_data()
+    result = project_pathways(df, (PathwayScenario("Flat"),), years=[2025, 2026, 2027])
+    emissions = result.totals("total_emissions")[0]
+    target = np.array([emissions[0] + 1, emissions[1] - 10, emissions[2] - 5])
+
+    summary = result.target_summary(target).iloc[0]
+
+    assert summary["Years Off Track"] == 2
+    assert summary["First Year Off Track"] == 2026
+    assert summary["Cumulative Emissions Above Target"] == pytest.approx(15.0)
+
+
+def test_scenarios_from_frame_reads_milestone_columns():
+    frame = pd.DataFrame({
+        "Scenario": ["Base", " "],
+        "Carbon Tax 2030": [80.0, None],
+        "Carbon Tax 2025": [50.0, None],
+        "Renewable Mix 2025": [40.0, None],
+        "Efficiency 2050": [None, None],
+        "Efficiency 2025": [5.0, None],
+        "Notes": ["ignored", None],
+    })
+
+    (scenario,) = scenarios_from_frame(frame)
+
+    assert scenario == PathwayScenario("Base", tax=((2025, 50.0), (2030, 80.0)), renewable=((2025, 40.0),), efficiency=((2025, 5.0),))
+
+
+def test_scenarios_from_frame_requires_every_lever():
+    frame = pd.DataFrame({"Scenario": ["Base"], "Carbon Tax 2025": [50.0], "Renewable Mix 2025": [40.0]})
+
+    with pytest.raises(ValueError, match="Efficiency"):
+        scenarios_from_frame(frame)
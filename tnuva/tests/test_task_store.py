@@ -0,0 +1,65 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from task_store import DeadlineIndex, TaskStore
+
+
+@pytest.fixture
+def index():
+    index = DeadlineIndex(["Name", "Deadline"], "Deadline")
+    for record_id, name, deadline in [(3, "c", "2026-03-01"), (1, "a", "2026-01-15"), (2, "b", "2026-03-01"), (4, "d", "2025-12-31")]:
+        index.add(record_id, (name, deadline))
+    return index
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TaskStore(str(tmp_path / "tasks.db"))
+
+
+def test_ids_between_is_inclusive_and_ordered_by_deadline_then_id(index):
+    assert index.ids_between("2026-01-15", "2026-03-01") == [1, 2, 3]
+    assert index.ids_between(end=date(2026, 1, 15)) == [4, 1]
+    assert index.ids_between(start=pd.Timestamp("2026-02-01")) == [2, 3]
+    assert index.ids_between() == [4, 1, 2, 3]
+
+
+def test_ids_before_excludes_the_day_itself(index):
+    assert index.ids_before("2026-03-01") == [4, 1]
+    assert index.ids_before("2025-12-31") == []
+
+
+def test_add_replaces_and_remove_drops_a_record(index):
+    index.add(4, ("d", "2026-06-30"))
+    index.remove(1)
+    index.remove(99)  # unknown IDs are ignored
+
+    assert len(index) == 3
+    assert index.ids_between() == [2, 3, 4]
+
+
+def test_frame_has_ids_and_datetime_deadlines(index):
+    frame = index.frame([4, 1])
+
+    assert frame.columns.tolist() == ["ID", "Name", "Deadline"]
+    assert frame["ID"].tolist() == [4, 1]
+    assert frame["Deadline"].tolist() == [pd.Timestamp("2025-12-31"), pd.Timestamp("2026-01-15")]
+
+
+def test_store_writes_keep_the_index_in_step(store):
+    overdue = store.overdue_tasks(today="2030-01-01")
+    assert overdue["Task"].tolist() == ["Schedule ISO 14001 audit", "Prepare CBAM submission"]
+
+    store.add_tasks([{"Task": "File report", "Status": "Not Started", "Due Date": date(2029, 5, 1)}])
+    store.delete_task(int(overdue["ID"].iloc[0]))
+
+    assert store.overdue_tasks(today="2030-01-01")["Task"].tolist() == ["Prepare CBAM submission", "File report"]
+
+
+def test_upcoming_regulations_include_overdue_ones(store):
+    upcoming = store.upcoming_regulations("2024-10-01")
+
+    assert upcoming["Regulation Name"].tolist() == ["GHG Protocol Verification", "ISO 14001 Certification", "EU Carbon Reporting"]
+    assert "ID" not in upcoming.columns
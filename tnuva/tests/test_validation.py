@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingestion import NUMERIC_COLUMNS
+from validation import INTENSITY_COL, MAD_SCALE, HistoryProfile, validate_emissions, validation_counts
+
+SCOPE1, SCOPE2 = NUMERIC_COLUMNS[:2]
+
+# Consistent values: Direct + Indirect = Scope 1 + Scope 2, Supply Chain <= Scope 3
+CLEAN = dict(zip(NUMERIC_COLUMNS, [100.0, 50.0, 500.0, 100.0, 10.0, 100.0, 50.0, 400.0]))
+
+
+def emissions(units, **columns):
+    """Clean rows for `units`, with `columns` (keyword names: the column's first word) overridden."""
+    df = pd.DataFrame({"Business Unit": units, **{c: [v] * len(units) for c, v in CLEAN.items()}})
+    for word, values in columns.items():
+        df[next(c for c in NUMERIC_COLUMNS if c.startswith(word.replace("_", " ")))] = values
+    return df
+
+
+def test_robust_z_uses_median_and_mad_per_business_unit():
+    history = pd.concat([
+        emissions(["Dairy"] * 5, Scope_1=[80.0, 100.0, 120.0, 90.0, 110.0]),
+        emissions(["Meat"] * 3, Scope_1=[1_000.0, 1_000.0, 1_000.0]),
+    ], ignore_index=True)
+    profile = HistoryProfile.build(history)
+
+    z = profile.robust_z(emissions(["Dairy", "Meat", "Snacks"], Scope_1=[130.0, 1_100.0, 5.0]))[SCOPE1]
+
+    # Dairy: median 100, MAD 10
+    assert z.iloc[0] == pytest.approx(30 / (MAD_SCALE * 10))
+    # Meat has MAD 0, so its spread is MIN_SPREAD_PCT (5%) of the median
+    assert z.iloc[1] == pytest.approx(100 / 50)
+    # No history for Snacks
+    assert np.isnan(z.iloc[2])
+
+
+def test_business_units_are_matched_ignoring_surrounding_spaces():
+    profile = HistoryProfile.build(emissions(["Dairy "]))
+
+    assert profile.robust_z(emissions([" Dairy"], Scope_1=[110.0]))[SCOPE1].iloc[0] == pytest.approx(2.0)
+
+
+def test_values_far_from_history_are_flagged():
+    profile = HistoryProfile.build(emissions(["Dairy"] * 3))
+
+    report = validate_emissions(emissions(["Dairy", "Dairy"], Scope_3=[500.0, 5_000.0]), profile)
+
+    assert report["Outlier vs History"].tolist() == [False, True]
+    assert report["Issues"].tolist() == ["", "Outlier vs History"]
+    assert report["Max |Robust Z|"].iloc[1] == pytest.approx(4_500 / 25)
+
+
+def test_scope_mismatch_respects_the_tolerance():
+    # Direct + Indirect is 5% above Scope 1 + Scope 2
+    df = emissions(["Dairy"], Direct=[107.5])
+
+    assert not validate_emissions(df, tolerance_pct=10.0)["Scope Mismatch"].iloc[0]
+    assert validate_emissions(df, tolerance_pct=2.0)["Scope Mismatch"].iloc[0]
+
+
+def test_supply_chain_above_scope_3_is_a_mismatch_beyond_the_tolerance():
+    df = emissions(["Dairy", "Dairy"], Supply_Chain=[540.0, 560.0])
+
+    assert validate_emissions(df, tolerance_pct=10.0)["Scope Mismatch"].tolist() == [False, True]
+
+
+def test_missing_negative_and_intensity_checks():
+    df = emissions(["Dairy", "", "Meat", "Snacks"], Scope_1=[100.0, 100.0, -1.0, 100.0], Electricity=[100.0, 100.0, 100.0, 0.0])
+
+    report = validate_emissions(df)
+
+    assert report["Missing Value"].tolist() == [False, True, False, False]
+    assert report["Negative Value"].tolist() == [False, False, True, False]
+    # Scope 2 emissions without electricity use
+    assert report["Intensity Outlier"].tolist() == [False, False, False, True]
+
+
+def test_intensity_without_history_is_compared_with_the_batch():
+    scope2 = [50.0, 52.0, 48.0, 51.0, 500.0]
+    df = emissions(["A", "B", "C", "D", "E"], Scope_2=scope2, Indirect=scope2)
+
+    report = validate_emissions(df)
+
+    assert report["Intensity Outlier"].tolist() == [False, False, False, False, True]
+
+
+def test_with_units_replaces_and_adds_business_units():
+    profile = HistoryProfile.build(emissions(["Dairy", "Meat"], Scope_1=[100.0, 200.0]))
+    update = HistoryProfile.build(emissions(["Meat", "Snacks"], Scope_1=[300.0, 400.0]))
+
+    merged = profile.with_units(update)
+
+    assert merged.business_units.tolist() == ["Dairy", "Meat", "Snacks"]
+    assert merged.medians[:, merged.metrics.index(SCOPE1)].tolist() == [100.0, 300.0, 400.0]
+    assert INTENSITY_COL in merged.metrics
+
+
+def test_validation_counts_adds_flagged_rows():
+    report = validate_emissions(emissions(["Dairy", "", "Meat"], Scope_1=[100.0, -1.0, 100.0]))
+
+    counts = validation_counts(report)
+
+    assert counts["Missing Value"] == 1
+    assert counts["Negative Value"] == 1
+    assert counts["Flagged Rows"] == 1
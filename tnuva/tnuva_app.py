@@ -1,7 +1,47 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
+import functools
+import io
 import os
+import uuid
+from contextlib import contextmanager, nullcontext
+
+from abatement_curve import DEFAULT_LIFETIME_YEARS, UNIT_COST_COL, AbatementCurve
+from audit_index import AuditIndex, escape_markdown, pdf_extraction_available, snippet_markdown
+from chart_data import DEFAULT_MAX_TIMELINE_ROWS, DEFAULT_TOP_N, monthly_counts, render_mode, soonest, top_n_with_other
+from data_store import file_signature
+from dataset_updates import DatasetUpdates
+from emission_factors import DEFAULT_FACTOR_PATH, FactorTable, activity_emissions, load_factor_table
+from emissions_cube import LEVELS, EmissionsCube
+from exports import ARCHIVE_MIME, FORMATS, available_formats, export_archive, export_file, export_file_name
+from ingestion import DEFAULT_PREVIEW_ROWS, SchemaError, ingest_csv
+from instrumentation import SessionMetrics, env_enabled
+from merged_dataset import ANALYSIS, BU_TOTALS, HISTORY_PROFILE, MergedDataset
+from portfolio_optimizer import METHODS, check_projects, optimize_portfolio, pareto_frontier
+from scenario_engine import DEFAULT_TARGET_MILESTONES, DISTRIBUTIONS, MC_MAX_SAMPLES, PATHWAY_END_YEAR, PATHWAY_START_YEAR, pathway_years
+from sqlite_store import content_hash
+from task_store import TaskStore
+from tnuva_core import (
+    SCOPE_COLUMNS,
+    SharedDataset,
+    UncertaintySpec,
+    build_analysis,
+    business_unit_totals,
+    calculate_scenario,
+    compliance_priority,
+    dataset_fingerprint,
+    deadline_cutoff,
+    evaluate_scenario_grid,
+    gantt_frame,
+    project_pathways,
+    read_tnuva_data,
+    run_monte_carlo,
+    sample_data,
+    scenarios_from_frame,
+    target_trajectory,
+)
+from validation import CHECKS, DEFAULT_TOLERANCE_PCT, HistoryProfile, validate_emissions, validation_counts
 
 # ------------------------------------------------------------------------------
 # Adjust working directory to script's location (so relative paths work properly).
@@ -40,49 +80,355 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# ------------------------------------------------------------------------------
+# Instrumentation (opt-in via the sidebar debug toggle or TNUVA_INSTRUMENTATION=1)
+# ------------------------------------------------------------------------------
+def metrics():
+    """
+    This session's SessionMetrics, or None when instrumentation is switched off.
+    """
+    if not st.session_state.get("debug_instrumentation", env_enabled()):
+        return None
+    if "_metrics" not in st.session_state:
+        st.session_state._metrics = SessionMetrics(session_id=uuid.uuid4().hex[:8])
+    return st.session_state._metrics
+
+@contextmanager
+def timed(name: str):
+    """
+    Time a named section when instrumentation is on. Also usable as a decorator.
+    """
+    m = metrics()
+    with m.section(name) if m else nullcontext():
+        yield
+
+def timed_panel(name: str):
+    """
+    Decorator for fragment panels: times the panel, and when it reruns on its own
+    (a fragment rerun) records that as a rerun of its own.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            m = metrics()
+            if m is None:
+                return fn(*args, **kwargs)
+            with m.rerun(label=name), m.section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def tracked_cache(name: str, cache=st.cache_data, **cache_kwargs):
+    """
+    Like `cache(**cache_kwargs)`, but counts calls and misses (body executions)
+    under `name` so the debug panel can show hit rates.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def on_miss(*args, **kwargs):
+            m = metrics()
+            if m is not None:
+                m.cache_miss(name)
+            return fn(*args, **kwargs)
+
+        cached = cache(**cache_kwargs)(on_miss)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            m = metrics()
+            if m is not None:
+                m.cache_call(name)
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+def show_dataframe(data, **kwargs):
+    with timed("render: dataframe"):
+        return st.dataframe(data, **kwargs)
+
+def show_chart(fig, width="stretch", **kwargs):
+    with timed("render: chart"):
+        return st.plotly_chart(fig, width=width, **kwargs)
+
+def instrumentation_panel():
+    """
+    Debug sidebar panel with rerun, section and cache statistics for this session.
+    """
+    m = metrics()
+    if m is None:
+        return
+    with st.sidebar.expander("Instrumentation", expanded=True):
+        last = f"{m.last_rerun_ms:,.0f} ms" if m.last_rerun_ms is not None else "n/a"
+        peak = f"{m.session_peak_rss_mb:,.0f} MB" if m.session_peak_rss_mb is not None else "n/a"
+        st.metric("Previous rerun", last)
+        st.metric("Session peak memory (RSS)", peak)
+        st.caption(f"Reruns: {m.reruns} | Metrics file: {m.path}")
+        st.write("**Sections**")
+        st.dataframe(pd.DataFrame(m.section_rows()), hide_index=True)
+        st.write("**Caches**")
+        st.dataframe(pd.DataFrame(m.cache_rows()), hide_index=True)
+
 # ------------------------------------------------------------------------------
 # Helper / Cached functions
 # ------------------------------------------------------------------------------
-@st.cache_data
-def load_tnuva_data(file_path: str) -> pd.DataFrame:
+def get_shared_dataset(file_path: str) -> SharedDataset:
     """
-    Load Tnuva's expanded Scope 1, 2, and 3 data from a CSV file.
+    Load Tnuva's expanded Scope 1, 2, and 3 data from a CSV file, via its columnar store,
+    with uploaded updates overlaid, as one read-only handle shared by every session and
+    rerun in the process. The cache is keyed on the file's size and mtime, so a changed
+    file is reloaded; a new upload is applied on the next rerun by MergedDataset, which
+    patches the analysis, BU totals and history profile for just the changed rows.
     If file is not found, returns a sample set.
     """
-    if not os.path.isfile(file_path):
+    signature = file_signature(file_path) if os.path.isfile(file_path) else None
+    return _merged_dataset(file_path, signature).refresh()
+
+@tracked_cache("merged_dataset", cache=st.cache_resource, max_entries=2)
+def _merged_dataset(file_path: str, signature) -> MergedDataset:
+    if signature is None:
         # Return sample data if file does not exist
         st.warning(f"File not found: {file_path}. Using sample data instead.")
-        sample_df = pd.DataFrame({
-            "Business Unit": ["Dairy", "Meat", "Plant-Based", "Beverages", "Snacks"],
-            "Scope 1 Emissions (MT CO2e)": [10000, 8000, 5000, 6000, 4000],
-            "Scope 2 Emissions (MT CO2e)": [3000, 2500, 1500, 1800, 1200],
-            "Scope 3 Emissions (MT CO2e)": [50000, 45000, 30000, 35000, 20000],
-            "Electricity Consumption (MWh)": [20000, 15000, 10000, 12000, 8000],
-            "Fuels Consumption (Liters)": [50000, 60000, 20000, 30000, 25000],
-            "Direct Emissions (MT CO2e)": [5000, 3000, 2500, 2800, 2000],
-            "Indirect Emissions (MT CO2e)": [7000, 4000, 2800, 3200, 2200],
-            "Supply Chain Emissions (MT CO2e)": [35000, 30000, 20000, 25000, 15000]
-        })
-        return sample_df
+        base = sample_data()
+    else:
+        # Load the real data
+        try:
+            base = read_tnuva_data(file_path)
+        except Exception as e:
+            st.error(f"Error reading file: {e}. Using sample data instead.")
+            base = sample_data()
+    return MergedDataset(base, get_dataset_updates())
+
+@tracked_cache("analysis")
+def _cached_analysis(fingerprint: str, _df: pd.DataFrame) -> dict:
+    return build_analysis(_df)
+
+def get_analysis(dataset: SharedDataset) -> dict:
+    """
+    Return the precomputed analysis layer for the dataset, kept on the dataset handle (or
+    cached on its fingerprint) so widget interactions reuse it instead of recomputing
+    totals and intensities.
+    """
+    return dataset.derived(ANALYSIS, lambda df: _cached_analysis(dataset.fingerprint, df))
+
+@tracked_cache("scenario", max_entries=64)
+def cached_scenario(fingerprint: str, tax, renewable, efficiency, _df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Memoized calculate_scenario, keyed on the dataset fingerprint and the scenario levers.
+    """
+    return calculate_scenario(_df, tax, renewable, efficiency)
+
+@tracked_cache("scenario_grid", max_entries=16)
+def cached_scenario_grid(fingerprint: str, tax_range: tuple, renewable_range: tuple, efficiency_range: tuple, _bu_totals: pd.DataFrame):
+    """
+    Scenario grid over per-BU totals, cached by the dataset fingerprint and the three
+    slider ranges so changing only the metric or heatmap slice does not re-evaluate it.
+    """
+    return evaluate_scenario_grid(
+        _bu_totals,
+        np.arange(tax_range[0], tax_range[1] + 1, 10),
+        np.arange(renewable_range[0], renewable_range[1] + 1, 10),
+        np.arange(efficiency_range[0], efficiency_range[1] + 1, 1),
+    )
+
+@tracked_cache("monte_carlo", show_spinner="Running Monte Carlo simulation...")
+def cached_monte_carlo(fingerprint: str, tax, renewable, efficiency, spec: UncertaintySpec, n_samples: int, seed: int, _bu_totals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monte Carlo percentile bands for a scenario, cached by the dataset fingerprint and
+    every input parameter so a rerun that changes nothing does not resample.
+    """
+    return run_monte_carlo(_bu_totals, tax, renewable, efficiency, spec=spec, n_samples=n_samples, seed=seed)
+
+@tracked_cache("business_unit_totals")
+def cached_business_unit_totals(fingerprint: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return business_unit_totals(_df)
+
+def get_business_unit_totals(dataset: SharedDataset) -> pd.DataFrame:
+    """Per-BU scope totals of the dataset, aggregated once per dataset version."""
+    return dataset.derived(BU_TOTALS, lambda df: cached_business_unit_totals(dataset.fingerprint, df))
+
+@tracked_cache("pathways", max_entries=32)
+def cached_pathways(fingerprint: str, scenarios: tuple, start_year: int, end_year: int, _bu_totals: pd.DataFrame):
+    """
+    Multi-year pathway projection, cached by the dataset fingerprint and the scenario
+    definitions (PathwayScenario is hashable), so only a changed set is recomputed.
+    """
+    return project_pathways(_bu_totals, scenarios, pathway_years(start_year, end_year))
+
+@tracked_cache("history_profile")
+def _history_profile(fingerprint: str, _df: pd.DataFrame) -> HistoryProfile:
+    return HistoryProfile.build(_df)
+
+def get_history_profile(dataset: SharedDataset) -> HistoryProfile:
+    """
+    Per-BU medians and robust spreads of the master dataset, which incoming rows are
+    validated against; rebuilt only for the business units an upload changes.
+    """
+    return dataset.derived(HISTORY_PROFILE, lambda df: _history_profile(dataset.fingerprint, df))
+
+@tracked_cache("emissions_cube", cache=st.cache_resource)
+def _emissions_cube(file_path: str, signature) -> EmissionsCube:
+    cube = EmissionsCube()
+    cube.ingest(get_shared_dataset(file_path).view(), source_id=file_path)
+    return cube
+
+def get_emissions_cube(file_path: str) -> EmissionsCube:
+    """
+    The process-wide BU x site x period cube, seeded from the master dataset and
+    rebuilt when that file changes on disk. Uploads are added to it incrementally.
+    """
+    signature = file_signature(file_path) if os.path.isfile(file_path) else None
+    return _emissions_cube(file_path, signature)
+
+@tracked_cache("factor_table", cache=st.cache_resource)
+def _factor_table(file_path: str, signature) -> FactorTable:
+    return load_factor_table(file_path)
+
+def get_factor_table(file_path: str = DEFAULT_FACTOR_PATH) -> FactorTable:
+    """
+    The emission-factor table with its lookup index, built once per process and
+    rebuilt when the factor file changes on disk.
+    """
+    return _factor_table(file_path, file_signature(file_path))
+
+@tracked_cache("uploaded_csv", max_entries=8)
+def _uploaded_csv(file_id: str, _uploaded_file) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(_uploaded_file.getvalue()))
+
+def read_uploaded_csv(uploaded_file) -> pd.DataFrame:
+    """
+    A CSV from st.file_uploader as a DataFrame, parsed once per upload (keyed on its
+    file_id) instead of on every rerun of the fragment that shows it.
+    """
+    return _uploaded_csv(uploaded_file.file_id, uploaded_file)
+
+@tracked_cache("activity_emissions", max_entries=16)
+def cached_activity_emissions(fingerprint: str, factor_signature, region, fuel_type, year, tolerance_pct, _df, _factors) -> pd.DataFrame:
+    """
+    Activity-based Scope 1/2 for a dataset, memoized on its fingerprint, the factor
+    file signature and the defaults used for rows without Region/Fuel Type/Month.
+    """
+    return activity_emissions(_df, _factors, region, fuel_type, year, tolerance_pct)
 
-    # Load the real data
+@st.cache_resource
+def get_dataset_updates() -> DatasetUpdates:
+    """
+    The persistent upsert log for the master dataset, shared by all sessions.
+    """
+    return DatasetUpdates()
+
+@st.cache_resource
+def upload_summaries() -> dict:
+    """
+    Ingest summaries of uploads by content hash, so a file kept in the uploader is parsed
+    only once. A file that failed to ingest maps to its error message instead.
+    """
+    return {}
+
+@st.cache_resource
+def get_audit_index() -> AuditIndex:
+    """
+    One persistent audit report index (and extraction pool) per process, shared by all sessions.
+    """
+    return AuditIndex()
+
+DATE_COLUMN_CONFIG = {
+    "Due Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "Compliance Deadline": st.column_config.DateColumn(format="YYYY-MM-DD"),
+}
+
+
+@st.cache_resource
+def get_task_store() -> TaskStore:
+    """
+    One persistent SQLite store per process, shared by all sessions.
+    """
+    return TaskStore()
+
+@tracked_cache("logo_bytes", cache=st.cache_resource)
+def logo_bytes(path: str):
+    """
+    The image file's bytes, read once per process, or None if it does not exist.
+    """
     try:
-        df = pd.read_csv(file_path)
-        return df
-    except Exception as e:
-        st.error(f"Error reading file: {e}. Using sample data instead.")
-        sample_df = pd.DataFrame({
-            "Business Unit": ["Dairy", "Meat", "Plant-Based", "Beverages", "Snacks"],
-            "Scope 1 Emissions (MT CO2e)": [10000, 8000, 5000, 6000, 4000],
-            "Scope 2 Emissions (MT CO2e)": [3000, 2500, 1500, 1800, 1200],
-            "Scope 3 Emissions (MT CO2e)": [50000, 45000, 30000, 35000, 20000],
-            "Electricity Consumption (MWh)": [20000, 15000, 10000, 12000, 8000],
-            "Fuels Consumption (Liters)": [50000, 60000, 20000, 30000, 25000],
-            "Direct Emissions (MT CO2e)": [5000, 3000, 2500, 2800, 2000],
-            "Indirect Emissions (MT CO2e)": [7000, 4000, 2800, 3200, 2200],
-            "Supply Chain Emissions (MT CO2e)": [35000, 30000, 20000, 25000, 15000]
-        })
-        return sample_df
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def show_logo(path: str, width: int):
+    image = logo_bytes(path)
+    if image is None:
+        st.warning(f"Logo not found in '{path}'.")
+    else:
+        st.image(image, width=width)
+
+def plotly_express():
+    """
+    Import plotly.express on first use, so tabs that draw no chart (and the landing
+    page) never pay for it.
+    """
+    import plotly.express
+
+    return plotly.express
+
+# Figures are cached on a content hash of the (already reduced) chart data plus the view
+# parameters, so a rerun that changes neither reuses the figure instead of rebuilding it
+@tracked_cache("scope_pie_figure", max_entries=32)
+def scope_pie_figure(fingerprint: str, _data: pd.DataFrame):
+    return plotly_express().pie(_data, names="Scope", values="Emissions (MT CO2e)", title="Total Emissions by Scope")
+
+@tracked_cache("hotspots_figure", max_entries=32)
+def hotspots_figure(fingerprint: str, top_n: int, _data: pd.DataFrame):
+    """
+    Grouped Scope 1/2/3 bars per business unit. With more than `top_n` units, the rest
+    are folded into one "Other" bar, so the payload does not grow with the unit count.
+    """
+    return plotly_express().bar(
+        top_n_with_other(_data, "Business Unit", SCOPE_COLUMNS, n=top_n),
+        x="Business Unit",
+        y=SCOPE_COLUMNS,
+        title="Emission Hotspots by Business Unit",
+        labels={"value": "Emissions (MT CO2e)", "variable": "Scope"},
+        barmode="group"
+    )
+
+@tracked_cache("gantt_figure", max_entries=16)
+def gantt_figures(fingerprint: str, today: pd.Timestamp, max_rows: int, _regulations: pd.DataFrame):
+    """
+    The compliance timeline for the `max_rows` soonest deadlines, and, when there are
+    more regulations than that, a chart of all deadlines binned by month (else None).
+    """
+    px = plotly_express()
+    timeline = px.timeline(
+        gantt_frame(soonest(_regulations, "Compliance Deadline", max_rows), now=today),
+        x_start="Start",
+        x_end="End",
+        y="Regulation Name",
+        color="Status",
+        title="Regulation Compliance Timeline",
+        labels={"Status": "Compliance Status"},
+        color_discrete_map={
+            "green": "green",
+            "blue": "blue",
+            "orange": "orange",
+            "yellow": "yellow",
+            "purple": "purple"
+        }
+    )
+    timeline.update_yaxes(categoryorder="total ascending")
+    if len(_regulations) <= max_rows:
+        return timeline, None
+    histogram = px.bar(
+        monthly_counts(_regulations, "Compliance Deadline", "Status"),
+        x="Month",
+        y="Count",
+        color="Status",
+        title="All Compliance Deadlines by Month",
+    )
+    return timeline, histogram
+
 def page_footer():
     """
     Displays a simple footer at the bottom of each page/tab.
@@ -94,6 +440,10 @@ def page_footer():
 # ------------------------------------------------------------------------------
 # Landing Page
 # ------------------------------------------------------------------------------
+_rerun_metrics = metrics()
+if _rerun_metrics is not None:
+    _rerun_metrics.begin_rerun()
+
 if "start" not in st.session_state:
     st.session_state.start = False
 
@@ -101,25 +451,17 @@ if not st.session_state.start:
     # Attempt to load logos on landing
     col_logo1, col_logo2 = st.columns([0.2, 0.2])
     with col_logo1:
-        try:
-            st.image("assests/tnuva_logo.png", width=150)
-        except FileNotFoundError:
-            st.warning("Tnuva logo not found in 'assests/tnuva_logo.png'.")
+        show_logo("assests/tnuva_logo.png", width=150)
 
     with col_logo2:
-        try:
-            st.image("assests/oporto_logo.png", width=150)
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=150)
 
     st.title("Welcome to Tnuva's Environmental Decision Dashboard")
 
-    # Load data once here to check if file is missing
+    # Only check that the data file exists; it is loaded once the dashboard is opened
     csv_data_path = "tnuva_scope_data.csv"
-    data_df = load_tnuva_data(csv_data_path)
-    if data_df.shape[0] > 0 and "Dairy" not in data_df["Business Unit"].values:
-        # This is a naive check for sample data vs. real data
-        st.caption("Real Tnuva data loaded successfully!")
+    if os.path.isfile(csv_data_path):
+        st.caption("Real Tnuva data found and will be loaded when you open the dashboard.")
     else:
         st.caption("File not found: 'tnuva_scope_data.csv'. Using sample data instead.")
 
@@ -165,12 +507,16 @@ if not st.session_state.start:
         """,
         unsafe_allow_html=True
     )
+    if _rerun_metrics is not None:
+        _rerun_metrics.end_rerun(label="landing")
     st.stop()
 # ------------------------------------------------------------------------------
 # Load data for other pages
 # ------------------------------------------------------------------------------
 csv_data_path = "tnuva_scope_data.csv"
-tnuva_data = load_tnuva_data(csv_data_path)
+with timed("load data"):
+    tnuva_dataset = get_shared_dataset(csv_data_path)
+    tnuva_data = tnuva_dataset.view()
 
 # ------------------------------------------------------------------------------
 # Sidebar Navigation
@@ -186,6 +532,7 @@ selected_tab = st.sidebar.radio(
         "data collection"
     ]
 )
+st.sidebar.checkbox("Debug: instrumentation", value=env_enabled(), key="debug_instrumentation")
 # ------------------------------------------------------------------------------
 ####-Tab 1 environmental analysis#####
 # ------------------------------------------------------------------------------
@@ -195,76 +542,126 @@ if selected_tab == "environmental analysis":
     with col1:
         st.subheader("Scope 1, 2, and 3 Emissions Overview")
     with col2:
-        try:
-            st.image("assests/oporto_logo.png", width=200)  # Display Oporto logo
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=200)
 
     st.write("Below is Tnuva’s expanded emissions data, including electricity, fuels, and other details.")
 
-    # Create a total row as a DataFrame
-    total_row = pd.DataFrame({
-        "Business Unit": ["TOTAL"],
-        "Scope 1 Emissions (MT CO2e)": [tnuva_data["Scope 1 Emissions (MT CO2e)"].sum()],
-        "Scope 2 Emissions (MT CO2e)": [tnuva_data["Scope 2 Emissions (MT CO2e)"].sum()],
-        "Scope 3 Emissions (MT CO2e)": [tnuva_data["Scope 3 Emissions (MT CO2e)"].sum()],
-        "Electricity Consumption (MWh)": [tnuva_data["Electricity Consumption (MWh)"].sum()],
-        "Fuels Consumption (Liters)": [tnuva_data["Fuels Consumption (Liters)"].sum()],
-        "Direct Emissions (MT CO2e)": [tnuva_data["Direct Emissions (MT CO2e)"].sum()],
-        "Indirect Emissions (MT CO2e)": [tnuva_data["Indirect Emissions (MT CO2e)"].sum()],
-        "Supply Chain Emissions (MT CO2e)": [tnuva_data["Supply Chain Emissions (MT CO2e)"].sum()],
-    })
-
-    # Append the total row to the main DataFrame using pd.concat()
-    analysis_df = pd.concat([tnuva_data, total_row], ignore_index=True)
-
-    # Display the updated DataFrame
-    st.dataframe(analysis_df)
-
-    # -----------------------------------
-    # Pie chart of total emissions by Scope 1, 2, 3 (using the total row)
-    # -----------------------------------
-    total_scope1 = total_row["Scope 1 Emissions (MT CO2e)"].iloc[0]
-    total_scope2 = total_row["Scope 2 Emissions (MT CO2e)"].iloc[0]
-    total_scope3 = total_row["Scope 3 Emissions (MT CO2e)"].iloc[0]
-
-    pie_df = pd.DataFrame({
-        "Scope": ["Scope 1", "Scope 2", "Scope 3"],
-        "Emissions (MT CO2e)": [total_scope1, total_scope2, total_scope3]
-    })
-
-    st.write("### Total Emissions Distribution")
-    pie_chart = px.pie(
-        pie_df,
-        names="Scope",
-        values="Emissions (MT CO2e)",
-        title="Total Emissions by Scope"
-    )
-    st.plotly_chart(pie_chart, use_container_width=True)
-
-    # -----------------------------------
-    # Emission Intensity Metrics
-    # -----------------------------------
-    st.write("### Emission Intensity Metrics")
-    tnuva_data["Scope 1 Intensity (MT CO2e/MWh)"] = tnuva_data["Scope 1 Emissions (MT CO2e)"] / tnuva_data["Electricity Consumption (MWh)"]
-    tnuva_data["Scope 2 Intensity (MT CO2e/MWh)"] = tnuva_data["Scope 2 Emissions (MT CO2e)"] / tnuva_data["Electricity Consumption (MWh)"]
-
-    st.dataframe(tnuva_data[["Business Unit", "Scope 1 Intensity (MT CO2e/MWh)", "Scope 2 Intensity (MT CO2e/MWh)"]])
+    analysis = get_analysis(tnuva_dataset)
+
+    # Display the data with its TOTAL row
+    show_dataframe(analysis["analysis_df"])
+
+    @st.fragment
+    @timed_panel("emissions_charts_panel")
+    def emissions_charts_panel():
+        # -----------------------------------
+        # Reporting period and site selection (charts query the emissions cube)
+        # -----------------------------------
+        emissions_cube = get_emissions_cube(csv_data_path)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            cube_level = st.selectbox("Reporting level", list(LEVELS), index=2, key="cube_level")
+        with col2:
+            cube_periods = emissions_cube.periods(cube_level)
+            cube_period = st.selectbox("Period", ["All"] + cube_periods, format_func=str, key="cube_period")
+        with col3:
+            cube_sites = st.multiselect("Sites", emissions_cube.sites(), key="cube_sites")
+
+        cube_filters = {
+            "periods": None if cube_period == "All" else [cube_period],
+            "sites": cube_sites or None,
+        }
+        bu_emissions = emissions_cube.query(cube_level, by=("Business Unit",), **cube_filters)
+        scope_totals = bu_emissions[SCOPE_COLUMNS].sum()
+        scope_pie_df = pd.DataFrame({
+            "Scope": ["Scope 1", "Scope 2", "Scope 3"],
+            "Emissions (MT CO2e)": scope_totals.to_numpy(),
+        })
 
-    # -----------------------------------
-    # Hotspots Bar Chart
-    # -----------------------------------
-    st.write("### Emission Hotspots by Business Unit")
-    hotspots_chart = px.bar(
-        tnuva_data,
-        x="Business Unit",
-        y=["Scope 1 Emissions (MT CO2e)", "Scope 2 Emissions (MT CO2e)", "Scope 3 Emissions (MT CO2e)"],
-        title="Emission Hotspots by Business Unit",
-        labels={"value": "Emissions (MT CO2e)", "variable": "Scope"},
-        barmode="group"
-    )
-    st.plotly_chart(hotspots_chart, use_container_width=True)
+        # -----------------------------------
+        # Pie chart of total emissions by Scope 1, 2, 3
+        # -----------------------------------
+        st.write("### Total Emissions Distribution")
+        pie_chart = scope_pie_figure(dataset_fingerprint(scope_pie_df), scope_pie_df)
+        show_chart(pie_chart)
+
+        # -----------------------------------
+        # Emission Intensity Metrics
+        # -----------------------------------
+        st.write("### Emission Intensity Metrics")
+        show_dataframe(analysis["intensity_df"])
+
+        # -----------------------------------
+        # Hotspots Bar Chart
+        # -----------------------------------
+        st.write("### Emission Hotspots by Business Unit")
+        hotspot_data = bu_emissions[["Business Unit", *SCOPE_COLUMNS]]
+        hotspots_chart = hotspots_figure(dataset_fingerprint(hotspot_data), DEFAULT_TOP_N, hotspot_data)
+        if len(hotspot_data) > DEFAULT_TOP_N + 1:
+            st.caption(
+                f"Showing the top {DEFAULT_TOP_N} of {len(hotspot_data):,} business units by total emissions; "
+                "the rest are combined as Other."
+            )
+        show_chart(hotspots_chart)
+
+    emissions_charts_panel()
+
+    @st.fragment
+    @timed_panel("emission_factor_panel")
+    def emission_factor_panel(dataset):
+        # -----------------------------------
+        # Activity-based Scope 1 and 2 (emission factors)
+        # -----------------------------------
+        st.write("### Activity-Based Scope 1 & 2 Check")
+        st.markdown(
+            "Scope 1 is recalculated from fuel consumption and Scope 2 from electricity consumption using the "
+            "local emission-factor table, and compared with the reported figures. Rows without a Region, "
+            "Fuel Type or Month use the defaults below."
+        )
+        try:
+            factors = get_factor_table()
+        except (OSError, ValueError) as e:
+            st.error(f"Could not load the emission-factor table: {e}")
+            return
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            factor_region = st.selectbox("Grid region", factors.keys("grid"), key="factor_region")
+        with col2:
+            factor_fuel = st.selectbox("Fuel type", factors.keys("fuel"), key="factor_fuel")
+        with col3:
+            factor_year = st.number_input(
+                "Reporting year", min_value=2000, max_value=2100, value=pd.Timestamp.now().year, step=1, key="factor_year"
+            )
+        with col4:
+            factor_tolerance = st.slider("Mismatch tolerance (±%)", 0, 50, 10, key="factor_tolerance")
+
+        checked = cached_activity_emissions(
+            dataset.fingerprint, file_signature(DEFAULT_FACTOR_PATH),
+            factor_region, factor_fuel, int(factor_year), factor_tolerance, dataset.view(), factors,
+        )
+        status_counts = checked["Status"].value_counts()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rows Checked", f"{len(checked):,}")
+        col2.metric("Mismatches", f"{status_counts.get('mismatch', 0):,}")
+        col3.metric("Missing Factors", f"{status_counts.get('missing factor', 0):,}")
+        col1, col2 = st.columns(2)
+        col1.metric(
+            "Calculated Scope 1 (MT CO2e)",
+            f"{checked['Calculated Scope 1 (MT CO2e)'].sum():,.0f}",
+            delta=f"{checked['Calculated Scope 1 (MT CO2e)'].sum() - checked['Reported Scope 1 (MT CO2e)'].sum():,.0f} vs reported",
+            delta_color="off",
+        )
+        col2.metric(
+            "Calculated Scope 2 (MT CO2e)",
+            f"{checked['Calculated Scope 2 (MT CO2e)'].sum():,.0f}",
+            delta=f"{checked['Calculated Scope 2 (MT CO2e)'].sum() - checked['Reported Scope 2 (MT CO2e)'].sum():,.0f} vs reported",
+            delta_color="off",
+        )
+        if st.checkbox("Show only rows needing review", value=True, key="factor_issues_only"):
+            checked = checked[checked["Status"] != "ok"]
+        show_dataframe(checked, hide_index=True)
 
+    emission_factor_panel(tnuva_dataset)
     page_footer()
 # ------------------------------------------------------------------------------
 ####-Tab 2 regulatory tracker#####
@@ -273,10 +670,7 @@ if selected_tab == "regulatory tracker":
     # Add the Oporto Carbon logo at the top-right corner
     col1, col2 = st.columns([0.8, 0.2])  # Adjust column width ratios as needed
     with col2:
-        try:
-            st.image("assests/oporto_logo.png", width=200)  # Adjust the width for logo size
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=200)
     st.subheader("Regulations and Compliance")
 
     
@@ -284,79 +678,67 @@ if selected_tab == "regulatory tracker":
     # 1. Regulatory Summary Table
     # -----------------------------------
     st.write("### Regulatory Summary")
-    regulations_data = pd.DataFrame({
-        "Regulation Name": [
-            "CBAM (Carbon Border Adjustment Mechanism)",
-            "ISO 14001 Certification",
-            "GHG Protocol Verification",
-            "EU Carbon Reporting",
-            "Local Water Use Regulation"
-        ],
-        "Description": [
-            "Imposes a carbon tax on imported goods based on their embedded emissions.",
-            "Certification for environmental management systems.",
-            "Ensures comprehensive GHG accounting and reporting.",
-            "Mandates detailed carbon reporting for goods exported to the EU.",
-            "Limits industrial water use based on local laws."
-        ],
-        "Status": [
-            "In Compliance", "Renewal Due", "Completed", "Pending Submission", "In Progress"
-        ],
-        "Compliance Deadline": [
-            "2025-12-31", "2024-06-30", "2023-12-15", "2024-10-01", "2025-03-31"
-        ]
-    })
-    st.dataframe(regulations_data)
-
-    # -----------------------------------
-    # 2. Task Manager
-    # -----------------------------------
-    st.write("### Task Manager")
-    if "tasks" not in st.session_state:
-        st.session_state.tasks = [
-            {"Task": "Prepare CBAM submission", "Regulation": "CBAM", "Status": "Not Started", "Due Date": "2024-10-01"},
-            {"Task": "Schedule ISO 14001 audit", "Regulation": "ISO 14001", "Status": "In Progress", "Due Date": "2024-06-30"},
-            {"Task": "Verify GHG report", "Regulation": "GHG Protocol", "Status": "Completed", "Due Date": "2023-12-15"}
-        ]
-
-    # Display existing tasks
-    task_df = pd.DataFrame(st.session_state.tasks)
-    st.write("#### Current Tasks")
-    st.dataframe(task_df)
-
-    # Add a new task
-    with st.expander("Add a New Task"):
-        task_name = st.text_input("Task Name")
-        regulation = st.selectbox("Associated Regulation", regulations_data["Regulation Name"])
-        status = st.selectbox("Status", ["Not Started", "In Progress", "Completed"])
-        due_date = st.date_input("Due Date")
-        if st.button("Add Task"):
-            new_task = {"Task": task_name, "Regulation": regulation, "Status": status, "Due Date": str(due_date)}
-            st.session_state.tasks.append(new_task)
-            st.success("Task added successfully!")
-
-    # Delete tasks
-    with st.expander("Delete a Task"):
-        delete_task_name = st.selectbox("Select Task to Delete", [t["Task"] for t in st.session_state.tasks])
-        if st.button("Delete Task"):
-            st.session_state.tasks = [t for t in st.session_state.tasks if t["Task"] != delete_task_name]
-            st.success("Task deleted successfully!")
-
+    task_store = get_task_store()
+    regulations_data = task_store.list_regulations()
+    show_dataframe(regulations_data)
+
+    @st.fragment
+    @timed_panel("task_manager_panel")
+    def task_manager_panel():
+        # -----------------------------------
+        # 2. Task Manager
+        # -----------------------------------
+        st.write("### Task Manager")
+
+        # Display existing tasks
+        status_filter = st.selectbox("Filter by Status", ["All", "Not Started", "In Progress", "Completed"], key="task_status_filter")
+        task_df = task_store.list_tasks(status=None if status_filter == "All" else status_filter)
+        st.write("#### Current Tasks")
+        show_dataframe(task_df, hide_index=True)
+
+        overdue_tasks = task_store.overdue_tasks()
+        if not overdue_tasks.empty:
+            st.warning(f"{len(overdue_tasks)} task(s) are past their due date and not completed.")
+            show_dataframe(overdue_tasks, hide_index=True, column_config=DATE_COLUMN_CONFIG)
+
+        # Add a new task
+        with st.expander("Add a New Task"):
+            task_name = st.text_input("Task Name")
+            regulation = st.selectbox("Associated Regulation", regulations_data["Regulation Name"])
+            task_business_unit = st.selectbox("Business Unit", ["(none)"] + tnuva_data["Business Unit"].tolist())
+            status = st.selectbox("Status", ["Not Started", "In Progress", "Completed"])
+            due_date = st.date_input("Due Date")
+            if st.button("Add Task"):
+                new_task = {
+                    "Task": task_name,
+                    "Regulation": regulation,
+                    "Status": status,
+                    "Due Date": due_date,
+                    "Business Unit": None if task_business_unit == "(none)" else task_business_unit,
+                }
+                task_store.add_tasks([new_task])
+                st.success("Task added successfully!")
+
+        # Delete tasks
+        with st.expander("Delete a Task"):
+            all_tasks = task_store.list_tasks()
+            task_labels = dict(zip(all_tasks["ID"], all_tasks["Task"] + " (due " + all_tasks["Due Date"] + ")"))
+            delete_task_id = st.selectbox("Select Task to Delete", list(task_labels), format_func=task_labels.get)
+            if st.button("Delete Task") and delete_task_id is not None:
+                task_store.delete_task(delete_task_id)
+                st.success("Task deleted successfully!")
+
+    task_manager_panel()
     # -----------------------------------
     # 3. Upcoming Deadlines
     # -----------------------------------
     st.write("### Upcoming Deadlines")
-    deadlines = pd.DataFrame({
-        "Regulation Name": regulations_data["Regulation Name"],
-        "Compliance Deadline": pd.to_datetime(regulations_data["Compliance Deadline"]),
-        "Status": regulations_data["Status"]
-    })
 
     # Filter deadlines within the next 6 months
-    upcoming_deadlines = deadlines[deadlines["Compliance Deadline"] <= pd.Timestamp.now() + pd.DateOffset(months=6)]
+    upcoming_deadlines = task_store.upcoming_regulations(deadline_cutoff(months=6))
     if not upcoming_deadlines.empty:
         st.write("#### Deadlines in the Next 6 Months")
-        st.dataframe(upcoming_deadlines)
+        show_dataframe(upcoming_deadlines, column_config=DATE_COLUMN_CONFIG)
     else:
         st.write("No deadlines in the next 6 months.")
 
@@ -364,133 +746,274 @@ if selected_tab == "regulatory tracker":
     # 4. Gantt Chart for Compliance Tracker
     # -----------------------------------
     st.write("### Compliance Timeline (Gantt Chart)")
-    deadlines_for_gantt = regulations_data[["Regulation Name", "Compliance Deadline", "Status"]]
-    deadlines_for_gantt["Start"] = pd.Timestamp.now()
-    deadlines_for_gantt["End"] = pd.to_datetime(deadlines_for_gantt["Compliance Deadline"])
-    deadlines_for_gantt["Status"] = deadlines_for_gantt["Status"].replace(
-        {"Completed": "green", "In Compliance": "blue", "Pending Submission": "orange", "Renewal Due": "yellow", "In Progress": "purple"}
-    )
-
-    fig_gantt = px.timeline(
-        deadlines_for_gantt,
-        x_start="Start",
-        x_end="End",
-        y="Regulation Name",
-        color="Status",
-        title="Regulation Compliance Timeline",
-        labels={"Status": "Compliance Status"},
-        color_discrete_map={
-            "green": "green",
-            "blue": "blue",
-            "orange": "orange",
-            "yellow": "yellow",
-            "purple": "purple"
-        }
+    gantt_horizon = st.select_slider(
+        "Timeline horizon", options=["6 months", "12 months", "24 months", "All"], value="All", key="gantt_horizon"
     )
-    fig_gantt.update_yaxes(categoryorder="total ascending")
-    st.plotly_chart(fig_gantt, use_container_width=True)
-
-    # -----------------------------------
-    # 5. Decision Tool for Compliance
-    # -----------------------------------
-    st.write("### Decision Tool for Compliance Prioritization")
-    regulation_to_review = st.selectbox(
-        "Select a Regulation to Prioritize:",
-        regulations_data["Regulation Name"]
+    # Overdue regulations stay on the timeline; only the far end of the window is cut off
+    gantt_end = None if gantt_horizon == "All" else deadline_cutoff(months=int(gantt_horizon.split()[0]))
+    regulations_for_gantt = task_store.regulations_between(end=gantt_end)
+    fig_gantt, fig_deadline_months = gantt_figures(
+        dataset_fingerprint(regulations_for_gantt), pd.Timestamp.now().normalize(), DEFAULT_MAX_TIMELINE_ROWS, regulations_for_gantt
     )
-    selected_regulation = regulations_data[regulations_data["Regulation Name"] == regulation_to_review]
-    if not selected_regulation.empty:
-        st.write(f"#### Regulation: {regulation_to_review}")
-        st.write(f"**Description**: {selected_regulation['Description'].iloc[0]}")
-        st.write(f"**Status**: {selected_regulation['Status'].iloc[0]}")
-        st.write(f"**Compliance Deadline**: {selected_regulation['Compliance Deadline'].iloc[0]}")
-        if pd.to_datetime(selected_regulation["Compliance Deadline"].iloc[0]) <= pd.Timestamp.now() + pd.DateOffset(months=1):
-            st.warning("This regulation has an urgent deadline within the next month!")
-        elif selected_regulation["Status"].iloc[0] in ["Pending Submission", "Renewal Due"]:
-            st.info("This regulation requires immediate attention due to pending compliance actions.")
-        else:
-            st.success("This regulation is currently in compliance.")
-
+    if fig_deadline_months is not None:
+        st.caption(
+            f"The timeline shows the {DEFAULT_MAX_TIMELINE_ROWS} soonest of {len(regulations_for_gantt):,} deadlines; "
+            "the chart below counts all of them by month."
+        )
+    show_chart(fig_gantt)
+    if fig_deadline_months is not None:
+        show_chart(fig_deadline_months)
+
+    @st.fragment
+    @timed_panel("decision_tool_panel")
+    def decision_tool_panel():
+        # -----------------------------------
+        # 5. Decision Tool for Compliance
+        # -----------------------------------
+        st.write("### Decision Tool for Compliance Prioritization")
+        regulation_to_review = st.selectbox(
+            "Select a Regulation to Prioritize:",
+            regulations_data["Regulation Name"]
+        )
+        selected_regulation = regulations_data[regulations_data["Regulation Name"] == regulation_to_review]
+        if not selected_regulation.empty:
+            st.write(f"#### Regulation: {regulation_to_review}")
+            st.write(f"**Description**: {selected_regulation['Description'].iloc[0]}")
+            st.write(f"**Status**: {selected_regulation['Status'].iloc[0]}")
+            st.write(f"**Compliance Deadline**: {selected_regulation['Compliance Deadline'].iloc[0]}")
+            priority = compliance_priority(
+                selected_regulation["Status"].iloc[0], selected_regulation["Compliance Deadline"].iloc[0]
+            )
+            if priority == "urgent":
+                st.warning("This regulation has an urgent deadline within the next month!")
+            elif priority == "attention":
+                st.info("This regulation requires immediate attention due to pending compliance actions.")
+            else:
+                st.success("This regulation is currently in compliance.")
+
+    decision_tool_panel()
     page_footer()
 # ------------------------------------------------------------------------------
 ####-Tab 3 model simulation#####
 # ------------------------------------------------------------------------------
 elif selected_tab == "model simulation":
+    px = plotly_express()
     # Add the Oporto Carbon logo at the top-right corner
     col1, col2 = st.columns([0.8, 0.2])  # Adjust column width ratios as needed
     with col2:
-        try:
-            st.image("assests/oporto_logo.png", width=200)  # Adjust the width for logo size
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=200)
 
     st.subheader("Scenario Modeling")
 
-    # -----------------------------------
-    # 1. Scenario Input
-    # -----------------------------------
-    st.write("### Define Your Scenarios")
-    st.markdown(
-        "Use the sliders and dropdowns below to define different scenarios and explore their impacts."
-    )
-    col1, col2 = st.columns(2)
-
-    # Scenario 1 Inputs
-    with col1:
-        st.write("#### Scenario 1")
-        carbon_tax_s1 = st.slider("Carbon Tax ($/ton CO2e) - Scenario 1", 0, 150, 50, step=10, key="s1_tax")
-        renewable_energy_s1 = st.slider("Renewable Energy Mix (%) - Scenario 1", 0, 100, 50, step=10, key="s1_renewable")
-        efficiency_gain_s1 = st.slider("Efficiency Improvement (%) - Scenario 1", 0, 30, 10, step=1, key="s1_efficiency")
-
-    # Scenario 2 Inputs
-    with col2:
-        st.write("#### Scenario 2")
-        carbon_tax_s2 = st.slider("Carbon Tax ($/ton CO2e) - Scenario 2", 0, 150, 25, step=10, key="s2_tax")
-        renewable_energy_s2 = st.slider("Renewable Energy Mix (%) - Scenario 2", 0, 100, 75, step=10, key="s2_renewable")
-        efficiency_gain_s2 = st.slider("Efficiency Improvement (%) - Scenario 2", 0, 30, 20, step=1, key="s2_efficiency")
-
-    # -----------------------------------
-    # 2. Scenario Comparison
-    # -----------------------------------
-    st.write("### Scenario Results")
-
-    def calculate_scenario(df, tax, renewable, efficiency):
-        """Helper function to calculate emissions and costs for a scenario."""
-        scenario_df = df.copy()
-        scenario_df["Adjusted Scope 1"] = scenario_df["Scope 1 Emissions (MT CO2e)"] * (1 - efficiency / 100)
-        scenario_df["Adjusted Scope 2"] = scenario_df["Scope 2 Emissions (MT CO2e)"] * (1 - renewable / 100)
-        scenario_df["Adjusted Scope 3"] = scenario_df["Scope 3 Emissions (MT CO2e)"]  # No change in this example
-        scenario_df["Total Adjusted Emissions"] = (
-            scenario_df["Adjusted Scope 1"] + scenario_df["Adjusted Scope 2"] + scenario_df["Adjusted Scope 3"]
+    # Each panel is a fragment: moving one of its widgets reruns only that panel
+    @st.fragment
+    @timed_panel("scenario_comparison_panel")
+    def scenario_comparison_panel(dataset):
+        # -----------------------------------
+        # 1. Scenario Input
+        # -----------------------------------
+        st.write("### Define Your Scenarios")
+        st.markdown(
+            "Use the sliders and dropdowns below to define different scenarios and explore their impacts."
+        )
+        col1, col2 = st.columns(2)
+
+        # Scenario 1 Inputs
+        with col1:
+            st.write("#### Scenario 1")
+            carbon_tax_s1 = st.slider("Carbon Tax ($/ton CO2e) - Scenario 1", 0, 150, 50, step=10, key="s1_tax")
+            renewable_energy_s1 = st.slider("Renewable Energy Mix (%) - Scenario 1", 0, 100, 50, step=10, key="s1_renewable")
+            efficiency_gain_s1 = st.slider("Efficiency Improvement (%) - Scenario 1", 0, 30, 10, step=1, key="s1_efficiency")
+
+        # Scenario 2 Inputs
+        with col2:
+            st.write("#### Scenario 2")
+            carbon_tax_s2 = st.slider("Carbon Tax ($/ton CO2e) - Scenario 2", 0, 150, 25, step=10, key="s2_tax")
+            renewable_energy_s2 = st.slider("Renewable Energy Mix (%) - Scenario 2", 0, 100, 75, step=10, key="s2_renewable")
+            efficiency_gain_s2 = st.slider("Efficiency Improvement (%) - Scenario 2", 0, 30, 20, step=1, key="s2_efficiency")
+
+        # -----------------------------------
+        # 2. Scenario Comparison
+        # -----------------------------------
+        st.write("### Scenario Results")
+
+        # Calculate results for both scenarios (memoized, so only a changed scenario is recomputed)
+        df = dataset.view()
+        results_s1 = cached_scenario(dataset.fingerprint, carbon_tax_s1, renewable_energy_s1, efficiency_gain_s1, df)
+        results_s2 = cached_scenario(dataset.fingerprint, carbon_tax_s2, renewable_energy_s2, efficiency_gain_s2, df)
+
+        # Display results side by side
+        st.write("#### Scenario 1 Results")
+        show_dataframe(results_s1[["Business Unit", "Total Adjusted Emissions", "Carbon Tax Cost"]])
+
+        st.write("#### Scenario 2 Results")
+        show_dataframe(results_s2[["Business Unit", "Total Adjusted Emissions", "Carbon Tax Cost"]])
+
+        # -----------------------------------
+        # 3. Financial Impact Analysis
+        # -----------------------------------
+        st.write("### Financial Impact Analysis")
+
+        # Total Costs for each scenario
+        total_cost_s1 = results_s1["Carbon Tax Cost"].sum()
+        total_cost_s2 = results_s2["Carbon Tax Cost"].sum()
+
+        st.metric(label="Total Cost (Scenario 1)", value=f"${total_cost_s1:,.0f}")
+        st.metric(label="Total Cost (Scenario 2)", value=f"${total_cost_s2:,.0f}", delta=f"${total_cost_s2 - total_cost_s1:,.0f}")
+
+        # -----------------------------------
+        # 4. Dynamic Recommendations
+        # -----------------------------------
+        st.write("### Recommendations")
+
+        if total_cost_s1 < total_cost_s2:
+            st.success(f"Scenario 1 is more cost-effective with a total cost of ${total_cost_s1:,.0f}.")
+            st.info("Consider increasing efficiency improvements to further reduce emissions.")
+        else:
+            st.success(f"Scenario 2 is more cost-effective with a total cost of ${total_cost_s2:,.0f}.")
+            st.info("Consider adopting a higher renewable energy mix to reduce Scope 2 emissions.")
+
+        # -----------------------------------
+        # 5. Export Results
+        # -----------------------------------
+        st.write("### Export Scenario Results")
+        col1, col2 = st.columns(2)
+        with col1:
+            export_option = st.radio("Choose a scenario to export:", ["Scenario 1", "Scenario 2", "All scenarios (zip)"])
+        with col2:
+            export_format = st.selectbox("Format", available_formats(), format_func=lambda f: FORMATS[f].label, key="export_format")
+
+        # The file is only built when the button is clicked, not on every rerun
+        if export_option == "All scenarios (zip)":
+            export_frames = {"Scenario 1": results_s1, "Scenario 2": results_s2}
+            export_data = functools.partial(export_archive, export_frames, export_format)
+            export_name, export_mime = "scenario_results.zip", ARCHIVE_MIME
+        else:
+            export_df = results_s1 if export_option == "Scenario 1" else results_s2
+            export_data = functools.partial(export_file, export_df, export_format)
+            export_name, export_mime = export_file_name(f"{export_option} results", export_format), FORMATS[export_format].mime
+        st.download_button(
+            label=f"Download {FORMATS[export_format].label}",
+            data=export_data,
+            file_name=export_name,
+            mime=export_mime,
         )
-        scenario_df["Carbon Tax Cost"] = scenario_df["Total Adjusted Emissions"] * tax
-        return scenario_df
-
-    # Calculate results for both scenarios
-    results_s1 = calculate_scenario(tnuva_data, carbon_tax_s1, renewable_energy_s1, efficiency_gain_s1)
-    results_s2 = calculate_scenario(tnuva_data, carbon_tax_s2, renewable_energy_s2, efficiency_gain_s2)
-
-    # Display results side by side
-    st.write("#### Scenario 1 Results")
-    st.dataframe(results_s1[["Business Unit", "Total Adjusted Emissions", "Carbon Tax Cost"]])
-
-    st.write("#### Scenario 2 Results")
-    st.dataframe(results_s2[["Business Unit", "Total Adjusted Emissions", "Carbon Tax Cost"]])
-
-    # -----------------------------------
-    # 3. Financial Impact Analysis
-    # -----------------------------------
-    st.write("### Financial Impact Analysis")
-
-    # Total Costs for each scenario
-    total_cost_s1 = results_s1["Carbon Tax Cost"].sum()
-    total_cost_s2 = results_s2["Carbon Tax Cost"].sum()
 
-    st.metric(label="Total Cost (Scenario 1)", value=f"${total_cost_s1:,.0f}")
-    st.metric(label="Total Cost (Scenario 2)", value=f"${total_cost_s2:,.0f}", delta=f"${total_cost_s2 - total_cost_s1:,.0f}")
+    @st.fragment
+    @timed_panel("scenario_grid_panel")
+    def scenario_grid_panel(dataset):
+        # -----------------------------------
+        # 6. Scenario Grid Sweep
+        # -----------------------------------
+        st.write("### Scenario Grid Sweep")
+        st.markdown(
+            "Sweep a range of carbon tax, renewable energy mix and efficiency values. "
+            "Every combination is evaluated for all business units at once."
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            grid_tax_range = st.slider("Carbon Tax range ($/ton CO2e)", 0, 150, (0, 150), step=10, key="grid_tax")
+        with col2:
+            grid_renewable_range = st.slider("Renewable Energy Mix range (%)", 0, 100, (0, 100), step=10, key="grid_renewable")
+        with col3:
+            grid_efficiency_range = st.slider("Efficiency Improvement range (%)", 0, 30, (0, 30), step=1, key="grid_efficiency")
+
+        # The grid is linear in the scope values, so it is evaluated on BU totals rather than raw rows
+        bu_totals = get_business_unit_totals(dataset)
+        grid = cached_scenario_grid(dataset.fingerprint, grid_tax_range, grid_renewable_range, grid_efficiency_range, bu_totals)
+        st.caption(f"Evaluated {grid.size:,} scenarios across {len(grid.business_units)} business units.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            grid_metric = st.selectbox("Metric", ["Carbon Tax Cost", "Total Adjusted Emissions"], key="grid_metric")
+        with col2:
+            grid_efficiency_slice = st.select_slider(
+                "Efficiency Improvement (%) for heatmap", options=grid.efficiencies.astype(int).tolist(), key="grid_efficiency_slice"
+            )
+
+        metric_attr = "carbon_tax_cost" if grid_metric == "Carbon Tax Cost" else "total_emissions"
+        efficiency_index = int(np.searchsorted(grid.efficiencies, grid_efficiency_slice))
+        grid_heatmap = px.imshow(
+            grid.totals(metric_attr)[:, :, efficiency_index],
+            x=grid.renewables,
+            y=grid.taxes,
+            labels={"x": "Renewable Energy Mix (%)", "y": "Carbon Tax ($/ton CO2e)", "color": grid_metric},
+            aspect="auto",
+            origin="lower",
+            color_continuous_scale="YlOrBr",
+            title=f"{grid_metric} at {grid_efficiency_slice}% Efficiency Improvement",
+        )
+        show_chart(grid_heatmap)
+
+    @st.fragment
+    @timed_panel("monte_carlo_panel")
+    def monte_carlo_panel(dataset):
+        # -----------------------------------
+        # 7. Monte Carlo Uncertainty
+        # -----------------------------------
+        st.write("### Monte Carlo Uncertainty")
+        st.markdown(
+            "Sample the Scope 1/2/3 figures and scenario levers from uncertainty ranges to get "
+            "percentile bands instead of a single estimate."
+        )
+        with st.form("monte_carlo_form"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                mc_scenario = st.radio("Base scenario", ["Scenario 1", "Scenario 2"], key="mc_scenario")
+                mc_distribution = st.selectbox("Distribution", DISTRIBUTIONS, key="mc_distribution")
+                mc_samples = st.select_slider(
+                    "Number of samples", options=[10_000, 50_000, 100_000, MC_MAX_SAMPLES], value=100_000, key="mc_samples"
+                )
+                mc_seed = st.number_input("Random seed", min_value=0, value=42, step=1, key="mc_seed")
+            with col2:
+                mc_scope1 = st.slider("Scope 1 uncertainty (±%)", 0, 50, 10, key="mc_scope1")
+                mc_scope2 = st.slider("Scope 2 uncertainty (±%)", 0, 50, 10, key="mc_scope2")
+                mc_scope3 = st.slider("Scope 3 uncertainty (±%)", 0, 50, 20, key="mc_scope3")
+            with col3:
+                mc_tax = st.slider("Carbon tax uncertainty (±%)", 0, 50, 0, key="mc_tax")
+                mc_renewable = st.slider("Renewable mix uncertainty (± pts)", 0, 20, 5, key="mc_renewable")
+                mc_efficiency = st.slider("Efficiency uncertainty (± pts)", 0, 10, 2, key="mc_efficiency")
+            mc_run = st.form_submit_button("Run Simulation")
+
+        if mc_run or "mc_has_run" in st.session_state:
+            st.session_state.mc_has_run = True
+            # Levers come from the scenario sliders, which live in another fragment
+            prefix = "s1" if mc_scenario == "Scenario 1" else "s2"
+            mc_levers = tuple(st.session_state[f"{prefix}_{lever}"] for lever in ("tax", "renewable", "efficiency"))
+            mc_spec = UncertaintySpec(
+                distribution=mc_distribution,
+                scope1_pct=mc_scope1,
+                scope2_pct=mc_scope2,
+                scope3_pct=mc_scope3,
+                tax_pct=mc_tax,
+                renewable_pts=mc_renewable,
+                efficiency_pts=mc_efficiency,
+            )
+            bu_totals = get_business_unit_totals(dataset)
+            mc_results = cached_monte_carlo(
+                dataset.fingerprint, *mc_levers, mc_spec, int(mc_samples), int(mc_seed), bu_totals
+            )
+            st.write(f"#### {mc_scenario}: P5 / P50 / P95 over {mc_samples:,} samples")
+            show_dataframe(mc_results)
+
+            mc_units = mc_results[mc_results["Business Unit"] != "TOTAL"]
+            mc_chart = px.bar(
+                mc_units,
+                x="Business Unit",
+                y="Carbon Tax Cost P50",
+                error_y=mc_units["Carbon Tax Cost P95"] - mc_units["Carbon Tax Cost P50"],
+                error_y_minus=mc_units["Carbon Tax Cost P50"] - mc_units["Carbon Tax Cost P5"],
+                title="Carbon Tax Cost by Business Unit (median with P5–P95 band)",
+                labels={"Carbon Tax Cost P50": "Carbon Tax Cost (USD)"},
+            )
+            show_chart(mc_chart)
+
+    scenario_comparison_panel(tnuva_dataset)
+    scenario_grid_panel(tnuva_dataset)
+    monte_carlo_panel(tnuva_dataset)
 
     # -----------------------------------
-    # 4. Carbon Reduction vs ROI
+    # 8. Carbon Reduction vs ROI
     # -----------------------------------
     st.write("### Carbon Reduction vs ROI")
     projects_data = pd.DataFrame({
@@ -499,7 +1022,7 @@ elif selected_tab == "model simulation":
         "Cost (USD)": [200000, 50000, 120000, 75000],
         "ROI (%)": [15, 20, 10, 18]
     })
-    st.dataframe(projects_data)
+    show_dataframe(projects_data)
 
     project_chart = px.scatter(
         projects_data,
@@ -510,38 +1033,257 @@ elif selected_tab == "model simulation":
         hover_data=["Cost (USD)"],
         title="Carbon Reduction vs ROI"
     )
-    st.plotly_chart(project_chart, use_container_width=True)
+    show_chart(project_chart)
+
+    @st.fragment
+    @timed_panel("abatement_curve_panel")
+    def abatement_curve_panel(default_projects):
+        # -----------------------------------
+        # 8b. Marginal Abatement Cost Curve
+        # -----------------------------------
+        st.write("### Marginal Abatement Cost Curve")
+        st.markdown(
+            "Projects sorted by cost per ton abated; each bar is as wide as the project's reduction. "
+            "Projects below the carbon tax line cost less than paying the tax on the emissions they avoid."
+        )
+        macc_file = st.file_uploader("Candidate projects (CSV)", type=["csv"], key="macc_projects")
+        projects = default_projects
+        if macc_file is not None:
+            projects = read_uploaded_csv(macc_file)
+            try:
+                check_projects(projects)
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            # Its own input: the scenario sliders live in another fragment, whose reruns skip this one
+            carbon_tax = st.slider(
+                "Carbon Tax ($/ton CO2e)", 0, 150, st.session_state.get("s1_tax", 50), step=10, key="macc_tax",
+                help="Starts at Scenario 1's carbon tax.",
+            )
+        with col2:
+            lifetime = st.number_input(
+                "Project lifetime (years)", min_value=1.0, max_value=50.0, value=DEFAULT_LIFETIME_YEARS, step=1.0, key="macc_lifetime",
+                help="Cost is spread over this many years of the (annual) carbon reduction.",
+            )
+        with col3:
+            net_of_returns = st.checkbox("Net of annual return (Cost x ROI)", key="macc_net")
+
+        edited = st.data_editor(
+            projects, hide_index=True, key=f"macc_editor_{macc_file.file_id if macc_file is not None else 'default'}"
+        )
+        # Keep the sorted curve between reruns, so an edit re-inserts only the changed rows
+        params = (macc_file.file_id if macc_file is not None else None, lifetime, net_of_returns)
+        curve = st.session_state.get("macc_curve")
+        if curve is None or st.session_state.get("macc_params") != params or len(curve) != len(edited):
+            curve = AbatementCurve(edited, lifetime, net_of_returns)
+            st.session_state.macc_curve, st.session_state.macc_params = curve, params
+        else:
+            curve.sync(edited)
+        macc = curve.curve(carbon_tax)
+
+        below = macc[macc["Below Carbon Tax"]]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Carbon Tax", f"${carbon_tax:,.0f}/t")
+        col2.metric("Abatement Below Tax", f"{below['Carbon Reduction (MT CO2e)'].sum():,.0f} MT CO2e",
+                    help=f"{len(below):,} of {len(macc):,} projects")
+        col3.metric("Saving vs Paying the Tax", f"${below['Saving vs Carbon Tax (USD)'].sum():,.0f}")
+
+        macc_chart = px.bar(
+            macc,
+            x=macc["Curve Start (MT CO2e)"] + macc["Carbon Reduction (MT CO2e)"] / 2,
+            y=UNIT_COST_COL,
+            hover_data=["Project", "Carbon Reduction (MT CO2e)", "Below Carbon Tax"],
+            labels={"x": "Cumulative Abatement (MT CO2e)"},
+            title="Marginal Abatement Cost Curve (green: cheaper than the carbon tax)",
+        )
+        # One trace, so the per-bar widths line up with the rows
+        macc_chart.update_traces(
+            width=macc["Carbon Reduction (MT CO2e)"].to_numpy(),
+            marker_color=np.where(macc["Below Carbon Tax"], "green", "grey"),
+            marker_line_width=0.5,
+        )
+        macc_chart.add_hline(y=carbon_tax, line_dash="dash", annotation_text=f"Carbon tax ${carbon_tax:,.0f}/t")
+        show_chart(macc_chart)
+        show_dataframe(macc)
+
+    abatement_curve_panel(projects_data)
+
+    @st.fragment
+    @timed_panel("portfolio_optimizer_panel")
+    def portfolio_optimizer_panel(default_projects):
+        # -----------------------------------
+        # 9. Abatement Portfolio Optimizer
+        # -----------------------------------
+        st.write("### Abatement Portfolio Optimizer")
+        st.markdown(
+            "Pick the set of projects that delivers the most carbon reduction (or return) within a budget. "
+            "Upload a candidate list with the columns above, optionally with a Business Unit column for per-unit caps."
+        )
+        projects_file = st.file_uploader("Candidate projects (CSV)", type=["csv"], key="portfolio_projects")
+        projects = default_projects
+        if projects_file is not None:
+            projects = read_uploaded_csv(projects_file)
+            try:
+                check_projects(projects)
+            except ValueError as e:
+                st.error(str(e))
+                return
+        st.caption(f"{len(projects):,} candidate projects, total cost ${projects['Cost (USD)'].sum():,.0f}.")
+
+        total_cost = float(projects["Cost (USD)"].sum())
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            budget = st.number_input(
+                "Budget (USD)", min_value=0.0, value=round(total_cost / 2, -3), step=10_000.0, key="portfolio_budget"
+            )
+        with col2:
+            objective_label = st.radio(
+                "Maximize", ["Carbon Reduction", "Annual Return (Cost x ROI)"], key="portfolio_objective"
+            )
+        with col3:
+            method = st.selectbox("Method", METHODS, key="portfolio_method",
+                                  help="auto uses the exact knapsack solver unless the candidate list is too large.")
+
+        bu_budgets = None
+        if "Business Unit" in projects.columns:
+            st.write("#### Per Business Unit Budget Caps (optional)")
+            caps = st.data_editor(
+                pd.DataFrame({"Business Unit": sorted(projects["Business Unit"].dropna().unique()), "Max Spend (USD)": np.nan}),
+                disabled=["Business Unit"],
+                hide_index=True,
+                key="portfolio_caps",
+            )
+            bu_budgets = {
+                row["Business Unit"]: float(row["Max Spend (USD)"])
+                for _, row in caps.iterrows() if pd.notna(row["Max Spend (USD)"])
+            }
+
+        objective = "reduction" if objective_label == "Carbon Reduction" else "roi"
+        result = optimize_portfolio(projects, budget, objective, bu_budgets or None, method)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Projects Selected", f"{len(result.selected):,}")
+        col2.metric("Total Cost", f"${result.total_cost:,.0f}")
+        col3.metric("Carbon Reduction", f"{result.total_reduction:,.0f} MT CO2e")
+        col4.metric("Annual Return", f"${result.total_return:,.0f}")
+        st.caption(
+            f"Solved with the {result.method} method; within {result.gap_pct:.2f}% of the LP relaxation upper bound."
+        )
+        show_dataframe(result.selected)
+
+        # Cost vs reduction frontier, up to the larger of twice the budget and the chosen portfolio
+        frontier = pareto_frontier(projects, max_budget=min(total_cost, max(2 * budget, result.total_cost)), method=method)
+        frontier_chart = px.line(
+            frontier,
+            x="Cost (USD)",
+            y="Carbon Reduction (MT CO2e)",
+            render_mode=render_mode(len(frontier)),
+            line_shape="hv",
+            title="Pareto Frontier: Cost vs Carbon Reduction",
+        )
+        frontier_chart.add_scatter(
+            x=[result.total_cost],
+            y=[result.total_reduction],
+            mode="markers",
+            marker={"size": 12, "color": "red"},
+            name="Selected portfolio",
+        )
+        frontier_chart.add_vline(x=budget, line_dash="dash", annotation_text="Budget")
+        show_chart(frontier_chart)
+
+    portfolio_optimizer_panel(projects_data)
+
+    @st.fragment
+    @timed_panel("pathway_panel")
+    def pathway_panel(dataset):
+        # -----------------------------------
+        # 10. Decarbonization Pathways
+        # -----------------------------------
+        st.write(f"### Decarbonization Pathways ({PATHWAY_START_YEAR}–{PATHWAY_END_YEAR})")
+        st.markdown(
+            "Project emissions and carbon tax cost for every year. Set each lever at milestone years "
+            "(values in between are interpolated), add rows to compare more pathways, or upload a table "
+            "with the same columns."
+        )
+        pathways_file = st.file_uploader("Pathway scenarios (CSV)", type=["csv"], key="pathway_file")
+        if pathways_file is not None:
+            pathway_table = read_uploaded_csv(pathways_file)
+        else:
+            pathway_table = pd.DataFrame({
+                "Scenario": ["Current Policy", "Accelerated", "Net Zero"],
+                "Carbon Tax 2025": [50, 50, 50],
+                "Carbon Tax 2030": [60, 90, 120],
+                "Carbon Tax 2050": [80, 150, 250],
+                "Renewable Mix 2025": [30, 30, 30],
+                "Renewable Mix 2030": [40, 60, 80],
+                "Renewable Mix 2050": [60, 90, 100],
+                "Efficiency 2025": [5, 5, 5],
+                "Efficiency 2030": [8, 15, 20],
+                "Efficiency 2050": [15, 25, 35],
+            })
+        # A new upload starts a fresh editor rather than carrying over edits to the old table
+        editor_key = f"pathway_table_{pathways_file.file_id if pathways_file is not None else 'default'}"
+        pathway_table = st.data_editor(pathway_table, num_rows="dynamic", hide_index=True, key=editor_key)
+        try:
+            scenarios = scenarios_from_frame(pathway_table)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        if not scenarios:
+            st.info("Add at least one scenario to project.")
+            return
+
+        col1, col2 = st.columns(2)
+        with col1:
+            target_2030 = st.slider("Target reduction by 2030 (% of 2025)", 0, 100, int(100 - DEFAULT_TARGET_MILESTONES[1][1]), key="pathway_target_2030")
+        with col2:
+            target_2050 = st.slider("Target reduction by 2050 (% of 2025)", 0, 100, int(100 - DEFAULT_TARGET_MILESTONES[2][1]), key="pathway_target_2050")
+
+        bu_totals = get_business_unit_totals(dataset)
+        result = cached_pathways(dataset.fingerprint, scenarios, PATHWAY_START_YEAR, PATHWAY_END_YEAR, bu_totals)
+        baseline = float(bu_totals[SCOPE_COLUMNS].to_numpy().sum())
+        target = target_trajectory(
+            baseline, result.years, ((PATHWAY_START_YEAR, 100.0), (2030, 100.0 - target_2030), (2050, 100.0 - target_2050))
+        )
+        st.caption(
+            f"Projected {len(scenarios)} pathways x {len(result.years)} years x {len(result.business_units)} business units."
+        )
 
-    # -----------------------------------
-    # 5. Dynamic Recommendations
-    # -----------------------------------
-    st.write("### Recommendations")
+        pathway_frame = result.to_frame()
+        pathway_metric = st.radio("Metric", ["Total Adjusted Emissions", "Carbon Tax Cost"], horizontal=True, key="pathway_metric")
+        pathway_chart = px.line(
+            pathway_frame, x="Year", y=pathway_metric, color="Scenario", title=f"{pathway_metric} by Pathway",
+            render_mode=render_mode(len(pathway_frame)),
+        )
+        if pathway_metric == "Total Adjusted Emissions":
+            pathway_chart.add_scatter(x=result.years, y=target, mode="lines", line={"dash": "dash", "color": "black"}, name="Target")
+        show_chart(pathway_chart)
 
-    if total_cost_s1 < total_cost_s2:
-        st.success(f"Scenario 1 is more cost-effective with a total cost of ${total_cost_s1:,.0f}.")
-        st.info("Consider increasing efficiency improvements to further reduce emissions.")
-    else:
-        st.success(f"Scenario 2 is more cost-effective with a total cost of ${total_cost_s2:,.0f}.")
-        st.info("Consider adopting a higher renewable energy mix to reduce Scope 2 emissions.")
+        st.write("#### Pathways vs Target")
+        show_dataframe(result.target_summary(target))
 
-    # -----------------------------------
-    # 6. Export Results
-    # -----------------------------------
-    st.write("### Export Scenario Results")
-    export_option = st.radio("Choose a scenario to export:", ["Scenario 1", "Scenario 2"])
+        pathway_scenario = st.selectbox("Business unit breakdown for", result.names, key="pathway_breakdown")
+        breakdown = pd.DataFrame(
+            result.total_emissions[result.names.index(pathway_scenario)], index=result.years, columns=result.business_units
+        )
+        breakdown_chart = px.area(
+            breakdown, labels={"index": "Year", "value": "Total Adjusted Emissions", "variable": "Business Unit"},
+            title=f"{pathway_scenario}: Emissions by Business Unit",
+        )
+        show_chart(breakdown_chart)
+
+        st.download_button(
+            label="Download Pathways (CSV, gzip)",
+            data=functools.partial(export_file, pathway_frame, "csv.gz"),
+            file_name=export_file_name("decarbonization pathways", "csv.gz"),
+            mime=FORMATS["csv.gz"].mime,
+            key="pathway_download",
+        )
 
-    if export_option == "Scenario 1":
-        export_df = results_s1
-    else:
-        export_df = results_s2
-
-    export_csv = export_df.to_csv(index=False)
-    st.download_button(
-        label="Download CSV",
-        data=export_csv,
-        file_name=f"{export_option}_results.csv",
-        mime="text/csv",
-    )
+    pathway_panel(tnuva_dataset)
 
     page_footer()
 # ------------------------------------------------------------------------------
@@ -552,10 +1294,7 @@ elif selected_tab == "audit assurance":
     # Add the Oporto Carbon logo at the top-right corner
     col1, col2 = st.columns([0.8, 0.2])  # Adjust column width ratios as needed
     with col2:
-        try:
-            st.image("assests/oporto_logo.png", width=200)  # Adjust the width for logo size
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=200)
 
     st.subheader("Audit & Assurance")
     st.write("Overview of internal and external audits, plus verification of Tnuva’s environmental data.")
@@ -568,10 +1307,56 @@ elif selected_tab == "audit assurance":
     - **GHG Protocol Verification**: Completed Q4 2024  
     """)
 
-    uploaded_file = st.file_uploader("Upload your recent audit report (PDF)", type=["pdf"])
-    if uploaded_file:
-        st.success("File uploaded successfully!")
-
+    audit_index = get_audit_index()
+    uploaded_files = st.file_uploader("Upload your recent audit reports (PDF)", type=["pdf"], accept_multiple_files=True)
+    if uploaded_files:
+        if not pdf_extraction_available():
+            st.warning("Text extraction needs the 'pypdf' package; reports will be stored as failed until it is installed.")
+        # Every full rerun sees the same uploads again; submit each one once per session
+        submitted = st.session_state.setdefault("audit_submitted", set())
+        new_files = [f for f in uploaded_files if f.file_id not in submitted]
+        queued = sum(audit_index.submit(f.name, f.getvalue()) for f in new_files)
+        submitted.update(f.file_id for f in new_files)
+        if queued:
+            st.success(f"{queued} report(s) uploaded and queued for text extraction.")
+        if audit_index.failed() and st.button("Retry failed extractions", key="audit_retry"):
+            retried = sum(audit_index.submit(f.name, f.getvalue(), retry_failed=True) for f in uploaded_files)
+            if retried:
+                st.success(f"{retried} report(s) queued again for text extraction.")
+
+    # Poll only while extractions are pending, so indexed reports show up without a manual refresh
+    audit_polling = audit_index.pending() > 0
+
+    @st.fragment(run_every="2s" if audit_polling else None)
+    @timed_panel("audit_reports_panel")
+    def audit_reports_panel():
+        st.write("### Stored Audit Reports")
+        reports = audit_index.list_reports()
+        pending = int((reports["Status"] == "pending").sum())
+        if pending:
+            st.info(f"Extracting text from {pending} report(s) in the background...")
+        elif audit_polling:
+            st.rerun()  # everything is indexed: a full rerun stops the polling
+        show_dataframe(reports, hide_index=True)
+
+    @st.fragment
+    @timed_panel("audit_search_panel")
+    def audit_search_panel():
+        st.write("### Search Audit Reports")
+        audit_query = st.text_input(
+            "Search findings, regulation names or business units across all stored reports", key="audit_query"
+        )
+        if audit_query:
+            matches = audit_index.search(audit_query)
+            if matches.empty:
+                st.write("No matching pages.")
+            else:
+                st.caption(f"{len(matches)} matching page(s), best matches first.")
+                for match in matches.itertuples(index=False):
+                    st.markdown(f"**{escape_markdown(match.Report)}**, page {match.Page}: {snippet_markdown(match.Snippet)}")
+
+    audit_reports_panel()
+    audit_search_panel()
     page_footer()
 
 # ------------------------------------------------------------------------------
@@ -582,31 +1367,148 @@ elif selected_tab == "data collection":
     # Add the Oporto Carbon logo at the top-right corner
     col1, col2 = st.columns([0.8, 0.2])  # Adjust column width ratios as needed
     with col2:
-        try:
-            st.image("assests/oporto_logo.png", width=200)  # Adjust the width for logo size
-        except FileNotFoundError:
-            st.warning("Oporto logo not found in 'assests/oporto_logo.png'.")
+        show_logo("assests/oporto_logo.png", width=200)
 
     st.subheader("Data Collection & Management")
     st.write("Gather new environmental data, update existing datasets, or integrate with external data sources.")
     
 
 
-    new_data_file = st.file_uploader("Upload new Tnuva emissions data (CSV)", type=["csv"])
-    if new_data_file:
-        df_new = pd.read_csv(new_data_file)
-        st.write("Preview of new data:")
-        st.dataframe(df_new)
-        st.success("Data uploaded successfully.")
-
-    st.write("**Manual Entry Form**")
-    business_unit = st.text_input("Business Unit")
-    scope1_val = st.number_input("Scope 1 (MT CO2e)", min_value=0, value=0, step=100)
-    scope2_val = st.number_input("Scope 2 (MT CO2e)", min_value=0, value=0, step=100)
-    scope3_val = st.number_input("Scope 3 (MT CO2e)", min_value=0, value=0, step=100)
-
-    if st.button("Add Entry"):
-        st.success(f"Added entry for {business_unit} | S1={scope1_val} | S2={scope2_val} | S3={scope3_val}")
-        # In a real app, you'd append to a DataFrame or database here
+    @st.fragment
+    @timed_panel("upload_panel")
+    def upload_panel():
+        col1, col2 = st.columns(2)
+        with col1:
+            # Off by default: the scope breakdowns of real exports rarely add up exactly
+            hold_back = st.checkbox(
+                "Hold back rows that fail validation", value=False, key="upload_hold_back",
+                help="Flagged rows are reported but not merged; correct them and upload them again.",
+            )
+        with col2:
+            tolerance = st.slider(
+                "Scope mismatch tolerance (±%)", 0, 100, int(DEFAULT_TOLERANCE_PCT), key="validation_tolerance",
+                help="How far Direct + Indirect may differ from Scope 1 + Scope 2 before a row is flagged.",
+            )
+        new_data_file = st.file_uploader("Upload new Tnuva emissions data (CSV)", type=["csv"])
+        if new_data_file:
+            digest = content_hash(new_data_file.getvalue())
+            summaries = upload_summaries()
+            dataset_updates = get_dataset_updates()
+            cached = summaries.get(digest)
+            if isinstance(cached, str):
+                # A file that failed part-way is not parsed (or merged) again
+                st.error(cached)
+                return
+            if cached is None and dataset_updates.has_upload(digest):
+                st.info("This file has already been merged into the master dataset.")
+                return
+            if cached is None:
+                progress_bar = st.progress(0.0, text="Reading uploaded file...")
+
+                def report_progress(fraction, rows):
+                    progress_bar.progress(fraction if fraction is not None else 0.0, text=f"Read {rows:,} rows...")
+
+                emissions_cube = get_emissions_cube(csv_data_path)
+                profile = get_history_profile(tnuva_dataset)
+                validation = {"counts": pd.Series(0, index=[*CHECKS, "Flagged Rows"]), "flagged": [], "held_back": 0, "merged": 0}
+
+                def merge_chunk(index, chunk):
+                    # Validate against the master dataset's history before anything is merged
+                    report = validate_emissions(chunk, profile, tolerance_pct=tolerance)
+                    validation["counts"] += validation_counts(report)
+                    flagged = report["Issues"] != ""
+                    shown = sum(len(part) for part in validation["flagged"])
+                    if flagged.any() and shown < DEFAULT_PREVIEW_ROWS:
+                        validation["flagged"].append(report[flagged].head(DEFAULT_PREVIEW_ROWS - shown))
+                    if hold_back:
+                        validation["held_back"] += int(flagged.sum())
+                        chunk = chunk[~flagged.to_numpy()]
+                    # Upsert into the master dataset and replace just the affected cube cells
+                    # Published once the whole file is in, so readers see one new revision
+                    dataset_updates.upsert(chunk, source_sha256=digest, publish=False)
+                    emissions_cube.upsert(chunk, source_id=(digest, index))
+                    validation["merged"] += len(chunk)
+
+                if len(summaries) >= 64:
+                    summaries.pop(next(iter(summaries)))
+                try:
+                    summary = ingest_csv(new_data_file, on_progress=report_progress, on_chunk=merge_chunk)
+                except (SchemaError, ValueError, pd.errors.ParserError) as e:
+                    progress_bar.empty()
+                    message = f"Could not ingest file: {e}"
+                    if validation["merged"]:
+                        # Earlier chunks are already merged; record the file so they are not merged again
+                        dataset_updates.record_upload(digest, new_data_file.name, validation["merged"])
+                        dataset_updates.publish()
+                        message += f" The first {validation['merged']:,} row(s) were merged before the error."
+                    summaries[digest] = message
+                    st.error(message)
+                    return
+                dataset_updates.record_upload(digest, new_data_file.name, summary.rows)
+                dataset_updates.publish()
+                cached = summaries[digest] = (summary, validation)
+                progress_bar.progress(1.0, text=f"Read {summary.rows:,} rows in {summary.chunks} chunk(s).")
+            summary, validation = cached
+
+            st.write(f"Preview of new data (first {len(summary.preview):,} of {summary.rows:,} rows):")
+            show_dataframe(summary.preview)
+            if summary.extra_columns:
+                st.info(f"Ignored unexpected column(s): {', '.join(summary.extra_columns)}")
+            if summary.has_issues:
+                st.warning(
+                    f"{int(summary.invalid_values.sum()):,} non-numeric value(s) and "
+                    f"{summary.missing_business_unit:,} row(s) without a Business Unit were found."
+                )
+            counts = validation["counts"]
+            if counts["Flagged Rows"]:
+                held = f" {validation['held_back']:,} of them were held back." if validation["held_back"] else ""
+                st.warning(
+                    f"{counts['Flagged Rows']:,} row(s) failed validation: "
+                    + ", ".join(f"{check} {counts[check]:,}" for check in CHECKS if counts[check]) + "." + held
+                )
+                st.write("**Flagged rows** (first {:,}):".format(sum(len(part) for part in validation["flagged"])))
+                show_dataframe(pd.concat(validation["flagged"]))
+            st.success("Data uploaded and merged into the master dataset (rows are matched on Business Unit, Site and Month).")
+
+    upload_panel()
+    @st.fragment
+    @timed_panel("manual_entry_panel")
+    def manual_entry_panel():
+        st.write("**Manual Entry Form**")
+        business_unit = st.text_input("Business Unit")
+        scope1_val = st.number_input("Scope 1 (MT CO2e)", min_value=0, value=0, step=100)
+        scope2_val = st.number_input("Scope 2 (MT CO2e)", min_value=0, value=0, step=100)
+        scope3_val = st.number_input("Scope 3 (MT CO2e)", min_value=0, value=0, step=100)
+
+        save_anyway = st.checkbox("Save even if the entry fails validation", key="manual_save_anyway")
+
+        if st.button("Add Entry"):
+            if not business_unit.strip():
+                st.error("Please enter a Business Unit.")
+            else:
+                entry = pd.DataFrame([[business_unit.strip(), scope1_val, scope2_val, scope3_val]], columns=["Business Unit", *SCOPE_COLUMNS])
+                tolerance = st.session_state.get("validation_tolerance", DEFAULT_TOLERANCE_PCT)
+                issues = validate_emissions(entry, get_history_profile(tnuva_dataset), tolerance_pct=tolerance)["Issues"].iloc[0]
+                if issues and not save_anyway:
+                    st.warning(f"Entry not saved: {issues} (compared with {business_unit.strip()}'s existing data).")
+                else:
+                    get_task_store().add_entries([(business_unit.strip(), scope1_val, scope2_val, scope3_val)])
+                    st.success(f"Added entry for {business_unit} | S1={scope1_val} | S2={scope2_val} | S3={scope3_val}")
+                    if issues:
+                        st.warning(f"Saved despite failed validation: {issues}.")
+
+        saved_entries = get_task_store().list_entries()
+        if not saved_entries.empty:
+            st.write("**Saved Manual Entries**")
+            show_dataframe(saved_entries, hide_index=True)
+
+    manual_entry_panel()
 
     page_footer()
+
+# ------------------------------------------------------------------------------
+# Debug instrumentation panel
+# ------------------------------------------------------------------------------
+instrumentation_panel()
+if _rerun_metrics is not None:
+    _rerun_metrics.end_rerun(label=selected_tab)
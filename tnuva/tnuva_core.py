@@ -0,0 +1,239 @@
+"""
+Headless computation core for the Tnuva dashboard.
+
+Pure data loading, analysis, scenario and deadline functions with no Streamlit or
+Plotly dependency, so batch jobs and tests can import them cheaply. The Streamlit
+app (tnuva_app.py) is a thin UI layer on top of this module.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_dataset
+from ingestion import EXPECTED_COLUMNS, NUMERIC_COLUMNS
+from scenario_engine import (
+    PathwayScenario,
+    UncertaintySpec,
+    business_unit_totals,
+    calculate_scenario,
+    evaluate_scenario_grid,
+    project_pathways,
+    run_monte_carlo,
+    scenarios_from_frame,
+    target_trajectory,
+)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_PATH = os.path.join(APP_DIR, "tnuva_scope_data.csv")
+
+SCOPE_COLUMNS = NUMERIC_COLUMNS[:3]
+
+SAMPLE_DATA = {
+    "Business Unit": ["Dairy", "Meat", "Plant-Based", "Beverages", "Snacks"],
+    "Scope 1 Emissions (MT CO2e)": [10000, 8000, 5000, 6000, 4000],
+    "Scope 2 Emissions (MT CO2e)": [3000, 2500, 1500, 1800, 1200],
+    "Scope 3 Emissions (MT CO2e)": [50000, 45000, 30000, 35000, 20000],
+    "Electricity Consumption (MWh)": [20000, 15000, 10000, 12000, 8000],
+    "Fuels Consumption (Liters)": [50000, 60000, 20000, 30000, 25000],
+    "Direct Emissions (MT CO2e)": [5000, 3000, 2500, 2800, 2000],
+    "Indirect Emissions (MT CO2e)": [7000, 4000, 2800, 3200, 2200],
+    "Supply Chain Emissions (MT CO2e)": [35000, 30000, 20000, 25000, 15000],
+}
+
+GANTT_STATUS_COLORS = {
+    "Completed": "green",
+    "In Compliance": "blue",
+    "Pending Submission": "orange",
+    "Renewal Due": "yellow",
+    "In Progress": "purple",
+}
+
+
+# ------------------------------------------------------------------------------
+# Data loading
+# ------------------------------------------------------------------------------
+def sample_data(columns=None) -> pd.DataFrame:
+    """The built-in sample dataset, optionally restricted to `columns`."""
+    df = pd.DataFrame(SAMPLE_DATA)
+    return df[list(columns)] if columns else df
+
+
+def read_tnuva_data(file_path: str = DEFAULT_DATA_PATH, columns=None) -> pd.DataFrame:
+    """
+    Read the emissions dataset (via its columnar store), only `columns` if given.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+    return read_dataset(file_path, columns)
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index and column names), used as a cache key.
+    """
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update("|".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class SharedDataset:
+    """
+    An immutable dataset shared by every session in the process. Readers get
+    zero-copy views; derived columns go into the view (an overlay), never the shared
+    frame. The fingerprint is computed once, when the handle is built, and values
+    derived from the data (analysis, BU totals, ...) can be kept on the handle.
+
+    Nothing is copied or locked: pandas copy-on-write (always on from pandas 3) makes a
+    write through any view, or through the frame passed to build(), copy the affected
+    column first. Only writing to the private _frame itself would change shared data.
+    """
+    _frame: pd.DataFrame
+    fingerprint: str
+    _derived: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, fingerprint: str = None, derived: dict = None) -> "SharedDataset":
+        """
+        A handle on `df`. `fingerprint` overrides the content hash when the caller can
+        name the version more cheaply; `derived` seeds values already computed for it.
+        """
+        frame = df.copy(deep=False)
+        return cls(frame, fingerprint or dataset_fingerprint(frame), dict(derived or {}))
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    @property
+    def columns(self) -> list:
+        return list(self._frame.columns)
+
+    def view(self, columns=None) -> pd.DataFrame:
+        """
+        A zero-copy view of the shared data (only `columns` if given). Adding or
+        replacing columns on it leaves the shared frame untouched.
+        """
+        if columns:
+            return self._frame[list(columns)]
+        return self._frame.copy(deep=False)
+
+    def derived(self, name: str, build):
+        """The value `name` derived from this data: seeded, or build(view()) on first use."""
+        value = self._derived.get(name)
+        if value is None:
+            value = self._derived.setdefault(name, build(self.view()))
+        return value
+
+    def derived_values(self) -> dict:
+        """The derived values computed (or seeded) so far, by name."""
+        return dict(self._derived)
+
+
+# ------------------------------------------------------------------------------
+# Environmental analysis
+# ------------------------------------------------------------------------------
+
+
+def build_analysis(df: pd.DataFrame, totals=None) -> dict:
+    """
+    Compute totals, per-scope shares and intensity metrics in one vectorized pass.
+    `totals` (column sums of NUMERIC_COLUMNS) may be passed when already known, e.g.
+    patched from a previous version. Does not modify `df`.
+    """
+    values = df[NUMERIC_COLUMNS].to_numpy(dtype="float64")
+    totals = values.sum(axis=0) if totals is None else np.asarray(totals, dtype=np.float64)
+
+    total_row = pd.DataFrame([totals], columns=NUMERIC_COLUMNS)
+    total_row.insert(0, "Business Unit", "TOTAL")
+    analysis_df = pd.concat([df, total_row], ignore_index=True)
+
+    scope_totals = totals[:3]
+    scope_sum = scope_totals.sum()
+    pie_df = pd.DataFrame({
+        "Scope": ["Scope 1", "Scope 2", "Scope 3"],
+        "Emissions (MT CO2e)": scope_totals,
+        "Share (%)": scope_totals / scope_sum * 100 if scope_sum else 0.0,
+    })
+
+    electricity = values[:, NUMERIC_COLUMNS.index("Electricity Consumption (MWh)")]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intensities = values[:, :2] / electricity[:, None]
+    intensity_df = pd.DataFrame({
+        "Business Unit": df["Business Unit"].to_numpy(),
+        "Scope 1 Intensity (MT CO2e/MWh)": intensities[:, 0],
+        "Scope 2 Intensity (MT CO2e/MWh)": intensities[:, 1],
+    })
+
+    return {
+        "totals": pd.Series(totals, index=NUMERIC_COLUMNS),
+        "analysis_df": analysis_df,
+        "pie_df": pie_df,
+        "intensity_df": intensity_df,
+    }
+
+
+# ------------------------------------------------------------------------------
+# Compliance deadlines
+# ------------------------------------------------------------------------------
+def deadline_cutoff(months: int, now=None) -> pd.Timestamp:
+    """The timestamp `months` months after `now` (default: the current time)."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return now + pd.DateOffset(months=months)
+
+
+def compliance_priority(status: str, deadline, now=None) -> str:
+    """
+    Classify a regulation for the decision tool: "urgent" if its deadline is within a
+    month, "attention" if it has pending compliance actions, otherwise "ok".
+    """
+    if pd.Timestamp(deadline) <= deadline_cutoff(1, now):
+        return "urgent"
+    if status in ("Pending Submission", "Renewal Due"):
+        return "attention"
+    return "ok"
+
+
+def gantt_frame(regulations: pd.DataFrame, now=None) -> pd.DataFrame:
+    """
+    Timeline rows (Start = now, End = deadline) for the compliance Gantt chart,
+    with Status mapped to its display color.
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    return pd.DataFrame({
+        "Regulation Name": regulations["Regulation Name"],
+        "Compliance Deadline": regulations["Compliance Deadline"],
+        "Status": regulations["Status"].replace(GANTT_STATUS_COLORS),
+        "Start": now,
+        "End": pd.to_datetime(regulations["Compliance Deadline"]),
+    })
+
+
+__all__ = [
+    "APP_DIR",
+    "DEFAULT_DATA_PATH",
+    "EXPECTED_COLUMNS",
+    "GANTT_STATUS_COLORS",
+    "NUMERIC_COLUMNS",
+    "PathwayScenario",
+    "SCOPE_COLUMNS",
+    "SharedDataset",
+    "UncertaintySpec",
+    "build_analysis",
+    "business_unit_totals",
+    "calculate_scenario",
+    "compliance_priority",
+    "dataset_fingerprint",
+    "deadline_cutoff",
+    "evaluate_scenario_grid",
+    "gantt_frame",
+    "project_pathways",
+    "read_tnuva_data",
+    "run_monte_carlo",
+    "sample_data",
+    "scenarios_from_frame",
+    "target_trajectory",
+]